@@ -0,0 +1,111 @@
+"""
+Benchmark of the shared numeric parsing (numeric_parsing.py) against the per-column routines it replaced:
+- clean_mixed_column (World Happiness Report): 4-5 chained .str.replace passes per column + pd.to_numeric
+- clean_numeric_columns (ILOSTAT): 3 .str.replace passes per column + pd.to_numeric
+- clean_mixed_column2 (Better Life Index): one Python regex per cell + float()
+- Gallup: .str.replace("%") per column + pd.to_numeric
+
+The raw csv files are scaled up by stacking them `scale` times. In the "distinct" variant every copy gets
+slightly different numbers, so the texts do not repeat (worst case for parse_numeric, which parses every
+distinct text only once). The results of the old and the new routines are checked to be identical.
+
+    python benchmark_numeric_parsing.py [scale ...]
+"""
+import re
+import sys
+import time
+
+import pandas as pd
+
+from numeric_parsing import parse_numeric
+
+RAW_DIR = "../data/raw"
+
+
+# routines replaced by parse_numeric (kept here for the comparison)
+def legacy_whr(df, columns):
+    out = pd.DataFrame(index=df.index)
+    for col in columns:
+        out[col] = pd.to_numeric(df[col].astype(str).str.replace("%", "", regex=False)
+                                 .str.replace("$", "", regex=False).str.replace(",", "", regex=False)
+                                 .str.replace("-", "", regex=False).str.strip(), errors="coerce")
+    return out
+
+
+def legacy_ilo(df, columns):
+    out = pd.DataFrame(index=df.index)
+    for col in columns:
+        out[col] = pd.to_numeric(df[col].astype(str).str.replace("%", "", regex=False)
+                                 .str.replace(",", "", regex=False).str.replace("$", "", regex=False)
+                                 .str.strip(), errors="coerce")
+    return out
+
+
+def legacy_bli(df, columns):
+    out = pd.DataFrame(index=df.index)
+    for col in columns:
+        out[col] = df[col].astype(str).apply(lambda x: float(re.sub(r'[^0-9.]', '', x)))
+    return out
+
+
+def legacy_gallup(df, columns):
+    out = pd.DataFrame(index=df.index)
+    for col in columns:
+        out[col] = pd.to_numeric(df[col].str.replace("%", "", regex=False).str.strip(), errors="coerce")
+    return out
+
+
+DATASETS = [
+    # name, raw file, read_csv arguments, legacy routine, parse_numeric arguments
+    ("WHR", "world_happiness_report_raw.csv", {"na_values": ["N/A", "-", "nan", "NaN"]}, legacy_whr, {}),
+    ("ILOSTAT wages", "wages_raw.csv", {}, legacy_ilo, {}),
+    ("ILOSTAT unemployment", "unemployment_and_labour_underutilization_raw.csv", {}, legacy_ilo, {}),
+    ("BLI", "betterlife.raw.csv", {}, legacy_bli, {"integers": False}),
+    ("Gallup emotions", "gallup_emotions_raw.csv", {}, legacy_gallup, {}),
+]
+
+
+def scale_up(df, columns, scale, distinct):
+    """Stacks the data `scale` times; distinct=True changes the leading digit of every number per copy."""
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        if distinct and i:
+            digit = str(i % 9 + 1)
+            for col in columns:
+                copy[col] = copy[col].astype("string").str.replace(r"^(\D*)\d", lambda m: m.group(1) + digit,
+                                                                    regex=True).astype(object)
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run(scales=(1, 10, 100)):
+    rows = []
+    for name, file_name, read_kwargs, legacy, parse_kwargs in DATASETS:
+        raw = pd.read_csv(f"{RAW_DIR}/{file_name}", **read_kwargs)
+        columns = [col for col in raw.select_dtypes(include="object").columns if col not in ("Country", "Emotion")]
+        if name.startswith("ILOSTAT"):
+            columns = list(raw.columns[1:])
+        for scale in scales:
+            for distinct in (False, True):
+                if scale == 1 and distinct:
+                    continue
+                df = scale_up(raw, columns, scale, distinct)
+                old, old_seconds = timed(legacy, df, columns)
+                new, new_seconds = timed(parse_numeric, df, columns, **parse_kwargs)
+                identical = old.equals(new[columns])
+                rows.append({"dataset": name, "scale": scale, "distinct texts": distinct, "cells": df[columns].size,
+                             "old (s)": old_seconds, "parse_numeric (s)": new_seconds,
+                             "speedup": old_seconds / new_seconds, "identical": identical})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    scales = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    print(run(scales).to_string(index=False, float_format=lambda x: f"{x:.3f}"))
@@ -2,13 +2,13 @@
 This script cleans and validates Gallup Emotions data.
 
 This function:
-    - Retrieves raw emotion data using the scrape_gallup_emotions() function
+    - Reads the cached raw emotion data (scraped again with scrape_gallup_emotions() only when forced or stale)
     - Standardizes country and emotion names
     - Drops the 'Don't Know/Refused' column before reshaping
     - Cleans and converts percentage strings to numeric values
     - Checks for missing data values
     - Identifies and handles outliers in numeric columns (e.g., percentage and values outside 0–100)
-    - Creates composite column names
+    - Reshapes to one row per country (set_index/unstack) with composite column names
     - Ensures appropriate column data types and converts them as needed
     - Sorts and resets the index for consistency
     - Saves the final cleaned and validated dataset as 'Gallup_Cleaned.csv'
@@ -23,11 +23,54 @@ date:       04.04.2025
 
 import pandas as pd
 import os
-from scrape_gallup_emotions import scrape_gallup_emotions
-
-def clean_gallup_emotions():
-    # Get the dataframes from scrape_gallup_emotions for cleaning
-    df = scrape_gallup_emotions()
+from gallup_sources import MAX_AGE_DAYS, load_gallup_emotions
+from numeric_parsing import parse_numeric
+from validation import validate
+
+RESPONSES = ["YES", "NO"]
+
+
+def reshape_emotions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reshapes the long table (one row per Emotion and Country, one column per response) to one row per Country
+    with one column per emotion and response, e.g. 'anger_yes%', sorted by column name.
+
+    Index-based (set_index/unstack) instead of melt + pivot_table. Like pivot_table(aggfunc="first"), duplicated
+    Emotion/Country rows keep the first value that is not missing, countries and columns without any value are
+    dropped, and columns of an integer response without missing values stay integer.
+    """
+    wide = df.dropna(subset=["Country", "Emotion"]).set_index(["Country", "Emotion"])[RESPONSES]
+    if wide.index.has_duplicates:
+        wide = wide.groupby(level=["Country", "Emotion"], sort=False).first()
+
+    wide = wide.astype("float64").unstack("Emotion")
+    integer_columns = {}
+    names = []
+    for response, emotion in wide.columns:
+        name = emotion.lower().replace(" ", "_") + "_" + response.lower().replace(" ", "_") + "%"
+        integer_columns[name] = pd.api.types.is_integer_dtype(df[response])
+        names.append(name)
+    wide.columns = names
+
+    wide = wide.dropna(how="all").dropna(axis=1, how="all")
+    wide = wide[sorted(wide.columns)]
+    for col in wide.columns:
+        if integer_columns[col] and wide[col].notna().all():
+            wide[col] = wide[col].astype("int64")
+    return wide.rename_axis("Country").reset_index()
+
+
+def clean_gallup_emotions(refresh: bool = None, max_age_days: float = MAX_AGE_DAYS):
+    """
+    Cleans the Gallup emotions data.
+
+    Parameters:
+        refresh (bool): scrape the data again instead of reading ../data/raw/gallup_emotions_raw.csv
+                        (None: GALLUP_REFRESH environment variable, see gallup_sources.py)
+        max_age_days (float): the raw csv is scraped again when it is older
+    """
+    # Get the raw data: cached raw csv, scraped again only if forced or stale (gallup_sources.py)
+    df = load_gallup_emotions(refresh=refresh, max_age_days=max_age_days)
     print("Raw data preview:\n", df.head())
 
     # Normalize column names and strip whitespace
@@ -35,66 +78,36 @@ def clean_gallup_emotions():
     df["Country"] = df["Country"].str.strip().str.title()
     df["Emotion"] = df["Emotion"].str.strip().str.title()
 
-    # Drop 'Don't Know/Refused' before reshaping
+    # Drop 'Don't Know/Refused' before reshaping (only YES and NO remain)
     if "DON'T KNOW/REFUSED" in df.columns:
         df = df.drop(columns=["DON'T KNOW/REFUSED"])
 
-    # Reshape the dataframe (only YES and NO remain)
-    reshaped = df.melt(
-    id_vars=["Emotion", "Country"],
-    value_vars=["YES", "NO"],
-    var_name="Response",
-    value_name="Percentage"
-    )
-    print("Reshaped data preview:\n", reshaped.head())
-
-    #Clean and convert 'Percentage' to numeric (remove % and invalid entries)
-    reshaped["Percentage"] = reshaped["Percentage"].str.replace("%", "", regex=False).str.strip()
-    reshaped["Percentage"] = pd.to_numeric(reshaped["Percentage"], errors="coerce")
+    #Clean and convert the YES and NO percentages to numeric (remove % and invalid entries, one pass)
+    df[RESPONSES] = parse_numeric(df, RESPONSES)
 
     #Check for missing values
-    missing = reshaped.isnull().sum()
+    missing = df[RESPONSES].isnull().sum()
     if missing.any():
         print("Missing values found:\n", missing)
 
-    #Check and handle outliers (outside 0–100 range)
-    outlier_mask = (reshaped["Percentage"] < 0) | (reshaped["Percentage"] > 100)
-    if outlier_mask.any():
-        print("Outliers detected:")
-        print(reshaped[outlier_mask])
-        # You could drop or cap them here, e.g.:
-        reshaped.loc[outlier_mask, "Percentage"] = pd.NA
-
-
-    # Create composite column names like 'anger_yes'
-    reshaped["Column"] = (
-        reshaped["Emotion"].str.lower().str.replace(" ", "_") + "_" +
-        reshaped["Response"].str.lower().str.replace(" ", "_") + "%"
-    )
-
-    # Pivot so that each row is Country with all emotion responses as columns (country only once in the row)
-    final_df = reshaped.pivot_table(
-        index="Country",
-        columns="Column",
-        values="Percentage",
-        aggfunc="first"
-    ).reset_index()
+    #Check and handle outliers (outside 0–100 range), see validation.py
+    report = validate(df, {response: {"range": (0, 100)} for response in RESPONSES})
+    for response in RESPONSES:
+        outlier_rows = report.at[response, "out_of_range_rows"]
+        if len(outlier_rows):
+            # You could drop or cap them here, e.g.:
+            df[response] = df[response].astype("float64")
+            df.loc[outlier_rows, response] = pd.NA
+
+    # Reshape so that each row is Country with all emotion responses as columns like 'anger_yes%'
+    # (country only once in the row)
+    final_df = reshape_emotions(df)
     print("Data preview:\n", final_df.head())
 
-    # Ensure numeric types for all response columns
-    for col in final_df.columns:
-        if col != "Country":
-            final_df[col] = pd.to_numeric(final_df[col], errors="coerce")
-
     # Print column data types to verify
     print("\nColumn data types after conversion:")
     print(final_df.dtypes)
 
-    # Reorder columns
-    cols = final_df.columns.tolist()
-    reordered = ["Country"] + sorted([col for col in cols if col != "Country"])
-    final_df = final_df[reordered]
-
     # Sort and reset index
     final_df = final_df.sort_values(["Country"]).reset_index(drop=True)
 
@@ -106,4 +119,4 @@ def clean_gallup_emotions():
     return final_df
 
 if __name__ == "__main__":
-    clean_gallup_emotions()
\ No newline at end of file
+    clean_gallup_emotions()
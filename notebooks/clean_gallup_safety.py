@@ -2,7 +2,8 @@
 This script cleans and validates Gallup Safety and Law & Order index data.
 
 This function:
-    - Retrieves raw Safety and Law & Order dataframes from the scraper module
+    - Reads the cached raw Safety and Law & Order dataframes (downloaded by the scraper module only when
+      forced, missing or stale)
     - Standardizes country names and merges the datasets
     - Checks for mismatched countries before merging
     - Detects and reports missing data
@@ -18,14 +19,22 @@ date:       26.03.2025
 
 """
 import pandas as pd
-from scrape_gallup_safety import get_gallup_dataframes
+from numeric_parsing import parse_numeric_series
+from validation import validate
+from gallup_sources import MAX_AGE_DAYS, load_gallup_safety
 
-def clean_gallup_safety():
+def clean_gallup_safety(refresh: bool = None, max_age_days: float = MAX_AGE_DAYS):
     """
     Cleans and validates Gallup Safety and Law & Order index data.
+
+    Parameters:
+        refresh (bool): download the data again instead of reading the raw csv files in ../data/raw/
+                        (None: GALLUP_REFRESH environment variable, see gallup_sources.py)
+        max_age_days (float): the raw csv files are downloaded again when they are older
     """
-    # Get the dataframes from scrape_gallup_safety for cleaning
-    df_safety, df_law_order = get_gallup_dataframes()
+    # Get the dataframes for cleaning: cached raw csv files, downloaded by scrape_gallup_safety only if
+    # forced, missing or stale (gallup_sources.py)
+    df_safety, df_law_order = load_gallup_safety(refresh=refresh, max_age_days=max_age_days)
 
     # Rename column to enable a consistent merge
     df_safety.rename(columns={"DW_NAME": "Country"}, inplace=True)
@@ -43,7 +52,7 @@ def clean_gallup_safety():
     print("In Law & Order but not in Safety:", law_order_countries - safety_countries)
 
     # Make sure value columns are numeric before merge - remove % for safety values and rename
-    df_safety["VALUE"] = pd.to_numeric(df_safety["VALUE"].str.replace("%", "").str.strip(), errors="coerce")
+    df_safety["VALUE"] = parse_numeric_series(df_safety["VALUE"])
     df_safety.rename(columns={"VALUE": "PERCENTAGE_Safety"}, inplace=True)
     df_law_order["VALUE"] = pd.to_numeric(df_law_order["VALUE"], errors="coerce")
     df_law_order.rename(columns={"VALUE": "SCORE_law_order"}, inplace=True)
@@ -69,16 +78,13 @@ def clean_gallup_safety():
     print("\n Value ranges:")
     print(merged_df.describe())
 
-    # Flags values outside expected 0–100 range
-    for col in merged_df.columns:
-        if col != "Country":
-            outliers = merged_df[(merged_df[col] < 0) | (merged_df[col] > 100)]
-            if not outliers.empty:
-                print(f"\n️  Outliers detected in '{col}':")
-                print(outliers[["Country", col]])
+    # Flags values outside expected 0–100 range (all value columns in one pass, see validation.py)
+    value_columns = [col for col in merged_df.columns if col != "Country"]
+    report = validate(merged_df, {col: {"range": (0, 100)} for col in value_columns})
 
-                #Sets any values outside of upper and lower parameters to upper and lower parameters
-                merged_df[col] = merged_df[col].clip(lower=0, upper=100)
+    #Sets any values outside of upper and lower parameters to upper and lower parameters
+    flagged = report.index[report["out_of_range"] > 0].tolist()
+    merged_df[flagged] = merged_df[flagged].clip(lower=0, upper=100)
 
     #Sort and reset index
     merged_df.sort_values("Country", inplace=True)
@@ -9,10 +9,12 @@ date: 02.04.2025
 """
 ##
 import pandas as pd
+from dataset_schemas import read_raw
 
 ## Missing Data Check
-# read raw data, making sure pandas treats different "N/A" as missing values
-df_raw_happiness_by_age = pd.read_csv("./data/raw/happiness_by_age_raw.csv", na_values= ["N/A", "-", "nan", "NaN"])
+# read raw data with its schema (dataset_schemas.py): different "N/A" are missing values,
+# ranks are read as integers and the age group labels as categories
+df_raw_happiness_by_age = read_raw("happiness_by_age")
 
 # inspect raw data
 df_raw_happiness_by_age
@@ -20,9 +22,9 @@ df_raw_happiness_by_age
 df_raw_happiness_by_age.columns
 
 # information about missing values and data type of the columns
-df_raw_happiness_by_age.info() # 5 int and 3 objects, no missing values
+df_raw_happiness_by_age.info() # 5 Int64, 2 category and 1 object column, no missing values
 
-# checking the 3 object columns
+# checking the 3 text columns
 # check column "Country"
 print(df_raw_happiness_by_age["Country"].unique())
 print("Number of unique values in this column: ", df_raw_happiness_by_age["Country"].nunique())
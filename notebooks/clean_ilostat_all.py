@@ -5,36 +5,45 @@ Due to a website change (02/04/2025), data is sourced from raw CSV files
 instead of scraped DataFrames.
 
 This script defines reusable cleaning and validation functions to:
-- Load raw ILOSTAT CSVs (7 total, across different labor topics)
+- Load raw ILOSTAT CSVs (7 total, across different labor topics) typed by their schemas (dataset_schemas.py)
 - Standardize country names (remove year/region info)
 - Clean and convert numeric columns (remove %, $, commas → float)
 - Rename key indicator columns for clarity and consistency
-- Check for missing values, data types, and statistical outliers
-- Validate values against expected ranges
+- Check for missing values, data types, and statistical outliers and validate values against expected ranges
+  (all columns of a dataset in one pass, see validation.py; VALIDATION_QUIET=1 switches the output off)
 - Save a cleaned CSV for each dataset to ../data/clean/
 
+Every topic is one entry of TOPICS (cleaning function, clean csv, validation rules); its raw csv and columns come
+from the schema of the same name in dataset_schemas.py. The topics are
+independent and are cleaned concurrently in a thread (or process) pool; the time of every topic is reported:
+    python clean_ilostat_all.py                  (all topics)
+    python clean_ilostat_all.py wages employment (some topics)
+
 Authors: Jade Bullock
 Date: 04.04.2025
 """
 
 import pandas as pd
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dataset_schemas import read_raw
+from numeric_parsing import parse_numeric
+from validation import print_report, quiet_by_default, validate
 
 
 def clean_numeric_columns(df: pd.DataFrame, skip_first: bool = True) -> pd.DataFrame:
-    """Removes thousands comma, dollar sign and percentage sign from numeric columns."""
+    """Removes thousands comma, dollar sign and percentage sign from numeric columns (all columns in one pass,
+    see numeric_parsing.py); the detected units are stored in df.attrs["units"].
+    Columns that were already typed as numbers when reading (see dataset_schemas.py) are kept."""
     start_idx = 1 if skip_first else 0
+    columns = [col for col in df.columns[start_idx:] if not pd.api.types.is_numeric_dtype(df[col])]
 
-    for col in df.columns[start_idx:]:
-        df[col] = (
-            df[col]
-            .astype(str)
-            .str.replace("%", "", regex=False)
-            .str.replace(",", "", regex=False)
-            .str.replace("$", "", regex=False)
-            .str.strip()
-        )
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+    parsed = parse_numeric(df, columns)
+    df[columns] = parsed
+    df.attrs["units"] = {**df.attrs.get("units", {}), **parsed.attrs["units"]}
 
     return df
 
@@ -46,248 +55,278 @@ def rename_column(df: pd.DataFrame, old_name: str, new_name: str) -> pd.DataFram
         df = df.rename(columns={old_name: new_name})
     return df
 
+# Names whose text in brackets tells two countries apart: renamed before the brackets are removed
+# ("Korea (the Democratic People's Republic of)" would become "Korea", the name of the Republic of Korea elsewhere)
+BRACKETED_NAMES = {"Korea (the Democratic People's Republic of)": "Democratic People's Republic of Korea"}
+
 def clean_country_names(df: pd.DataFrame) -> pd.DataFrame:
     """Cleans country names to remove additional text"""
-    df.iloc[:, 0] = df.iloc[:, 0].str.replace(r"\s*\(.*", "", regex=True).str.strip()
+    names = df.iloc[:, 0]
+    for bracketed, name in BRACKETED_NAMES.items():  # also with a "(year)" behind them
+        names = names.str.replace(bracketed, name, regex=False)
+    df.iloc[:, 0] = names.str.replace(r"\s*\(.*", "", regex=True).str.strip()
     return df
 
 
-def validate_column(df: pd.DataFrame, column: str, expected_range=(0, 100)) -> None:
-    """ Checks for the following: missing values, data type, values outside expected range, and outliers"""
-
-    print(f"\n--- Validation for '{column}' ---")
-
-    if column not in df.columns:
-        print(f"Column '{column}' not found.")
-        return
-
-    # 1. Missing values
-    missing_mask = df[column].isnull()
-    missing_count = missing_mask.sum()
-    print(f"Missing values: {missing_count}")
-    if missing_count > 0:
-        print("Countries with missing values:")
-        print(df.loc[missing_mask, "Country"].tolist())
+def log(message: str, messages: list = None) -> None:
+    """Prints the message, or appends it to messages (cleaning in a pool: the parent prints them in topic order)."""
+    if messages is None:
+        print(message)
+    else:
+        messages.append(message)
 
-    # 2. Data type
-    print(f"Data type: {df[column].dtype}")
 
-    # 3. Values outside expected range
-    min_val, max_val = expected_range
-    out_of_range = df[(df[column] < min_val) | (df[column] > max_val)]
-    if not out_of_range.empty:
-        print(f"\nValues outside range {expected_range}:")
-        print(out_of_range)
+def validate_column(df: pd.DataFrame, column: str, expected_range=(0, 100)) -> pd.DataFrame:
+    """ Checks for the following: missing values, data type, values outside expected range, and outliers
+    (for one column, see validation.validate to check all columns of a dataset at once)"""
+    return validate(df, {column: {"range": expected_range}})
 
-    # 4. Outliers using IQR method
-    q1 = df[column].quantile(0.25)
-    q3 = df[column].quantile(0.75)
-    iqr = q3 - q1
-    lower_bound = q1 - 1.5 * iqr
-    upper_bound = q3 + 1.5 * iqr
-
-    outliers = df[(df[column] < lower_bound) | (df[column] > upper_bound)]
-    if not outliers.empty:
-        print(f"\nStatistical outliers (IQR method):")
-        print(outliers)
-
-    print("--- End of Validation ---")
-
-def clean_unemployment_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_unemployment_data(df: pd.DataFrame, messages: list = None) -> pd.DataFrame:
     """
     Cleans unemployment raw dataset by:
     - Removing (year) from country names
     - Converting percentage strings to numeric values
     - Dropping the 3rd, 4th, and 5th columns
-    - Checking for missing values and outliers
     """
 
-    print(f"\n--- Cleaning unemployment data ---")
+    log(f"\n--- Cleaning unemployment data ---", messages)
     df = clean_country_names(df)
     df = clean_numeric_columns(df)
     df = df.drop(df.columns[[2, 3, 4]], axis=1)
     df = rename_column(df, "Unemployment rate (LU1)", "Unemployment rate (%)")
-    validate_column(df, "Unemployment rate (%)")
     return df
 
-def clean_labour_productivity_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_labour_productivity_data(df: pd.DataFrame, messages: list = None) -> pd.DataFrame:
     """
     Cleans labour productivity dataset by:
     - Renaming the productivity column to 'GDP per hour worked'
     - Converting string values like "$123.4" to float
-    - Checking for missing values and outliers
     """
 
-    print(f"\n--- Cleaning labour productivity data ---")
+    log(f"\n--- Cleaning labour productivity data ---", messages)
     df = clean_country_names(df)
     df = clean_numeric_columns(df)
     df = rename_column(df, "{'labour_productivity'}", "GDP per hour worked ($)")
-    validate_column(df, "GDP per hour worked ($)", (0,200))
     return df
 
 
-def clean_safety_and_health_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_safety_and_health_data(df: pd.DataFrame, messages: list = None) -> pd.DataFrame:
     """
     Cleans the safety and health at work dataset by:
     - Removing thousands separators (e.g. '9,421' → 9421)
     - Converting all non-country columns to numeric
-    - Checking for missing values and outliers
     """
 
-    print(f"\n--- Cleaning safety data ---")
+    log(f"\n--- Cleaning safety data ---", messages)
     df = clean_country_names(df)
     df = clean_numeric_columns(df)
-    validate_column(df, "Non-fatal occupational injuries per 100'000 workers", (0,10000))
-    validate_column(df,"Occupational fatalities per 100'000 workers")
-    validate_column(df,"Inspectors per 10'000 employed persons")
     return df
 
-def clean_wages_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_wages_data(df: pd.DataFrame, messages: list = None) -> pd.DataFrame:
     """
     Cleans the wages dataset by:
     - Extracting just the country name (before any brackets or extra details)
     - Dropping the '$US' column
     - Converting 'PPP $' values to float
     - Renaming column to 'min. monthly wage (PPP$)'
-    - Checking for missing values and outliers
     """
 
-    print(f"\n--- Cleaning wages data ---")
+    log(f"\n--- Cleaning wages data ---", messages)
     df = clean_country_names(df)
     df = clean_numeric_columns(df)
     df = df.drop(df.columns[[2]], axis=1)
     df = rename_column(df, "PPP $", "min. monthly wage (PPP $)")
-    validate_column(df, "min. monthly wage (PPP $)", (0,4000))
     return df
 
 
-def clean_working_poverty_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_working_poverty_data(df: pd.DataFrame, messages: list = None) -> pd.DataFrame:
     """
     Cleans the working poverty dataset by:
     - Converting all percentage strings to numeric values
     - Appending '%' to column names (except for 'Country')
-    - Checking for missing values and outliers
     """
 
-    print(f"\n--- Cleaning working poverty data ---")
+    log(f"\n--- Cleaning working poverty data ---", messages)
     df = clean_country_names(df)
     df = clean_numeric_columns(df)
     df = rename_column(df, "Extremely poor", "Extremely poor (%)")
     df = rename_column(df, "Moderately poor", "Moderately poor (%)")
     df = rename_column(df, "Not extremely or moderately poor", "Not extremely or moderately poor (%)")
-    validate_column(df, "Extremely poor (%)")
-    validate_column(df, "Moderately poor (%)")
-    validate_column(df, "Not extremely or moderately poor (%)")
     return df
 
-def clean_working_time_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_working_time_data(df: pd.DataFrame, messages: list = None) -> pd.DataFrame:
     """
     Cleans the working time dataset by:
     - Converting percentage strings to float values
     - Appending '%' to 'Share of employed working 49 or more hours per week' column title
-    - Checking for missing values and outliers
     """
 
-    print(f"\n--- Cleaning working time data ---")
+    log(f"\n--- Cleaning working time data ---", messages)
     df = clean_country_names(df)
     df = clean_numeric_columns(df)
     df = rename_column(df, "Share of employed working 49 or more hours per week", "Share of employed working 49 or more hours per week (%)")
-    validate_column(df, "Average hours per week per employed person")
-    validate_column(df, "Share of employed working 49 or more hours per week (%)")
     return df
 
 
-def clean_employment_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_employment_data(df: pd.DataFrame, messages: list = None) -> pd.DataFrame:
     """
     Cleans the employment dataset by:
     - Converting the employment ratio to numeric (removes '%')
     - Renaming the column to include '%' in the title
-    - Checking for missing values and outliers
-
     """
-    print(f"\n--- Cleaning employment data ---")
+    log(f"\n--- Cleaning employment data ---", messages)
     df = clean_country_names(df)
     df = clean_numeric_columns(df)
     df = rename_column(df, "Employment to Population ratio", "Employment to Population ratio %")
-    validate_column(df, "Employment to Population ratio %")
     return df
 
 
-def main():
-    # UNEMPLOYMENT
-    unemployment_raw_path = "../data/raw/unemployment_and_labour_underutilization_raw.csv"
-    unemployment_output_path = "../data/clean/ilostat_unemployment_clean.csv"
-    unemployment_df = pd.read_csv(unemployment_raw_path)
-    unemployment_cleaned = clean_unemployment_data(unemployment_df)
-    os.makedirs(os.path.dirname(unemployment_output_path), exist_ok=True)
-    unemployment_cleaned.to_csv(unemployment_output_path, index=False)
-    print("\nUnemployment cleaned preview:")
-    print(unemployment_cleaned.head())
-    print(f"Unemployment cleaned file saved to {unemployment_output_path}")
-
-    # LABOUR PRODUCTIVITY
-    labour_raw_path = "../data/raw/labour_productivity_raw.csv"
-    labour_output_path = "../data/clean/ilostat_labour_productivity_clean.csv"
-    labour_df = pd.read_csv(labour_raw_path)
-    labour_cleaned = clean_labour_productivity_data(labour_df)
-    labour_cleaned.to_csv(labour_output_path, index=False)
-    print("\nLabour productivity cleaned preview:")
-    print(labour_cleaned.head())
-    print(f"Labour productivity cleaned file saved to {labour_output_path}")
-
-    #  SAFETY AND HEALTH
-    safety_raw_path = "../data/raw/safety_and_health_at_work_raw.csv"
-    safety_output_path = "../data/clean/ilostat_safety_and_health_clean.csv"
-    safety_df = pd.read_csv(safety_raw_path)
-    safety_cleaned = clean_safety_and_health_data(safety_df)
-    safety_cleaned.to_csv(safety_output_path, index=False)
-    print("\nSafety and health cleaned preview:")
-    print(safety_cleaned.head())
-    print(f"Safety and health cleaned file saved to {safety_output_path}")
-
-    #  WAGES
-    wages_raw_path = "../data/raw/wages_raw.csv"
-    wages_output_path = "../data/clean/ilostat_wages_clean.csv"
-    wages_df = pd.read_csv(wages_raw_path)
-    wages_cleaned = clean_wages_data(wages_df)
-    wages_cleaned.to_csv(wages_output_path, index=False)
-    print("\nWages cleaned preview:")
-    print(wages_cleaned.head())
-    print(f"Wages cleaned file saved to {wages_output_path}")
-
-    #  WORKING POVERTY
-    poverty_raw_path = "../data/raw/working_poverty_raw.csv"
-    poverty_output_path = "../data/clean/ilostat_working_poverty_clean.csv"
-    poverty_df = pd.read_csv(poverty_raw_path)
-    poverty_cleaned = clean_working_poverty_data(poverty_df)
-    poverty_cleaned.to_csv(poverty_output_path, index=False)
-    print("\nWorking poverty cleaned preview:")
-    print(poverty_cleaned.head())
-    print(f"Working poverty cleaned file saved to {poverty_output_path}")
-
-    #  WORKING TIME
-    working_time_raw_path = "../data/raw/working_time_raw.csv"
-    working_time_output_path = "../data/clean/ilostat_working_time_cleaned.csv"
-    working_time_df = pd.read_csv(working_time_raw_path)
-    working_time_cleaned = clean_working_time_data(working_time_df)
-    working_time_cleaned.to_csv(working_time_output_path, index=False)
-    print("\nWorking time cleaned preview:")
-    print(working_time_cleaned.head())
-    print(f"Working time cleaned file saved to {working_time_output_path}")
-
-    # EMPLOYMENT
-    employment_raw_path = "../data/raw/employment_raw.csv"
-    employment_output_path = "../data/clean/ilostat_employment_cleaned.csv"
-    employment_df = pd.read_csv(employment_raw_path)
-    employment_cleaned = clean_employment_data(employment_df)
-    employment_cleaned.to_csv(employment_output_path, index=False)
-    print("\nCleaned Employment Data Preview:")
-    print(employment_cleaned.head())
-    print(f"Employment cleaned file saved to {employment_output_path}")
 
-if __name__ == "__main__":
-    main()
 
+# One entry per topic: clean csv, cleaning function and the validation rules of the cleaned columns (validation.py).
+# The raw csv and its columns are the entry of the same name in dataset_schemas.SCHEMAS. Adding a topic is adding
+# an entry here and its schema there.
+TOPICS = {
+    "unemployment": {
+        "label": "Unemployment",
+        "output_path": "../data/clean/ilostat_unemployment_clean.csv",
+        "clean": clean_unemployment_data,
+        "rules": {"Unemployment rate (%)": {"range": (0, 100)}},
+    },
+    "labour_productivity": {
+        "label": "Labour productivity",
+        "output_path": "../data/clean/ilostat_labour_productivity_clean.csv",
+        "clean": clean_labour_productivity_data,
+        "rules": {"GDP per hour worked ($)": {"range": (0, 200)}},
+    },
+    "safety_and_health": {
+        "label": "Safety and health",
+        "output_path": "../data/clean/ilostat_safety_and_health_clean.csv",
+        "clean": clean_safety_and_health_data,
+        "rules": {
+            "Non-fatal occupational injuries per 100'000 workers": {"range": (0, 10000)},
+            "Occupational fatalities per 100'000 workers": {"range": (0, 100)},
+            "Inspectors per 10'000 employed persons": {"range": (0, 100)},
+        },
+    },
+    "wages": {
+        "label": "Wages",
+        "output_path": "../data/clean/ilostat_wages_clean.csv",
+        "clean": clean_wages_data,
+        "rules": {"min. monthly wage (PPP $)": {"range": (0, 4000)}},
+    },
+    "working_poverty": {
+        "label": "Working poverty",
+        "output_path": "../data/clean/ilostat_working_poverty_clean.csv",
+        "clean": clean_working_poverty_data,
+        "rules": {
+            "Extremely poor (%)": {"range": (0, 100)},
+            "Moderately poor (%)": {"range": (0, 100)},
+            "Not extremely or moderately poor (%)": {"range": (0, 100)},
+        },
+    },
+    "working_time": {
+        "label": "Working time",
+        "output_path": "../data/clean/ilostat_working_time_cleaned.csv",
+        "clean": clean_working_time_data,
+        "rules": {
+            "Average hours per week per employed person": {"range": (0, 100)},
+            "Share of employed working 49 or more hours per week (%)": {"range": (0, 100)},
+        },
+    },
+    "employment": {
+        "label": "Employment",
+        "output_path": "../data/clean/ilostat_employment_cleaned.csv",
+        "clean": clean_employment_data,
+        "rules": {"Employment to Population ratio %": {"range": (0, 100)}},
+    },
+}
+
+
+def clean_topic(name: str, topic: dict) -> dict:
+    """
+    Reads, cleans, validates (quietly) and saves one topic.
+
+    Returns:
+        dict: topic name, cleaned DataFrame, validation report, messages of the cleaning function and the seconds
+              of every step
+    """
+    timings = {}
+    messages = []
+    start = time.perf_counter()
+    df = read_raw(name)
+    timings["read_s"] = time.perf_counter() - start
+
+    step = time.perf_counter()
+    cleaned = topic["clean"](df, messages)
+    timings["clean_s"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    report = validate(cleaned, topic["rules"], quiet=True)
+    timings["validate_s"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    os.makedirs(os.path.dirname(topic["output_path"]), exist_ok=True)
+    cleaned.to_csv(topic["output_path"], index=False)
+    timings["write_s"] = time.perf_counter() - step
+    timings["total_s"] = time.perf_counter() - start
+
+    return {"topic": name, "cleaned": cleaned, "report": report, "messages": messages, **timings}
 
 
+def run_topics(topics: dict = TOPICS, max_workers: int = None, executor: str = "thread", quiet: bool = None):
+    """
+    Cleans independent topics concurrently and reports the time of every topic.
+
+    Parameters:
+        topics (dict): topic name -> configuration (see TOPICS)
+        max_workers (int): size of the pool (None: one worker per topic)
+        executor (str): "thread" or "process" pool
+        quiet (bool): do not print the validation reports and previews (None: VALIDATION_QUIET environment variable)
+
+    Returns:
+        tuple: (dict topic name -> result of clean_topic, pd.DataFrame timing per topic)
+    """
+    quiet = quiet_by_default() if quiet is None else quiet
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    max_workers = max_workers or len(topics) or 1
+
+    results = {}
+    start = time.perf_counter()
+    with pool_class(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(clean_topic, name, topic) for name, topic in topics.items()}
+        # the workers do not print: messages, reports and previews are printed here in the order of the topics,
+        # so the output of topics does not mix
+        for name, future in futures.items():
+            result = future.result()
+            results[name] = result
+            if not quiet:
+                for message in result["messages"]:
+                    print(message)
+                print(f"\n--- {topics[name]['label']} ---")
+                print_report(result["report"], result["cleaned"])
+                print(f"\n{topics[name]['label']} cleaned preview:")
+                print(result["cleaned"].head())
+                print(f"{topics[name]['label']} cleaned file saved to {topics[name]['output_path']}")
+    wall = time.perf_counter() - start
+
+    timing = pd.DataFrame([
+        {"topic": name, "rows": len(result["cleaned"]), "passed": bool(result["report"]["passed"].all()),
+         **{key: value for key, value in result.items() if key.endswith("_s")}}
+        for name, result in results.items()
+    ]).set_index("topic").reindex(list(topics))
+    print(f"\nCleaned {len(topics)} topics in {wall:.3f} s ({executor} pool, {max_workers} workers, "
+          f"sum of topic times {timing['total_s'].sum():.3f} s):")
+    print(timing.to_string(float_format=lambda x: f"{x:.3f}"))
+    return results, timing
+
+
+def main(names=None, max_workers: int = None, executor: str = "thread", quiet: bool = None):
+    """Cleans the given topics (default: all topics of TOPICS)."""
+    topics = {name: TOPICS[name] for name in names} if names else TOPICS
+    return run_topics(topics, max_workers=max_workers, executor=executor, quiet=quiet)
+
 
+if __name__ == "__main__":
+    # python clean_ilostat_all.py [topic ...]
+    main(sys.argv[1:])
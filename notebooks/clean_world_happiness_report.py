@@ -9,10 +9,13 @@ date: 02.04.2025
 """
 ##
 import pandas as pd
+from dataset_schemas import read_raw
+from numeric_parsing import parse_numeric
 
 ## Missing Data Check
-# read raw data, making sure pandas treats different "N/A" as missing values
-df_raw_world_happiness = pd.read_csv("./data/raw/world_happiness_report_raw.csv", na_values= ["N/A", "-", "nan", "NaN"])
+# read raw data with its schema (dataset_schemas.py): different "N/A" are missing values,
+# ranks and plain numbers are read as float, values with units (% or $) as text
+df_raw_world_happiness = read_raw("world_happiness_report")
 
 # inspect raw data
 df_raw_world_happiness
@@ -65,21 +68,10 @@ print("Columns to convert; ", cols_to_convert)
 # deep copy of the original dataframe to preserve the raw data
 df_clean = df_raw_world_happiness.copy()
 
-# function to clean and convert mixed-format strings (objects) to float
-def clean_mixed_column(col):
-    return pd.to_numeric(
-        col.astype(str)
-           .str.replace("%", "", regex = False)
-           .str.replace("$", "", regex = False)
-           .str.replace(",", "", regex = False)
-           .str.replace("-", "", regex = False)
-           .str.strip(),
-        errors= "coerce" #N/A
-    )
-
-# apply cleaning function to each selected column
-for col in cols_to_convert:
-    df_clean[col] = clean_mixed_column(df_clean[col])
+# apply the cleaning to all selected columns at once, the units (% or $) are kept in df_clean.attrs["units"]
+parsed = parse_numeric(df_clean, cols_to_convert)
+df_clean[cols_to_convert] = parsed
+df_clean.attrs["units"] = parsed.attrs["units"]
 
 # check data type of cleaned dataframe
 df_clean.info()
@@ -0,0 +1,172 @@
+"""
+Fuzzy matching of the country names that are not in the country registry (country_registry.py).
+
+The names left over by the registry (e.g. 'Congo, Dem. Rep.', 'St. Lucia', 'Trinidad & Tobago') are matched against
+the spellings of the alias table with a character n-gram blocking index:
+- every spelling is split into character trigrams (' st', 'st ', ...); an inverted index maps each trigram to the
+  spellings that contain it
+- a name is only compared to the few spellings (CANDIDATES) that share the most of its rare trigrams (trigrams of
+  more than MAX_POSTINGS spellings, like 'rep' or 'lic', are skipped for the blocking)
+- the score is the Dice coefficient of the trigram sets (0: nothing in common, 1: same trigrams)
+A match is accepted if its score is at least THRESHOLD and it is at least MARGIN ahead of the best spelling of
+another country, so regions like 'Southern Africa' (0.74 to 'South Africa') or ambiguous names like 'Republic of
+Congo' (Congo 0.84, DR Congo 0.77) stay unmatched.
+
+Accepted matches are added to the alias table and written to the alias file (data/country_aliases.csv), so they are
+known to the registry in the next runs:
+
+    matches = match_unknown(df["Country"])      # one row per unknown name: match, score, accepted
+    df["Country"] = country_names(df["Country"])
+
+Building the index and matching a name only depend on the number of trigrams of the name and the (limited) postings
+of its rare trigrams, not on the size of the alias table, so tens of thousands of names are matched in seconds.
+"""
+import re
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+from country_registry import ALIAS_PATH, ALIASES, NAMES, add_aliases, normalize_name, unknown_names
+
+THRESHOLD = 0.8
+MARGIN = 0.1
+NGRAM = 3
+CANDIDATES = 10
+MAX_POSTINGS = 50
+
+# abbreviations written out before the matching ('Congo, Dem. Rep.' -> 'congo democratic republic')
+ABBREVIATIONS = {"rep": "republic", "dem": "democratic", "st": "saint", "ste": "sainte", "fed": "federated",
+                 "sts": "states", "isl": "islands", "&": "and", "us": "united states", "uk": "united kingdom"}
+
+# abbreviations that are only written out in these places ("Is." is "Isle" in 'Is. of Man', "Islands" at the end of
+# 'Cayman Is.'; "U. S." with a space is "U.S."), as regular expressions on the words joined by spaces
+PATTERNS = [(re.compile(r"\bis of\b"), "isle of"), (re.compile(r"\bis$"), "islands"),
+            (re.compile(r"\bu s\b"), "united states"), (re.compile(r"\bu k\b"), "united kingdom")]
+
+
+def matching_key(name: str) -> str:
+    """Normalized spelling (normalize_name) with abbreviations written out, dashes and a trailing "the" removed."""
+    key = " ".join(normalize_name(name).replace("-", " ").split())
+    for pattern, replacement in PATTERNS:
+        key = pattern.sub(replacement, key)
+    words = [ABBREVIATIONS.get(word, word) for word in key.split()]
+    if words[-1:] == ["the"]:
+        words = words[:-1]
+    return " ".join(words)
+
+
+def ngrams(text: str, n: int = NGRAM) -> frozenset:
+    """Character n-grams of a text, padded with a space at both ends."""
+    text = f" {text} "
+    return frozenset(text[i:i + n] for i in range(max(len(text) - n + 1, 1)))
+
+
+class CountryMatcher:
+    """
+    Character n-gram blocking index over the spellings of the alias table.
+
+    Parameters:
+        aliases (dict): normalized spelling -> ISO3 code (None: the alias table of the registry)
+        n (int): length of the character n-grams
+        candidates (int): number of spellings a name is compared to
+        max_postings (int): n-grams in more spellings are not used for the blocking
+    """
+
+    def __init__(self, aliases: dict = None, n: int = NGRAM, candidates: int = CANDIDATES,
+                 max_postings: int = MAX_POSTINGS):
+        aliases = ALIASES if aliases is None else aliases
+        self.n = n
+        self.candidates = candidates
+        self.max_postings = max_postings
+        self.spellings = list(aliases)
+        self.iso3 = [aliases[spelling] for spelling in self.spellings]
+        self.grams = [ngrams(matching_key(spelling), n) for spelling in self.spellings]
+        self.postings = defaultdict(list)
+        for i, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings[gram].append(i)
+        self.size = len(aliases)
+
+    def _block(self, grams: frozenset) -> list:
+        """Indices of the spellings sharing the most rare n-grams with a name (all n-grams if none is rare)."""
+        postings = [self.postings[gram] for gram in grams if gram in self.postings]
+        rare = [ids for ids in postings if len(ids) <= self.max_postings] or postings
+        shared = Counter(i for ids in rare for i in ids)
+        return [i for i, _ in shared.most_common(self.candidates)]
+
+    def match(self, name: str) -> dict:
+        """Best match of one name: ISO3 code, matched spelling, score and margin to the best other country."""
+        grams = ngrams(matching_key(name), self.n)
+        scores = {}
+        for i in self._block(grams):
+            score = 2 * len(grams & self.grams[i]) / (len(grams) + len(self.grams[i]))
+            if score > scores.get(self.iso3[i], (0.0, None))[0]:
+                scores[self.iso3[i]] = (score, self.spellings[i])
+        if not scores:
+            return {"Name": name, "ISO3": None, "Country": None, "Matched": None, "Score": 0.0, "Margin": 0.0}
+        ranked = sorted(scores.items(), key=lambda item: item[1][0], reverse=True)
+        iso3, (score, spelling) = ranked[0]
+        runner_up = ranked[1][1][0] if len(ranked) > 1 else 0.0
+        return {"Name": name, "ISO3": iso3, "Country": NAMES[iso3], "Matched": spelling,
+                "Score": round(score, 3), "Margin": round(score - runner_up, 3)}
+
+    def match_all(self, names, threshold: float = THRESHOLD, margin: float = MARGIN) -> pd.DataFrame:
+        """
+        Best matches of several names, one row per distinct name.
+
+        Returns:
+            pd.DataFrame: Name, ISO3, Country (canonical name), Matched (spelling), Score, Margin, Accepted
+        """
+        names = pd.unique(pd.Series(names, dtype=object).dropna())
+        result = pd.DataFrame([self.match(name) for name in names],
+                              columns=["Name", "ISO3", "Country", "Matched", "Score", "Margin"])
+        result["Accepted"] = (result["Score"] >= threshold) & (result["Margin"] >= margin)
+        return result
+
+
+# index of the alias table, rebuilt when aliases were added
+_MATCHER = None
+
+
+def matcher() -> CountryMatcher:
+    """The blocking index of the current alias table of the registry."""
+    global _MATCHER
+    if _MATCHER is None or _MATCHER.size != len(ALIASES):
+        _MATCHER = CountryMatcher()
+    return _MATCHER
+
+
+def match_unknown(values, threshold: float = THRESHOLD, margin: float = MARGIN, save: bool = True,
+                  path: str = ALIAS_PATH) -> pd.DataFrame:
+    """
+    Matches the names that are not in the registry and adds the accepted matches to the alias table.
+
+    Parameters:
+        values: country names (e.g. a Country column); names of the registry are skipped
+        threshold (float): minimum score of an accepted match
+        margin (float): minimum lead of an accepted match over the best other country
+        save (bool): write the accepted matches to the alias file (else only add them for this process)
+        path (str): alias file
+
+    Returns:
+        pd.DataFrame: the matches of the unknown names (see CountryMatcher.match_all)
+    """
+    result = matcher().match_all(unknown_names(values), threshold, margin)
+    accepted = result[result["Accepted"]].rename(columns={"Name": "Alias"})
+    if not accepted.empty:
+        add_aliases(accepted, path if save else None)
+    return result
+
+
+def print_matches(matches: pd.DataFrame, label: str, review_score: float = 0.6) -> None:
+    """Prints the accepted matches and the rejected ones with a score of at least review_score."""
+    accepted = matches[matches["Accepted"]]
+    review = matches[~matches["Accepted"] & (matches["Score"] >= review_score)]
+    if not accepted.empty:
+        print(f"\n Country names in {label} data matched to the registry (total {len(accepted)}):")
+        for row in accepted.itertuples():
+            print(f"- {row.Name} -> {row.Country} ({row.Score:.2f})")
+    if not review.empty:
+        print(f"\n Country names in {label} data with a rejected match (total {len(review)}):")
+        for row in review.itertuples():
+            print(f"- {row.Name} ~ {row.Country} ({row.Score:.2f}, margin {row.Margin:.2f})")
@@ -0,0 +1,407 @@
+"""
+Country registry shared by the merging scripts: one alias table mapping every observed spelling of a country
+to its canonical name and ISO3 code.
+
+The spellings differ between the sources (ILOSTAT, Gallup, OECD Better Life Index, World Happiness Report), e.g.
+'Côte d’Ivoire' vs. 'Cote D'Ivoire', 'Hong Kong, S.A.R. Of China' vs. 'Hong Kong SAR of China', 'Viet Nam' vs.
+'Vietnam'. Before the lookup, every spelling is normalized (normalize_name): lower case, no accents, curly quotes and
+long dashes replaced, commas, periods and parentheses removed, whitespace collapsed, a leading "the" dropped.
+The alias table (COUNTRIES) is normalized once at import.
+
+Merges join on the country key: the ISO3 code for the countries of the registry and the normalized spelling for
+everything else (regions and aggregates like "World: High income"), so these still match between sources:
+
+    check_distinct_countries(df["Country"], "wages")  # ValueError if two spellings of the file are one country
+    df["Key"] = country_keys(df["Country"])         # "CIV", "HKG", ..., "world: high income"
+    df["Country"] = country_names(df["Country"])    # "Côte d’Ivoire", "Hong Kong SAR of China", ...
+    df["ISO3"] = iso3_codes(df["Country"])          # NaN for regions and aggregates
+
+The lookups are vectorized: the column is factorized, only its distinct values are resolved (a 300k rows column of
+200 countries needs 200 lookups), and the result is taken by the codes. Resolved spellings are memoized for the
+process, so a spelling is only normalized the first time it is seen.
+
+Spellings found by the fuzzy matching of unknown names (country_matching.py) are kept in the alias file
+data/country_aliases.csv (columns ALIAS_COLUMNS) and added to the alias table at import; the spellings of COUNTRIES
+take precedence over the alias file.
+
+Codes of territories without an ISO 3166 code are taken from the user-assigned range (XKX Kosovo, XNC North Cyprus,
+XSL Somaliland Region) or from the World Bank (CHI Channel Islands).
+"""
+import os
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from dataset_schemas import ROOT
+
+ALIAS_PATH = os.path.normpath(os.path.join(ROOT, "data", "country_aliases.csv"))
+# alias file: spelling, ISO3 code, score of the match and the spelling of the registry it was matched to
+ALIAS_COLUMNS = ["Alias", "ISO3", "Score", "Matched"]
+
+# ISO3 code -> (canonical name, other spellings); the canonical names are the ones of the World Happiness Report
+# (happinessindex.xlsx), spellings that only differ in case, accents or punctuation do not have to be listed
+COUNTRIES = {
+    "AFG": ("Afghanistan", []),
+    "ALB": ("Albania", []),
+    "DZA": ("Algeria", []),
+    "AND": ("Andorra", []),
+    "AGO": ("Angola", []),
+    "ATG": ("Antigua and Barbuda", []),
+    "ARG": ("Argentina", []),
+    "ARM": ("Armenia", []),
+    "ABW": ("Aruba", []),
+    "AUS": ("Australia", []),
+    "AUT": ("Austria", []),
+    "AZE": ("Azerbaijan", []),
+    "BHS": ("Bahamas", []),
+    "BHR": ("Bahrain", []),
+    "BGD": ("Bangladesh", []),
+    "BRB": ("Barbados", []),
+    "BLR": ("Belarus", []),
+    "BEL": ("Belgium", []),
+    "BLZ": ("Belize", []),
+    "BEN": ("Benin", []),
+    "BMU": ("Bermuda", []),
+    "BTN": ("Bhutan", []),
+    "BOL": ("Bolivia", ["Bolivia, Plurinational State of"]),
+    "BIH": ("Bosnia and Herzegovina", []),
+    "BWA": ("Botswana", []),
+    "BRA": ("Brazil", []),
+    "BRN": ("Brunei Darussalam", ["Brunei"]),
+    "BGR": ("Bulgaria", []),
+    "BFA": ("Burkina Faso", []),
+    "BDI": ("Burundi", []),
+    "CPV": ("Cabo Verde", ["Cape Verde"]),
+    "KHM": ("Cambodia", []),
+    "CMR": ("Cameroon", []),
+    "CAN": ("Canada", []),
+    "CYM": ("Cayman Islands", []),
+    "CAF": ("Central African Republic", []),
+    "TCD": ("Chad", []),
+    "CHI": ("Channel Islands", []),
+    "CHL": ("Chile", []),
+    "CHN": ("China", []),
+    "COL": ("Colombia", []),
+    "COM": ("Comoros", []),
+    "COG": ("Congo", ["Republic of the Congo", "Congo (Brazzaville)"]),
+    "COD": ("DR Congo", ["Democratic Republic of the Congo", "Democratic Republic of Congo",
+                         "Congo, Democratic Republic of the", "Congo (Kinshasa)"]),
+    "COK": ("Cook Islands", []),
+    "CRI": ("Costa Rica", []),
+    "CIV": ("Côte d’Ivoire", ["Ivory Coast"]),
+    "HRV": ("Croatia", []),
+    "CUB": ("Cuba", []),
+    "CUW": ("Curaçao", []),
+    "CYP": ("Cyprus", []),
+    "CZE": ("Czechia", ["Czech Republic"]),
+    "DNK": ("Denmark", []),
+    "DJI": ("Djibouti", []),
+    "DMA": ("Dominica", []),
+    "DOM": ("Dominican Republic", []),
+    "ECU": ("Ecuador", []),
+    "EGY": ("Egypt", ["Egypt, Arab Republic of"]),
+    "SLV": ("El Salvador", []),
+    "GNQ": ("Equatorial Guinea", []),
+    "ERI": ("Eritrea", []),
+    "EST": ("Estonia", []),
+    "SWZ": ("Eswatini", ["Swaziland"]),
+    "ETH": ("Ethiopia", []),
+    "FLK": ("Falkland Islands", ["Falkland Islands, Malvinas"]),
+    "FJI": ("Fiji", []),
+    "FIN": ("Finland", []),
+    "FRA": ("France", []),
+    "GUF": ("French Guiana", []),
+    "PYF": ("French Polynesia", []),
+    "GAB": ("Gabon", []),
+    "GMB": ("Gambia", []),
+    "GEO": ("Georgia", []),
+    "DEU": ("Germany", []),
+    "GHA": ("Ghana", []),
+    "GRC": ("Greece", []),
+    "GRL": ("Greenland", []),
+    "GRD": ("Grenada", []),
+    "GLP": ("Guadeloupe", []),
+    "GUM": ("Guam", []),
+    "GTM": ("Guatemala", []),
+    "GGY": ("Guernsey", []),
+    "GIN": ("Guinea", []),
+    "GNB": ("Guinea-Bissau", []),
+    "GUY": ("Guyana", []),
+    "HTI": ("Haiti", []),
+    "HND": ("Honduras", []),
+    "HKG": ("Hong Kong SAR of China", ["Hong Kong", "Hong Kong, China", "Hong Kong SAR, China"]),
+    "HUN": ("Hungary", []),
+    "ISL": ("Iceland", []),
+    "IND": ("India", []),
+    "IDN": ("Indonesia", []),
+    "IRN": ("Iran", ["Iran, Islamic Republic of"]),
+    "IRQ": ("Iraq", []),
+    "IRL": ("Ireland", []),
+    "IMN": ("Isle of Man", []),
+    "ISR": ("Israel", []),
+    "ITA": ("Italy", []),
+    "JAM": ("Jamaica", []),
+    "JPN": ("Japan", []),
+    "JEY": ("Jersey", []),
+    "JOR": ("Jordan", []),
+    "KAZ": ("Kazakhstan", []),
+    "KEN": ("Kenya", []),
+    "KIR": ("Kiribati", []),
+    "XKX": ("Kosovo", []),
+    "KWT": ("Kuwait", []),
+    "KGZ": ("Kyrgyzstan", ["Kyrgyz Republic"]),
+    "LAO": ("Lao PDR", ["Lao People's Democratic Republic", "Laos"]),
+    "LVA": ("Latvia", []),
+    "LBN": ("Lebanon", []),
+    "LSO": ("Lesotho", []),
+    "LBR": ("Liberia", []),
+    "LBY": ("Libya", []),
+    "LTU": ("Lithuania", []),
+    "LUX": ("Luxembourg", []),
+    "MAC": ("Macao", ["Macao, China", "Macau, China", "Macau", "Macao SAR of China"]),
+    "MDG": ("Madagascar", []),
+    "MWI": ("Malawi", []),
+    "MYS": ("Malaysia", []),
+    "MDV": ("Maldives", []),
+    "MLI": ("Mali", []),
+    "MLT": ("Malta", []),
+    "MHL": ("Marshall Islands", []),
+    "MTQ": ("Martinique", []),
+    "MRT": ("Mauritania", []),
+    "MUS": ("Mauritius", []),
+    "MEX": ("Mexico", []),
+    "FSM": ("Micronesia", ["Micronesia, Federated States of"]),
+    "MDA": ("Republic of Moldova", ["Moldova", "Moldova, Republic of"]),
+    "MCO": ("Monaco", []),
+    "MNG": ("Mongolia", []),
+    "MNE": ("Montenegro", []),
+    "MSR": ("Montserrat", []),
+    "MAR": ("Morocco", []),
+    "MOZ": ("Mozambique", []),
+    "MMR": ("Myanmar", []),
+    "NAM": ("Namibia", []),
+    "NRU": ("Nauru", []),
+    "NPL": ("Nepal", []),
+    "NLD": ("Netherlands", ["Netherlands (Kingdom of the)"]),
+    "NCL": ("New Caledonia", []),
+    "NZL": ("New Zealand", []),
+    "NIC": ("Nicaragua", []),
+    "NER": ("Niger", []),
+    "NGA": ("Nigeria", []),
+    "NIU": ("Niue", []),
+    "MKD": ("North Macedonia", ["Macedonia"]),
+    "XNC": ("North Cyprus", ["Northern Cyprus"]),
+    "NOR": ("Norway", []),
+    "OMN": ("Oman", []),
+    "PAK": ("Pakistan", []),
+    "PLW": ("Palau", []),
+    "PSE": ("State of Palestine", ["Occupied Palestinian Territory", "Palestinian Territories", "Palestine"]),
+    "PAN": ("Panama", []),
+    "PNG": ("Papua New Guinea", []),
+    "PRY": ("Paraguay", []),
+    "PER": ("Peru", []),
+    "PHL": ("Philippines", []),
+    "POL": ("Poland", []),
+    "PRT": ("Portugal", []),
+    "PRI": ("Puerto Rico", []),
+    "QAT": ("Qatar", []),
+    "KOR": ("Republic of Korea", ["Korea", "South Korea", "Korea, Republic of"]),
+    "PRK": ("Democratic People's Republic of Korea", ["North Korea", "Korea, Democratic People's Republic of",
+                                                      "Korea (the Democratic People's Republic of)"]),
+    "REU": ("Réunion", []),
+    "ROU": ("Romania", []),
+    "RUS": ("Russian Federation", ["Russia"]),
+    "RWA": ("Rwanda", []),
+    "KNA": ("Saint Kitts and Nevis", []),
+    "LCA": ("Saint Lucia", []),
+    "VCT": ("Saint Vincent and the Grenadines", []),
+    "WSM": ("Samoa", []),
+    "SMR": ("San Marino", []),
+    "STP": ("Sao Tome and Principe", []),
+    "SAU": ("Saudi Arabia", []),
+    "SEN": ("Senegal", []),
+    "SRB": ("Serbia", []),
+    "SYC": ("Seychelles", []),
+    "SLE": ("Sierra Leone", []),
+    "SGP": ("Singapore", []),
+    "SVK": ("Slovakia", ["Slovak Republic"]),
+    "SVN": ("Slovenia", []),
+    "SLB": ("Solomon Islands", []),
+    "SOM": ("Somalia", []),
+    "XSL": ("Somaliland Region", ["Somaliland"]),
+    "ZAF": ("South Africa", []),
+    "SSD": ("South Sudan", []),
+    "ESP": ("Spain", []),
+    "LKA": ("Sri Lanka", []),
+    "SDN": ("Sudan", []),
+    "SUR": ("Suriname", []),
+    "SWE": ("Sweden", []),
+    "CHE": ("Switzerland", []),
+    "SYR": ("Syria", ["Syrian Arab Republic"]),
+    "TWN": ("Taiwan Province of China", ["Taiwan", "Taiwan, China"]),
+    "TJK": ("Tajikistan", []),
+    "TZA": ("Tanzania", ["Tanzania, United Republic of", "United Republic of Tanzania"]),
+    "THA": ("Thailand", []),
+    "TLS": ("Timor-Leste", []),
+    "TGO": ("Togo", []),
+    "TON": ("Tonga", []),
+    "TTO": ("Trinidad and Tobago", []),
+    "TUN": ("Tunisia", []),
+    "TUR": ("Türkiye", ["Turkey"]),
+    "TKM": ("Turkmenistan", []),
+    "TUV": ("Tuvalu", []),
+    "UGA": ("Uganda", []),
+    "UKR": ("Ukraine", []),
+    "ARE": ("United Arab Emirates", []),
+    "GBR": ("United Kingdom", ["United Kingdom of Great Britain and Northern Ireland"]),
+    "USA": ("United States", ["United States of America"]),
+    "VIR": ("United States Virgin Islands", []),
+    "URY": ("Uruguay", []),
+    "UZB": ("Uzbekistan", []),
+    "VUT": ("Vanuatu", []),
+    "VEN": ("Venezuela", ["Venezuela, Bolivarian Republic of"]),
+    "VNM": ("Viet Nam", ["Vietnam"]),
+    "WLF": ("Wallis and Futuna", ["Wallis and Futuna Islands"]),
+    "ESH": ("Western Sahara", []),
+    "YEM": ("Yemen", []),
+    "ZMB": ("Zambia", []),
+    "ZWE": ("Zimbabwe", []),
+}
+
+# characters replaced before the lookup: curly quotes, long dashes, punctuation
+_REPLACE = str.maketrans({"’": "'", "‘": "'", "–": "-", "—": "-", ",": "", ".": "", "(": " ", ")": " "})
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalized spelling of a country name, used as lookup key of the alias table.
+
+    - lower case, accents removed ('Côte' -> 'cote', 'Türkiye' -> 'turkiye')
+    - curly quotes and long dashes replaced, commas, periods and parentheses removed
+    - whitespace collapsed, a leading "the" dropped ('The Gambia' -> 'gambia')
+    """
+    name = unicodedata.normalize("NFKD", str(name).translate(_REPLACE))
+    name = "".join(char for char in name if not unicodedata.combining(char)).lower()
+    words = name.split()
+    if words[:1] == ["the"] and len(words) > 1:
+        words = words[1:]
+    return " ".join(words)
+
+
+def read_alias_file(path: str = ALIAS_PATH) -> pd.DataFrame:
+    """The matched spellings of the alias file (empty if there is no alias file)."""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=ALIAS_COLUMNS)
+    return pd.read_csv(path, keep_default_na=False, na_values=[""])
+
+
+def _build_aliases(path: str = ALIAS_PATH) -> dict:
+    """Alias table: normalized spelling -> ISO3 code, from COUNTRIES and the alias file."""
+    aliases = {}
+    for iso3, (name, spellings) in COUNTRIES.items():
+        for spelling in [name, *spellings]:
+            key = normalize_name(spelling)
+            if aliases.get(key, iso3) != iso3:
+                raise ValueError(f"Spelling '{spelling}' is used for {aliases[key]} and {iso3}")
+            aliases[key] = iso3
+    learned = read_alias_file(path)
+    for spelling, iso3 in zip(learned["Alias"], learned["ISO3"]):
+        if iso3 in COUNTRIES:
+            aliases.setdefault(normalize_name(spelling), iso3)
+    return aliases
+
+
+ALIASES = _build_aliases()
+NAMES = {iso3: name for iso3, (name, _) in COUNTRIES.items()}
+
+# spelling -> (key, ISO3 code or None, name) of every spelling resolved in this process
+_MEMO = {}
+
+
+def resolve(name) -> tuple:
+    """(key, ISO3 code or None, name) of one spelling; unknown countries keep their (stripped) spelling as name."""
+    try:
+        return _MEMO[name]
+    except KeyError:
+        pass
+    key = normalize_name(name)
+    iso3 = ALIASES.get(key)
+    result = (iso3, iso3, NAMES[iso3]) if iso3 else (key, None, str(name).strip())
+    _MEMO[name] = result
+    return result
+
+
+def add_aliases(matches: pd.DataFrame, path: str = ALIAS_PATH) -> pd.DataFrame:
+    """
+    Adds matched spellings to the alias table and appends them to the alias file.
+
+    Parameters:
+        matches (pd.DataFrame): the matches, columns ALIAS_COLUMNS
+        path (str): alias file (None: only add them for this process)
+
+    Returns:
+        pd.DataFrame: the matches that were new (spellings already in the alias table are skipped)
+    """
+    matches = matches[ALIAS_COLUMNS]
+    keys = matches["Alias"].map(normalize_name)
+    new = matches[~keys.isin(ALIASES) & matches["ISO3"].isin(COUNTRIES)].drop_duplicates(subset="Alias")
+    if new.empty:
+        return new
+    for spelling, iso3 in zip(new["Alias"], new["ISO3"]):
+        ALIASES[normalize_name(spelling)] = iso3
+    _MEMO.clear()  # spellings resolved as unknown before
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        new.to_csv(path, mode="a", index=False, header=not os.path.exists(path))
+    return new
+
+
+def _lookup(values, field: int) -> pd.Series:
+    """One field of resolve() for every value: the distinct values are resolved once and taken by their codes."""
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values)
+    # the last entry is used for the missing values (code -1)
+    resolved = np.array([resolve(value)[field] for value in uniques] + [None], dtype=object)
+    result = pd.Series(resolved[codes], index=values.index, name=values.name)
+    return result.where(result.notna(), np.nan)
+
+
+def country_keys(values) -> pd.Series:
+    """Merge keys of country names: ISO3 code for the countries of the registry, else the normalized spelling."""
+    return _lookup(values, 0)
+
+
+def iso3_codes(values) -> pd.Series:
+    """ISO3 codes of country names, NaN for names that are not in the registry (regions, aggregates)."""
+    return _lookup(values, 1)
+
+
+def country_names(values) -> pd.Series:
+    """Canonical names of country names; names that are not in the registry are kept (stripped)."""
+    return _lookup(values, 2)
+
+
+def shared_codes(values) -> dict:
+    """ISO3 code -> distinct spellings, for the codes that several different spellings of values resolve to."""
+    spellings = pd.Series(pd.unique(pd.Series(values).dropna()))
+    codes = iso3_codes(spellings)
+    shared = spellings.groupby(codes, sort=True).agg(list)
+    return {iso3: names for iso3, names in shared.items() if len(names) > 1}
+
+
+def check_distinct_countries(values, source: str = "input") -> None:
+    """
+    Raises ValueError if two different spellings of one source resolve to the same ISO3 code: then an alias is
+    too broad (e.g. a bare "Korea" for both Koreas) and the rows of two countries would be joined as one.
+    """
+    shared = shared_codes(values)
+    if shared:
+        details = "; ".join(f"{iso3}: {' / '.join(map(str, names))}" for iso3, names in shared.items())
+        raise ValueError(f"Different spellings of one country in {source}: {details}")
+
+
+def unknown_names(values) -> list:
+    """The distinct names that are not in the registry, sorted."""
+    values = pd.Series(pd.unique(pd.Series(values).dropna()))
+    return sorted(values[iso3_codes(values).isna()].astype(str))
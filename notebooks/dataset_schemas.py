@@ -0,0 +1,220 @@
+"""
+Schemas of the raw datasets, used by the cleaning scripts to read the raw csv files typed.
+
+Every dataset declares its columns with a dtype and a unit:
+- "text":        read as text and kept as text (e.g. Country)
+- "number text": read as text and converted by numeric_parsing.parse_numeric (e.g. "72.1%", "$18,774")
+- "float64", "Int64", "category": typed by pd.read_csv while reading
+The unit of a column ("%", "$", "USD", "years", ...) is stored in df.attrs["units"].
+
+read_raw() reads only the declared columns (usecols) with explicit dtypes and NA tokens (NA_VALUES), so the
+plain numbers are parsed in C at load time and only the "number text" columns are left to parse_numeric.
+The pyarrow csv engine is used when pyarrow is installed, otherwise the C engine of pandas.
+
+    from dataset_schemas import read_raw, number_text_columns
+    df = read_raw("working_time")
+    df[number_text_columns("working_time")] = parse_numeric(df, number_text_columns("working_time"))
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# tokens for missing values in the scraped tables (in addition to the defaults of pandas, e.g. empty cells)
+NA_VALUES = ["N/A", "-", "–", "nan", "NaN"]
+
+# column types read as text
+TEXT_TYPES = {"text", "number text"}
+
+# Better Life Index: the topic indices (0-10) and the inequality ratios are plain numbers, the indicators have units
+BLI_COLUMNS = (
+    [("Country", "text", None)]
+    + [(col, "float64", None) for col in ["Population", "Visitors", "Renewable_Energy"]]
+    + [(col, "float64", "index") for col in [
+        "Housing", "Income", "Jobs", "Community", "Education", "Environment", "Civic_Engagement", "Health",
+        "Life_Satisfaction", "Safety", "Work_Life_Balance"]]
+    + [
+        ("Rooms_per_person", "number text", "rooms"),
+        ("Basic_Facilities", "number text", "%"),
+        ("Housing_Expenditure", "number text", "%"),
+        ("Net_Disposable_Income", "number text", "USD"),
+        ("Social_Inequality_Income", "float64", "ratio"),
+        ("Net_wealth", "number text", "USD"),
+        ("Employment_Rate", "number text", "%"),
+        ("Gender_Inequality_Employment", "float64", "ratio"),
+        ("Social_Inequality_Employment", "float64", "ratio"),
+        ("Long_Term_Unemployment", "number text", "%"),
+        ("Gender_Inequality_Unemployment", "float64", "ratio"),
+        ("Social_Inequality_Unemployment", "float64", "ratio"),
+        ("Personal_Earnings", "number text", "USD"),
+        ("Gender_Inequality_Earnings", "float64", "ratio"),
+        ("Social_Inequality_Earnings", "float64", "ratio"),
+        ("Job_Security", "number text", "%"),
+        ("Quality_of_Support_Network", "number text", "%"),
+        ("Gender_Inequality_Community", "float64", "ratio"),
+        ("Social_Inequality_Community", "float64", "ratio"),
+        ("Educational_Attainment", "number text", "%"),
+        ("Gender_Inequality_Education", "float64", "ratio"),
+        ("Student_Skills", "number text", "score"),
+        ("Gender_Inequality_Skills", "float64", "ratio"),
+        ("Social_Inequality_Skills", "float64", "ratio"),
+        ("Years_in_Education", "number text", "years"),
+        ("Gender_Inequality_Years_Education", "float64", "ratio"),
+        ("Air_Pollution", "number text", "micrograms"),
+        ("Water_Quality", "number text", "%"),
+        ("Voter_Turnout", "number text", "%"),
+        ("Gender_Inequality_Voter", "float64", "ratio"),
+        ("Social_Inequality_Voter", "float64", "ratio"),
+        ("Stakeholder_Engagement", "number text", "index"),
+        ("Life_Expectancy", "number text", "years"),
+        ("Gender_Inequality_Life_Expectancy", "float64", "ratio"),
+        ("Self_Reported_Health", "number text", "%"),
+        ("Gender_Inequality_Health", "float64", "ratio"),
+        ("Social_Inequality_Health", "float64", "ratio"),
+        ("Life_Satisfaction_2", "number text", "rate"),
+        ("Gender_Inequality_Satisfaction", "float64", "ratio"),
+        ("Social_Inequality_Satisfaction", "float64", "ratio"),
+        ("Safe_at_Night", "number text", "%"),
+        ("Gender_Inequality_Safety", "float64", "ratio"),
+        ("Homicide_Rate", "number text", "homicides"),
+        ("Gender_Inequality_Homicide", "float64", "ratio"),
+        ("Long_Hours", "number text", "%"),
+        ("Gender_Inequality_Long_Hours", "float64", "ratio"),
+        ("Free_Time", "number text", "hours"),
+        ("Gender_Inequality_Free_Time", "float64", "ratio"),
+    ]
+)
+
+# World Happiness Report: per factor the rank, the value and the share of the life evaluation it explains
+WHR_COLUMNS = [("Country", "text", None), ("Overall Rank", "float64", None),
+               ("Average Life Evaluation", "float64", None)]
+for factor, value_type, value_unit in [
+    ("Social support", "number text", "%"),
+    ("GDP per capita", "number text", "$"),
+    ("Healthy life expectancy", "float64", None),  # no values on the website
+    ("Freedom", "number text", "%"),
+    ("Generosity", "number text", "%"),
+    ("Perceptions of corruption", "number text", "%"),
+]:
+    WHR_COLUMNS += [(f"{factor} Rank", "float64", None), (f"{factor} Value", value_type, value_unit),
+                    (f"{factor} Explains", "number text", "%")]
+
+# dataset name -> raw csv (relative to the repository) and columns (name, dtype, unit)
+SCHEMAS = {
+    "betterlife": {
+        "path": "data/raw/betterlife.raw.csv",
+        "columns": BLI_COLUMNS,
+    },
+    "world_happiness_report": {
+        "path": "data/raw/world_happiness_report_raw.csv",
+        "columns": WHR_COLUMNS,
+    },
+    "happiness_by_age": {
+        "path": "data/raw/happiness_by_age_raw.csv",
+        "columns": [("Country", "text", None)]
+                   + [(col, "Int64", "rank") for col in ["All Ages", "The Young", "Lower Middle", "Upper Middle",
+                                                         "The Old"]]
+                   + [("Happiest", "category", None), ("Least Happy", "category", None)],
+    },
+    "gallup_emotions": {
+        "path": "data/raw/gallup_emotions_raw.csv",
+        "columns": [("Emotion", "text", None), ("Country", "text", None), ("YES", "number text", "%"),
+                    ("NO", "number text", "%"), ("DON'T KNOW/REFUSED", "number text", "%")],
+    },
+    "unemployment": {
+        "path": "data/raw/unemployment_and_labour_underutilization_raw.csv",
+        "columns": [("Country (year)", "text", None),
+                    ("Unemployment rate (LU1)", "number text", "%"),
+                    ("Combined rate of time-related underemployment and unemployment (LU2)", "number text", "%"),
+                    ("Combined rate of unemployment and potential labour force (LU3)", "number text", "%"),
+                    ("Composite rate of labour underutilization (LU4)", "number text", "%")],
+    },
+    "labour_productivity": {
+        "path": "data/raw/labour_productivity_raw.csv",
+        "columns": [("Country", "text", None), ("{'labour_productivity'}", "number text", "$")],
+    },
+    "safety_and_health": {
+        "path": "data/raw/safety_and_health_at_work_raw.csv",
+        "columns": [("Country", "text", None),
+                    ("Non-fatal occupational injuries per 100'000 workers", "number text", None),  # "9,421"
+                    ("Occupational fatalities per 100'000 workers", "float64", None),
+                    ("Inspectors per 10'000 employed persons", "float64", None)],
+    },
+    "wages": {
+        "path": "data/raw/wages_raw.csv",
+        "columns": [("Country (year)Type of minimum wage", "text", None), ("PPP $", "number text", "$"),
+                    ("US $", "number text", "$")],
+    },
+    "working_poverty": {
+        "path": "data/raw/working_poverty_raw.csv",
+        "columns": [("Country", "text", None), ("Extremely poor", "number text", "%"),
+                    ("Moderately poor", "number text", "%"), ("Not extremely or moderately poor", "number text", "%")],
+    },
+    "working_time": {
+        "path": "data/raw/working_time_raw.csv",
+        "columns": [("Country", "text", None), ("Average hours per week per employed person", "float64", "hours"),
+                    ("Share of employed working 49 or more hours per week", "number text", "%")],
+    },
+    "employment": {
+        "path": "data/raw/employment_raw.csv",
+        "columns": [("Country", "text", None), ("Employment to Population ratio", "number text", "%")],
+    },
+}
+
+
+def raw_path(name: str) -> str:
+    """Path of the raw csv file of a dataset."""
+    return os.path.normpath(os.path.join(ROOT, SCHEMAS[name]["path"]))
+
+
+def column_names(name: str) -> list:
+    return [col for col, _, _ in SCHEMAS[name]["columns"]]
+
+
+def number_text_columns(name: str) -> list:
+    """Columns of a dataset that are read as text and have to be converted by numeric_parsing.parse_numeric."""
+    return [col for col, dtype, _ in SCHEMAS[name]["columns"] if dtype == "number text"]
+
+
+def read_dtypes(name: str) -> dict:
+    """dtype argument of pd.read_csv for a dataset."""
+    # object, not str: the pyarrow engine converts missing values of str columns to the text "None"
+    return {col: object if dtype in TEXT_TYPES else dtype for col, dtype, _ in SCHEMAS[name]["columns"]}
+
+
+def read_raw(name: str, path: str = None, engine: str = None, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Reads the raw csv file of a dataset with its schema.
+
+    Parameters:
+        name (str): dataset name, key of SCHEMAS
+        path (str): csv file (default: the raw file of the dataset)
+        engine (str): csv engine of pd.read_csv (default: CSV_ENGINE)
+        read_csv_kwargs: further arguments of pd.read_csv
+
+    Returns:
+        pd.DataFrame: the declared columns in schema order, with the units in .attrs["units"]
+    """
+    columns = column_names(name)
+    df = pd.read_csv(
+        path or raw_path(name),
+        engine=engine or CSV_ENGINE,
+        usecols=columns,
+        dtype=read_dtypes(name),
+        na_values=SCHEMAS[name].get("na_values", NA_VALUES),
+        **read_csv_kwargs,
+    )
+    df = df[columns]
+    # missing text is None with the pyarrow engine, NaN with the C engine: NaN for both
+    text_columns = [col for col, dtype, _ in SCHEMAS[name]["columns"] if dtype in TEXT_TYPES]
+    df[text_columns] = df[text_columns].where(df[text_columns].notna(), np.nan)
+    df.attrs["units"] = {col: unit for col, _, unit in SCHEMAS[name]["columns"] if unit}
+    return df
@@ -0,0 +1,160 @@
+"""
+Per-entity fingerprint store for delta scraping.
+
+Most values on the scraped websites (Better Life Index, World Happiness Report, Gallup) change once a year,
+but every refresh used to extract every country again. With this store a scraper remembers, per entity
+(country, emotion, ...), a fingerprint of the page content it read and the record it extracted from it:
+
+    store = FingerprintStore("world_happiness_report")
+    fp = fingerprint(probe_text)          # cheap probe, e.g. one JavaScript call returning the text
+    record = store.lookup(country, fp)    # stored record if the content did not change, otherwise None
+    if record is None:
+        record = extract(...)             # full extraction only for changed (or new) entities
+        store.update(country, fp, record)
+    store.save(complete=True)             # the run visited every entity: entities not seen anymore are removed
+
+The probe has to be cheaper than the extraction, so it runs before the expensive waits and interactions: a
+conditional HTTP request of the page (Better Life Index) or page_data_fingerprint(), one in-page call right after
+the page load that hashes the data the page downloaded (World Happiness Report dashboard, Gallup emotions), before
+any country or emotion is selected.
+
+An entity that could not be probed or extracted in this run keeps its stored record (keep()), so a transient
+failure does not drop it from the csv. The merged raw csv is then built from the stored and the new records. If
+nothing changed, has_changes() is False and the scrapers keep the existing csv file, so a routine refresh is mostly
+a no-op. An entity that disappeared from the website is a change once: save(complete=True) removes its entry.
+
+The stores are kept in ../data/cache/fingerprints/<name>.json. Set SCRAPER_FULL_REFRESH=1 (or pass
+full_refresh=True) to extract every entity again.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "cache", "fingerprints")
+FULL_REFRESH_ENV = "SCRAPER_FULL_REFRESH"
+
+
+# In-page probe of the data a page downloaded: SHA-256 of the inline scripts, of the scripts of the page's own host
+# and of all fetch/XHR responses (read again from the browser cache), sorted by URL without query
+PAGE_DATA_PROBE_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const digest = async text => {
+    if (!(window.crypto && crypto.subtle)) return text;
+    const hash = await crypto.subtle.digest("SHA-256", new TextEncoder().encode(text));
+    return Array.from(new Uint8Array(hash), b => b.toString(16).padStart(2, "0")).join("");
+};
+const urls = [...new Set(performance.getEntriesByType("resource")
+    .filter(e => ["fetch", "xmlhttprequest"].includes(e.initiatorType)
+                 || (e.initiatorType === "script" && new URL(e.name).hostname === location.hostname))
+    .map(e => e.name))];
+const inline = Array.from(document.querySelectorAll("script:not([src])"), script => script.textContent);
+Promise.all(urls.map(url => fetch(url, {cache: "force-cache", credentials: "same-origin"})
+        .then(response => response.text()).then(digest).catch(e => "unavailable")
+        .then(hash => [url.split("?")[0], hash])))
+    .then(async bodies => done({inline: await Promise.all(inline.map(digest)),
+                                bodies: bodies.sort((a, b) => a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0)}))
+    .catch(e => done(null));
+"""
+
+
+def fingerprint(*parts) -> str:
+    """SHA-256 of the probed content (strings, or anything JSON can encode), whitespace runs collapsed."""
+    text = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def page_data_fingerprint(driver):
+    """
+    Fingerprint of the data a loaded page downloaded (PAGE_DATA_PROBE_SCRIPT, one asynchronous JavaScript call, no
+    interaction with the page); None if the page could not be probed.
+    """
+    try:
+        probe = driver.execute_async_script(PAGE_DATA_PROBE_SCRIPT)
+    except Exception as e:
+        print(f"Could not probe the page data: {e}")
+        return None
+    return None if probe is None else fingerprint(probe)
+
+
+class FingerprintStore:
+    """Fingerprint and last extracted record of every entity of one scraper."""
+
+    def __init__(self, name: str, directory: str = STORE_DIR, full_refresh: bool = None):
+        if full_refresh is None:
+            full_refresh = os.environ.get(FULL_REFRESH_ENV, "").strip().lower() in ("1", "true", "yes")
+        self.path = os.path.join(directory, name + ".json")
+        self.full_refresh = full_refresh
+        self.entries = {}  # entity -> {"fingerprint": ..., "record": ..., "updated_at": ...}
+        self.unchanged = 0
+        self.changed = 0
+        self.kept = 0
+        self.removed = 0
+        self._seen = set()
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def lookup(self, entity: str, fp: str):
+        """Returns the stored record if the entity still has this fingerprint, otherwise None (extract it again)."""
+        with self._lock:
+            self._seen.add(entity)
+            entry = self.entries.get(entity)
+            if self.full_refresh or entry is None or entry["fingerprint"] != fp:
+                return None
+            self.unchanged += 1
+            return entry["record"]
+
+    def update(self, entity: str, fp: str, record) -> None:
+        """Stores the fingerprint and the newly extracted record of an entity."""
+        with self._lock:
+            self._seen.add(entity)
+            self.entries[entity] = {"fingerprint": fp, "record": record, "updated_at": time.time()}
+            self.changed += 1
+
+    def keep(self, entity: str):
+        """
+        Returns the stored record of an entity that could not be probed or extracted in this run (None if there is
+        none). The entity counts as seen, so a transient failure does not count as a removed entity.
+        """
+        with self._lock:
+            self._seen.add(entity)
+            entry = self.entries.get(entity)
+            if entry is None:
+                return None
+            self.kept += 1
+            return entry["record"]
+
+    def touch(self, entity: str) -> None:
+        """Marks an entity as seen without probing it (e.g. already scraped by an interrupted run)."""
+        with self._lock:
+            self._seen.add(entity)
+
+    def has_changes(self) -> bool:
+        """True if an entity was new or changed in this run, or a stored entity was not seen anymore."""
+        return (self.changed > 0 or self.removed > 0
+                or any(entity not in self._seen for entity in self.entries))
+
+    def summary(self) -> str:
+        summary = f"{self.changed} changed, {self.unchanged} unchanged"
+        return summary + f", {self.kept} failed (stored record kept)" if self.kept else summary
+
+    def save(self, complete: bool = False) -> None:
+        """
+        Writes the store (via a temporary file, so an interrupted run never leaves a broken store).
+        complete=True: the run visited every entity of the website, the entries of entities that were not seen are
+        removed (otherwise every later run would report them as a change).
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            if complete:
+                unseen = [entity for entity in self.entries if entity not in self._seen]
+                for entity in unseen:
+                    del self.entries[entity]
+                self.removed += len(unseen)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,89 @@
+"""
+Source selection for the Gallup cleaning scripts: cached raw files or a new acquisition.
+
+Cleaning reads the raw csv files in ../data/raw/ by default, which takes milliseconds. The data is only acquired
+again (Gallup emotions: Selenium scraper, Gallup safety: Datawrapper downloads) when
+- refresh=True, or the GALLUP_REFRESH environment variable is set (refresh=None), or
+- the raw file does not exist, or
+- the raw file is older than max_age_days (stale, only checked if max_age_days is given).
+An acquisition writes the raw files, so the next cleaning run reads them again.
+
+    df_emotions = load_gallup_emotions()                  # raw csv, or scraped if missing/stale
+    df_safety, df_law_order = load_gallup_safety(refresh=True)
+"""
+import os
+import time
+
+import pandas as pd
+
+from dataset_schemas import ROOT, raw_path, read_raw
+
+REFRESH_ENV = "GALLUP_REFRESH"
+# Gallup publishes the data once a year: by default the raw files do not get stale (pass max_age_days to check)
+MAX_AGE_DAYS = None
+
+EMOTIONS_RAW_PATH = raw_path("gallup_emotions")
+SAFETY_RAW_PATH = os.path.normpath(os.path.join(ROOT, "data", "raw", "gallup_safety_raw.csv"))
+LAW_ORDER_RAW_PATH = os.path.normpath(os.path.join(ROOT, "data", "raw", "gallup_law_order_raw.csv"))
+
+
+def refresh_by_default() -> bool:
+    """True if the GALLUP_REFRESH environment variable is set (to anything but 0/false/no)."""
+    return os.environ.get(REFRESH_ENV, "").strip().lower() not in ("", "0", "false", "no")
+
+
+def acquire_reason(paths, refresh: bool = None, max_age_days: float = MAX_AGE_DAYS):
+    """Why the raw files have to be acquired again ("forced", "missing", "stale"), None if they can be read."""
+    refresh = refresh_by_default() if refresh is None else refresh
+    if refresh:
+        return "forced"
+    if not all(os.path.exists(path) for path in paths):
+        return "missing"
+    if max_age_days is not None:
+        oldest = min(os.path.getmtime(path) for path in paths)
+        if time.time() - oldest > max_age_days * 24 * 3600:
+            return "stale"
+    return None
+
+
+def load_gallup_emotions(path: str = EMOTIONS_RAW_PATH, refresh: bool = None, max_age_days: float = MAX_AGE_DAYS,
+                         **scrape_kwargs) -> pd.DataFrame:
+    """
+    Raw Gallup emotions table (Emotion, Country, YES, NO, DON'T KNOW/REFUSED), from the raw csv or scraped.
+
+    Parameters:
+        path (str): raw csv file
+        refresh (bool): scrape even if the raw csv is fresh (None: GALLUP_REFRESH environment variable)
+        max_age_days (float): age after which the raw csv is stale (None: never)
+        scrape_kwargs: further arguments of scrape_gallup_emotions (headless, lean, full_refresh)
+    """
+    reason = acquire_reason([path], refresh, max_age_days)
+    if reason is None:
+        print(f"Reading cached raw data {path}")
+        return read_raw("gallup_emotions", path)
+
+    from scrape_gallup_emotions import scrape_gallup_emotions
+    print(f"Scraping Gallup emotions ({reason} raw data)")
+    return scrape_gallup_emotions(save_path=path, **scrape_kwargs)
+
+
+def load_gallup_safety(safety_path: str = SAFETY_RAW_PATH, law_order_path: str = LAW_ORDER_RAW_PATH,
+                       refresh: bool = None, max_age_days: float = MAX_AGE_DAYS) -> tuple:
+    """
+    Raw Gallup Safety and Law & Order tables, from the raw csv files or downloaded (and saved as raw csv files).
+
+    Returns:
+        tuple: (df_safety, df_law_order)
+    """
+    reason = acquire_reason([safety_path, law_order_path], refresh, max_age_days)
+    if reason is None:
+        print(f"Reading cached raw data {safety_path}, {law_order_path}")
+        return pd.read_csv(safety_path), pd.read_csv(law_order_path)
+
+    from scrape_gallup_safety import get_gallup_dataframes
+    print(f"Downloading Gallup safety data ({reason} raw data)")
+    df_safety, df_law_order = get_gallup_dataframes()
+    os.makedirs(os.path.dirname(safety_path), exist_ok=True)
+    df_safety.to_csv(safety_path, index=False)
+    df_law_order.to_csv(law_order_path, index=False)
+    return df_safety, df_law_order
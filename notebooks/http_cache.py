@@ -0,0 +1,146 @@
+"""
+Shared HTTP layer for the scripts that download files (e.g. the Gallup Datawrapper CSVs).
+
+This module provides:
+- One pooled requests.Session (keep-alive connections, retries, browser User-Agent, timeouts)
+- An on-disk response cache keyed by URL in data/cache/http/ (relative to the repository, not the working directory)
+- Conditional GET revalidation: a cached response is only downloaded again when the server
+  reports a change (ETag / Last-Modified), otherwise the server answers "304 Not Modified" without a body
+- Parsing of CSV files straight from the cached bytes
+- Record/replay of the downloads together with the scraped pages (see page_archive.py)
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import page_archive
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "cache", "http")
+DEFAULT_TIMEOUT = 30
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Returns the shared session, created on first use, with pooled connections and retries."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retry)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"User-Agent": "Mozilla/5.0"})  # headers to mimic a browser
+            _session = session
+    return _session
+
+
+def _cache_paths(url: str, cache_dir: str) -> tuple:
+    """Returns the paths of the cached body and of its metadata (ETag, Last-Modified, time) for a URL."""
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key + ".body"), os.path.join(cache_dir, key + ".json")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Writes a file via a temporary file so an interrupted run never leaves a half-written cache entry."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read_cached_body(body_path: str):
+    """Returns the cached body, or None if it was removed in the meantime."""
+    try:
+        with open(body_path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def cached_get(url: str, cache_dir: str = CACHE_DIR, session: requests.Session = None,
+               timeout: float = DEFAULT_TIMEOUT, max_age: float = None) -> bytes:
+    """
+    Returns the body of a URL, using the on-disk cache.
+
+    - If the cached copy is younger than max_age seconds, it is returned without contacting the server.
+    - Otherwise the server is asked whether the file changed since the cached copy (If-None-Match /
+      If-Modified-Since). On "304 Not Modified" the cached copy is returned, nothing is downloaded
+      (a 304 without a cached copy is treated as a cache miss).
+    - Only new or changed files are downloaded and stored in the cache.
+    """
+    # Offline replay: serve the recorded download, no network at all
+    archive_mode = page_archive.get_mode()
+    if archive_mode == "replay":
+        found = page_archive.get_archive().get(url)
+        if found is None:
+            raise FileNotFoundError(f"{url} was not recorded in the page archive")
+        return found[0]
+
+    os.makedirs(cache_dir, exist_ok=True)
+    body_path, meta_path = _cache_paths(url, cache_dir)
+
+    meta = None
+    if os.path.exists(body_path) and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+
+        # Fresh enough: no request at all
+        if max_age is not None and time.time() - meta.get("fetched_at", 0) < max_age:
+            with open(body_path, "rb") as f:
+                return f.read()
+
+    # Conditional request: the server only sends the body if it changed
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    session = session or get_session()
+    response = session.get(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304:
+        content = _read_cached_body(body_path) if meta else None
+        if content is not None:
+            meta["fetched_at"] = time.time()
+            _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+            if archive_mode == "record":
+                page_archive.get_archive().put(url, content, meta.get("content_type") or "application/octet-stream")
+            return content
+        # "Not Modified" but no cached copy to return: a cache miss, download the file without conditions
+        response = session.get(url, timeout=timeout)
+        if response.status_code == 304:
+            raise requests.HTTPError(f"304 Not Modified for {url} without a cached copy", response=response)
+
+    response.raise_for_status()
+    content = response.content
+    _write_atomic(body_path, content)
+    meta = {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "content_type": response.headers.get("Content-Type"),
+        "fetched_at": time.time(),
+    }
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+    if archive_mode == "record":
+        page_archive.get_archive().put(url, content, meta["content_type"] or "application/octet-stream")
+    return content
+
+
+def read_csv_cached(url: str, cache_dir: str = CACHE_DIR, max_age: float = None, **read_csv_kwargs) -> pd.DataFrame:
+    """Reads a CSV file from a URL via the cache, parsing it directly from the cached bytes."""
+    content = cached_get(url, cache_dir=cache_dir, max_age=max_age)
+    return pd.read_csv(io.BytesIO(content), **read_csv_kwargs)
@@ -0,0 +1,198 @@
+"""
+Streaming ingestion of ILOSTAT bulk CSV files.
+
+The topic pages scraped by ILOScraper only show the latest value per country. ILOSTAT also publishes every
+indicator as a (gzipped) bulk CSV file with the full series per country, year, sex and age/classification:
+    https://ilostat.ilo.org/data/bulk/
+These files can be several GB large, so they are never loaded at once:
+
+- the file is read in chunks (pd.read_csv(chunksize=...)), only the needed columns (usecols), with
+  categorical dtypes for the repeated codes (country, indicator, sex, classification)
+- every chunk is filtered to the wanted indicators and appended to a partitioned output:
+      <output_dir>/<indicator>/<name of the bulk file>.csv
+  so at most one chunk is in memory, whatever the size of the file
+- latest_values() reduces a partition (again chunk by chunk) to the latest value per country, in the
+  layout of the scraped topic tables ("Country (year)", value column). The result is cleaned and validated
+  like the scraped table of the topic (cleaning function and rules of clean_ilostat_all.TOPICS)
+
+make_sample_bulk_file() writes a small bulk file with the standard columns for local tests:
+    python ingest_ilostat_bulk.py                    (sample file)
+    python ingest_ilostat_bulk.py <bulk file> ...    (downloaded bulk files)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from clean_ilostat_all import TOPICS
+from validation import validate
+
+BULK_DIR = "../data/ilostat_bulk"
+SAMPLE_PATH = "../data/cache/ilostat_bulk_sample.csv.gz"
+CHUNKSIZE = 200_000
+
+# Columns of the bulk files that are kept, and their dtypes
+BULK_COLUMNS = ["ref_area", "indicator", "sex", "classif1", "time", "obs_value"]
+BULK_DTYPES = {
+    "ref_area": "category",
+    "ref_area.label": "category",
+    "indicator": "category",
+    "sex": "category",
+    "classif1": "category",
+    "time": str,
+    "obs_value": "float64",
+}
+
+# Indicator code -> value column of the scraped topic table it corresponds to.
+# GDP_211P_NOC_NB is the output per hour worked (the labour productivity topic page), not GDP_205U_NOC_NB (output
+# per worker, values in the ten thousands)
+INDICATORS = {
+    "EMP_DWAP_SEX_AGE_RT": "Employment to Population ratio",
+    "GDP_211P_NOC_NB": "{'labour_productivity'}",
+}
+
+# Topic of clean_ilostat_all.TOPICS (cleaning function and validation rules) for the table of an indicator
+INDICATOR_TOPICS = {
+    "EMP_DWAP_SEX_AGE_RT": "employment",
+    "GDP_211P_NOC_NB": "labour_productivity",
+}
+
+# Sample bulk file: indicator -> (broken down by sex and age, range of the values) like the real series:
+# rates in percent by sex and age, output per hour worked in $ (PPP) without breakdowns ("NOC": no classification)
+SAMPLE_INDICATORS = {
+    "EMP_DWAP_SEX_AGE_RT": (True, (30, 85)),
+    "GDP_211P_NOC_NB": (False, (2, 150)),
+    "UNE_DEAP_SEX_AGE_RT": (True, (1, 30)),  # not in INDICATORS, filtered out
+}
+
+# Totals: both sexes, all ages
+TOTAL_SEX = "SEX_T"
+TOTAL_CLASSIF1 = "AGE_YTHADULT_YGE15"
+
+
+def read_bulk_chunks(path: str, indicators=None, chunksize: int = CHUNKSIZE):
+    """Yields the chunks of a bulk file (only BULK_COLUMNS, plus ref_area.label if the file has it),
+    filtered to the given indicator codes (None: all)."""
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [col for col in BULK_COLUMNS + ["ref_area.label"] if col in header]
+    dtypes = {col: dtype for col, dtype in BULK_DTYPES.items() if col in usecols}
+
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+        if indicators is not None:
+            chunk = chunk[chunk["indicator"].isin(indicators)]
+        if not chunk.empty:
+            yield chunk
+
+
+def ingest_bulk_file(path: str, output_dir: str = BULK_DIR, indicators=None, chunksize: int = CHUNKSIZE) -> dict:
+    """
+    Streams a bulk file into partitioned csv files <output_dir>/<indicator>/<file name>.csv.
+    A partition written from the same bulk file before is replaced.
+
+    Returns:
+        dict: indicator -> (path of the partition, number of rows)
+    """
+    name = os.path.basename(path).split(".")[0]
+    partitions = {}
+
+    for chunk in read_bulk_chunks(path, indicators, chunksize):
+        for indicator, part in chunk.groupby("indicator", observed=True):
+            part_path = os.path.join(output_dir, str(indicator), name + ".csv")
+            first_write = indicator not in partitions
+            if first_write:
+                os.makedirs(os.path.dirname(part_path), exist_ok=True)
+                partitions[indicator] = (part_path, 0)
+            part.to_csv(part_path, mode="w" if first_write else "a", header=first_write, index=False)
+            partitions[indicator] = (part_path, partitions[indicator][1] + len(part))
+
+    for indicator, (part_path, rows) in partitions.items():
+        print(f"{indicator}: {rows} rows -> {part_path}")
+    return partitions
+
+
+def latest_values(part_path: str, value_column: str, sex: str = TOTAL_SEX, classif1: str = TOTAL_CLASSIF1,
+                  chunksize: int = CHUNKSIZE) -> pd.DataFrame:
+    """
+    Reduces a partition to the latest value per country, in the layout of the scraped topic tables:
+    first column "Country (year)" (the year is removed by clean_country_names), second column the value.
+    Rows of other sexes/classifications are skipped; indicators without these dimensions are kept as they are.
+    """
+    latest = None
+    for chunk in read_bulk_chunks(part_path, chunksize=chunksize):
+        if "sex" in chunk.columns and chunk["sex"].notna().any():
+            chunk = chunk[chunk["sex"] == sex]
+        if "classif1" in chunk.columns and chunk["classif1"].notna().any():
+            chunk = chunk[chunk["classif1"] == classif1]
+        chunk = chunk.dropna(subset=["obs_value"])
+
+        # keep only the latest row per country of the running result and this chunk
+        combined = chunk if latest is None else pd.concat([latest, chunk], ignore_index=True)
+        latest = combined.sort_values("time").drop_duplicates("ref_area", keep="last")
+
+    if latest is None:
+        return pd.DataFrame(columns=["Country (year)", value_column])
+
+    country = latest["ref_area.label"] if "ref_area.label" in latest.columns else latest["ref_area"]
+    table = pd.DataFrame({
+        "Country (year)": country.astype(str) + " (" + latest["time"].str[:4] + ")",
+        value_column: latest["obs_value"].to_numpy(),
+    })
+    return table.sort_values("Country (year)").reset_index(drop=True)
+
+
+def make_sample_bulk_file(path: str = SAMPLE_PATH, n_countries: int = 50, years=range(2000, 2025),
+                          indicators=None, seed: int = 0) -> str:
+    """
+    Writes a gzipped sample bulk file with the standard ILOSTAT columns (ref_area, source, indicator, sex,
+    classif1, classif2, time, obs_value, obs_status, note_classif, note_indicator, note_source) for tests.
+    The indicators (default: SAMPLE_INDICATORS) have the breakdowns and the scale of the real series.
+    """
+    rng = np.random.default_rng(seed)
+    indicators = {code: SAMPLE_INDICATORS[code] for code in indicators} if indicators else SAMPLE_INDICATORS
+    countries = [f"C{i:02d}" for i in range(n_countries)]
+    sexes = ["SEX_T", "SEX_M", "SEX_F"]
+    ages = ["AGE_YTHADULT_YGE15", "AGE_YTHADULT_Y15-24", "AGE_YTHADULT_YGE25"]
+
+    frames = []
+    for indicator, (breakdowns, (low, high)) in indicators.items():
+        # series without breakdowns have empty sex and classif1 columns
+        index = pd.MultiIndex.from_product([countries, [indicator], sexes if breakdowns else [np.nan],
+                                            ages if breakdowns else [np.nan], [str(y) for y in years]],
+                                           names=["ref_area", "indicator", "sex", "classif1", "time"])
+        df = index.to_frame(index=False)
+        df["obs_value"] = rng.uniform(low, high, len(df)).round(1)
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True)
+    df.insert(1, "source", "BA:1")
+    df.insert(5, "classif2", np.nan)
+    df["obs_status"] = np.nan
+    df["note_classif"] = np.nan
+    df["note_indicator"] = np.nan
+    df["note_source"] = "R1:3513"
+
+    # some countries have no data for the latest years
+    df = df[~((df["ref_area"].isin(countries[::7])) & (df["time"] > "2020"))]
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    df.to_csv(path, index=False, compression="gzip")
+    return path
+
+
+def main(paths=None, output_dir: str = BULK_DIR):
+    paths = paths or [make_sample_bulk_file()]
+    for path in paths:
+        print(f"\n--- Ingesting {path} ---")
+        partitions = ingest_bulk_file(path, output_dir, indicators=list(INDICATORS))
+
+        for indicator, (part_path, _) in partitions.items():
+            table = latest_values(part_path, INDICATORS[indicator])
+            topic = TOPICS[INDICATOR_TOPICS[indicator]]
+            cleaned = topic["clean"](table)
+            validate(cleaned, topic["rules"])
+            print(cleaned.head())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -15,13 +15,15 @@ date: 04.04.2025
 
 ##
 import pandas as pd
+from country_registry import country_keys
+from workbook_sidecar import load_happiness_index
 
 ## load data
 # load data (scraped and cleaned)
 df_WHR2024 = pd.read_csv("./data/clean/world_happiness_report_2024_clean.csv")
 
-# load downloaded data
-df_happiness = pd.read_excel("./data/clean/happinessindex.xlsx")
+# load downloaded data (parsed once, then read from its sidecar file, see workbook_sidecar.py)
+df_happiness = load_happiness_index()
 
 # inspect both datasets (df_happiness based on year 2024)
 df_WHR2024.head()
@@ -35,9 +37,11 @@ countries_WHR = df_WHR2024["Country"].unique()
 len(countries_happiness) #147
 len(countries_WHR) #164
 
-# check for matching countries
+# check for matching countries (on the ISO3 codes of the country registry, country_registry.py)
 countries_both = set(countries_WHR).intersection(set(countries_happiness))
 len(countries_both) #147 -> so all available countries from df_happiness are also in df_WHR2024
+keys_both = set(country_keys(countries_WHR)).intersection(set(country_keys(countries_happiness)))
+len(keys_both) #147
 
 print("Countries with no intersection between datasets: ", set(countries_WHR)-countries_both)
 # {'Cuba', 'Central African Republic', 'Syria', 'Guyana', 'Bhutan', 'Qatar', 'Turkmenistan', 'South Sudan', 'Burundi',
@@ -83,25 +87,27 @@ we merge the "Ladder scores" from the Years 2023,2022,2021,2020 from the happine
 df_happiness_years = df_happiness[df_happiness["Year"].isin([2023,2022,2021,2020])]
 # we only need columns "Country name", "Year", "Ladder score" and "Rank"
 df_happiness_years = df_happiness_years[["Country name", "Year", "Ladder score", "Rank"]]
+# merge key: ISO3 code of the country registry instead of the country name
+df_happiness_years["Key"] = country_keys(df_happiness_years["Country name"])
 
 # do a copy of original/main dataset df_WHR2024 before merging
 df_WHR2024_copy = df_WHR2024.copy()
+df_WHR2024_copy["Key"] = country_keys(df_WHR2024_copy["Country"])
 
 # add Ladder score and Rank for each year as new columns
 for year in [2023, 2022, 2021, 2020]:
     year_data = df_happiness_years[df_happiness_years["Year"] == year]
     # left merge the data with df_WHR2024_copy
     df_WHR2024_copy.columns
-    df_WHR2024_copy = df_WHR2024_copy.merge(year_data[["Country name", "Ladder score", "Rank"]],
+    df_WHR2024_copy = df_WHR2024_copy.merge(year_data[["Key", "Ladder score", "Rank"]],
                                             how = "left",
-                                            left_on = "Country",
-                                            right_on = "Country name")
+                                            on = "Key")
 
     # rename the columns to see the year
     df_WHR2024_copy = df_WHR2024_copy.rename(columns={"Ladder score": f"Ladder score {year}", "Rank": f"Rank {year}"})
 
-    # drop the redundant 'Country name' column
-    df_WHR2024_copy = df_WHR2024_copy.drop(columns=["Country name"])
+# drop the merge key
+df_WHR2024_copy = df_WHR2024_copy.drop(columns=["Key"])
 
 df_WHR2024_copy.head()
 df_WHR2024_copy.info()
@@ -6,9 +6,12 @@ This script merges multiple cleaned ILOSTAT (7 datasets) and 2 x Gallup datasets
 - ../data/clean/gallup_merge.csv
 
 For both, the script:
-- Standardizes and normalizes country names across sources for consistent merging.
+- Standardizes country names across sources with the country registry (country_registry.py) and merges
+  on the country keys (ISO3 codes; regions and aggregates: normalized names).
 - Adds the 2024 Happiness Index ("Ladder score") from cleaned data sourced from:
   https://data.worldhappiness.report/map
+- Matches country names that are not in the registry with the fuzzy matcher (country_matching.py); accepted
+  matches are saved to the alias file ../data/country_aliases.csv.
 - Prints unmatched countries to assist in troubleshooting merge mismatches.
 
 
@@ -17,114 +20,75 @@ Date: 05.04.2025
 """
 import pandas as pd
 import os
-from functools import reduce
+
+from country_matching import match_unknown, print_matches
+from country_registry import check_distinct_countries, country_keys, country_names
+from multiway_join import duplicate_keys, join_sources, provenance_summary
+from workbook_sidecar import read_workbook
 
 HAPPINESS_PATH = "../data/clean/happinessindex.xlsx"
 HAPPINESS_YEAR = 2024
 
-def normalize_text(s):
-    """
-    Cleans and standardizes country names to allow for consistent merging across datasets.
-    This function:
-    - Converts text to lowercase (standardizes casing)
-    - Replaces curly quotes and long dashes (common in copied/pasted text)
-    - Removes commas and periods (punctuation inconsistencies)
-    - Trims whitespace
-
-    Needed because of the different formatting for country names
-    (e.g., 'Côte d’Ivoire' vs. 'Cote d'Ivoire').
-    """
-    if not isinstance(s, str):
-        return s
-    return (
-        s.lower()
-        .replace("’", "'")
-        .replace("‘", "'")
-        .replace("–", "-")
-        .replace(",", "")
-        .replace(".", "")
-        .strip()
-    )
-
-def get_country_fixes():
-    """Returns a dictionary of known inconsistent country names mapped to standardized names for consistency."""
-    fixes = {
-        "czech republic": "czechia",
-        "cote d'ivoire": "côte d’ivoire",
-        "côte d'ivoire": "côte d’ivoire",
-        "democratic republic of the congo": "dr congo",
-        "democratic republic of congo": "dr congo",
-        "congo democratic republic of the": "dr congo",
-        "congo": "republic of the congo",
-        "the republic of the congo": "republic of the congo",
-        "occupied palestinian territory":"state of palestine",
-        "dr congo": "dr congo",
-        "hong kong": "hong kong sar of china",
-        "hong kong (sar of china)": "hong kong sar of china",
-        "hong kong, sar of china": "hong kong sar of china",
-        "hong kong china":"hong kong sar of china",
-        "moldova, republic of": "republic of moldova",
-        "moldova republic of": "republic of moldova",
-        "republic of moldova": "republic of moldova",
-        "netherlands (kingdom of the)": "netherlands",
-        "the netherlands": "netherlands",
-        "gambia": "gambia",
-        "the gambia": "gambia",
-        "lao people's democratic republic": "lao pdr",
-        "south korea": "republic of korea",
-        "korea republic of": "republic of korea",
-        "korea": "republic of korea",
-        "taiwan, province of china":"taiwan china" ,
-        "taiwan province of china":"taiwan china",
-        "united states": "united states of america",
-        "tanzania united republic of": "tanzania",
-        "viet nam": "vietnam",
-        "united kingdom of great britain and northern ireland": "united kingdom",
-        "iran islamic republic of": "iran",
-        "macau china":"macao"
-    }
-    return {k.lower(): v.lower() for k, v in fixes.items()}
-
 def load_happiness_data():
-    """Loads and filters the happiness index data for the selected year, normalizing country names.
-    Also standardizes inconsistencies using the get_country_fixes mapping."""
-    happiness_df = pd.read_excel(HAPPINESS_PATH)
+    """Loads and filters the happiness index data for the selected year, with the canonical country names
+    of the country registry. The workbook is only parsed once (workbook_sidecar.py)."""
+    happiness_df = read_workbook(HAPPINESS_PATH)
     happiness_df = happiness_df[happiness_df["Year"] == HAPPINESS_YEAR]
     happiness_df = happiness_df[["Country name", "Ladder score"]].rename(columns={"Country name": "Country", "Ladder score": "Happiness Index"})
-    happiness_df["Country"] = happiness_df["Country"].astype(str).apply(normalize_text)
-    happiness_df["Country"] = happiness_df["Country"].replace(get_country_fixes())
+    happiness_df["Country"] = country_names(happiness_df["Country"])
     return happiness_df
 
-def merge_dataframes(file_paths):
+def merge_dataframes(file_paths, return_provenance=False):
     """
-     Merges multiple CSV files into a single dataframe using outer joins.
-    - Normalizes country names from each file (using function)
-    - Applies country fixes for naming consistency (using function)
-    - Deduplicates any repeated column names
+     Merges multiple CSV files into a single dataframe with one outer join (multiway_join.py).
+    - Matches country names that are not in the country registry (fuzzy matching, saved to the alias file)
+    - Raises ValueError if two different country names of one file are the same country of the registry, or if
+      a country has several rows in one file (the rows are printed first)
+    - Joins the files on the country keys of the country registry (ISO3 codes)
+    - Replaces the country names of each file by the canonical names (using function)
+    - Coalesces repeated column names (the first file with a value wins) and prints which file won
     - Removes aggregate-only rows with no relevant data
+
+    With return_provenance=True, returns (merged_df, provenance): the file of every cell of merged_df.
     """
-    dataframes = []
+    dataframes = {}
     for path in file_paths:
         if os.path.exists(path):
             df = pd.read_csv(path)
             df.columns.values[0] = "Country" # Ensures consistent merging by renaming first column
-            df["Country"] = df["Country"].astype(str).apply(normalize_text)
-            df["Country"] = df["Country"].replace(get_country_fixes()) # Standardize country names
-            dataframes.append(df)
+            df = df.dropna(subset=["Country"]) # Rows without a country cannot be merged
+            dataframes[os.path.splitext(os.path.basename(path))[0]] = df
         else:
             print(f" File not found: {path}")
 
     if not dataframes:
         print(" No files to merge.")
-        return pd.DataFrame()
-
-    merged_df = reduce(lambda left, right: pd.merge(left, right, on="Country", how="outer", suffixes=('', '_dup')), dataframes)
-
-    for col in merged_df.columns:
-        if col.endswith('_dup'):
-            base_col = col.replace('_dup', '')
-            merged_df[base_col] = merged_df[base_col].combine_first(merged_df[col])
-            merged_df.drop(columns=[col], inplace=True)
+        return (pd.DataFrame(), pd.DataFrame()) if return_provenance else pd.DataFrame()
+
+    # Match the country names that are not in the registry (once for all files)
+    print_matches(match_unknown(pd.concat([df["Country"] for df in dataframes.values()])), "input")
+
+    for label, df in dataframes.items():
+        check_distinct_countries(df["Country"], label) # Two spellings of one country: an alias is too broad
+        df.insert(0, "Key", country_keys(df["Country"])) # Merge key: ISO3 code (regions: normalized name)
+        df["Country"] = country_names(df["Country"]) # Standardize country names
+
+    # Several rows of one country in a file are a conflict, not resolved by the order of the rows: show them
+    conflicts = duplicate_keys(dataframes, key="Key")
+    for label, keys in conflicts.items():
+        df = dataframes[label]
+        print(f"\n Countries with several rows in {label}:")
+        print(df[df["Key"].isin(keys)].to_string(index=False))
+
+    # One outer join of all files on the key (ValueError for the conflicts above); the country name is coalesced
+    # like the other repeated columns
+    merged_df, provenance = join_sources(dataframes, key="Key")
+    overlaps = provenance_summary(provenance.drop(columns=["Country"]))
+    if not overlaps.empty:
+        print("\n Repeated columns, number of values taken from each file:")
+        print(overlaps.to_string())
+    merged_df = merged_df.reset_index(drop=True)
+    provenance = provenance.reset_index(drop=True)
 
     #Remove the rows that only have values in "Employment to Population ratio %" to reduce noise from data
     #Also displays the rows removed to check that useful rows not accidently deleted
@@ -139,24 +103,32 @@ def merge_dataframes(file_paths):
             print(employment_only_rows[["Country", "Employment to Population ratio %"]])
             merged_df = merged_df[~(employment_only & merged_df["Employment to Population ratio %"].notna())]
 
-    return merged_df.sort_values("Country").reset_index(drop=True)
+    merged_df = merged_df.sort_values("Country")
+    if return_provenance:
+        provenance = provenance.loc[merged_df.index].reset_index(drop=True)
+        return merged_df.reset_index(drop=True), provenance
+    return merged_df.reset_index(drop=True)
 
 def merge_with_happiness(df, label):
-    """Merges the provided dataset with the happiness index dataset using standardized country names.
+    """Merges the provided dataset with the happiness index dataset on the country keys (ISO3 codes).
+    Country names that are not in the registry are matched first (fuzzy matching).
     Prints unmatched countries for troubleshooting."""
-    df["Country"] = df["Country"].astype(str).apply(normalize_text)
-    df["Country"] = df["Country"].replace(get_country_fixes())
-
     happiness_df = load_happiness_data()
+    print_matches(match_unknown(pd.concat([df["Country"], happiness_df["Country"]])), label)
+
+    df["Country"] = country_names(df["Country"])
+    keys = country_keys(df["Country"])
+    happiness_df["Country"] = country_names(happiness_df["Country"])
+    happiness_keys = country_keys(happiness_df["Country"])
 
     print("\nUnique countries in df:")
     print(sorted(df["Country"].unique()))
     print("\nUnique countries in happiness_df:")
     print(sorted(happiness_df["Country"].unique()))
 
-    merged = pd.merge(df, happiness_df, on="Country", how="left")
+    merged = pd.merge(df.assign(Key=keys), happiness_df.drop(columns=["Country"]).assign(Key=happiness_keys),
+                      on="Key", how="left").drop(columns=["Key"])
     merged = merged.drop_duplicates(subset=merged.columns.tolist()) #removes duplicate rows
-    merged["Country"] = merged["Country"].str.title()
 
     columns = merged.columns.tolist()
     if "Happiness Index" in columns:
@@ -169,7 +141,7 @@ def merge_with_happiness(df, label):
         for country in missing:
             print(f"- {country}")
 
-    missing_from_df = set(happiness_df["Country"]) - set(df["Country"])
+    missing_from_df = set(happiness_df.loc[~happiness_keys.isin(keys), "Country"])
     if missing_from_df:
         print(f"\n Countries in Happiness Index not found in {label} dataset:")
         for country in sorted(missing_from_df):
@@ -0,0 +1,99 @@
+"""
+Outer join of several data sources on one key column in a single alignment, with the provenance of every cell.
+
+Instead of folding the sources with one pd.merge per source (every merge copies the growing frame, overlapping
+columns come back as "_dup" columns that have to be resolved afterwards), every source is indexed by its key and
+all sources are aligned in one pd.concat(axis=1). Columns that are in several sources are coalesced: the value of
+the first source (in the given order) that has one wins. Which source won is computed for all cells at once:
+
+    joined, provenance = join_sources({"unemployment": df_unemployment, "wages": df_wages}, key="Key")
+    provenance_summary(provenance)      # cells per column and source
+
+The provenance frame has the shape of the joined frame and holds the label of the winning source of every cell
+(categorical, NaN if no source has a value). The cost grows linearly with the number of sources and cells.
+
+The key has to be unique within every source: rows with the same key in one source are a conflict (e.g. two
+countries resolved to the same ISO3 code), not something to coalesce, so join_sources raises ValueError for them
+(duplicate_keys lists them).
+"""
+import numpy as np
+import pandas as pd
+
+
+def join_sources(sources: dict, key: str = "Key") -> tuple:
+    """
+    Outer join of several DataFrames on a key column, overlapping columns coalesced in source order.
+
+    Parameters:
+        sources (dict): label -> DataFrame with the key column; the order of the dict is the precedence
+        key (str): the key column, unique within every source
+
+    Returns:
+        tuple: (joined, provenance) DataFrames indexed by the key; columns in the order of their first source
+
+    Raises:
+        ValueError: if a key is in several rows of one source (see duplicate_keys)
+    """
+    conflicts = duplicate_keys(sources, key)
+    if conflicts:
+        details = "; ".join(f"{label}: {', '.join(map(str, keys))}" for label, keys in conflicts.items())
+        raise ValueError(f"Keys with several rows in one source: {details}")
+
+    labels = list(sources)
+    indexed = [sources[label].set_index(key) for label in labels]
+
+    # one alignment of all sources: columns (source position, column)
+    wide = pd.concat(indexed, axis=1, keys=range(len(labels)), join="outer", sort=False)
+    wide.index.name = key
+
+    # columns of the result in the order of their first source, with the positions of their wide columns
+    columns = list(dict.fromkeys(col for df in indexed for col in df.columns))
+    positions = {col: [] for col in columns}
+    for position, (_, col) in enumerate(wide.columns):
+        positions[col].append(position)
+    order = [position for col in columns for position in positions[col]]
+    starts = np.cumsum([0] + [len(positions[col]) for col in columns[:-1]])
+
+    # winning wide column of every cell, for all columns at once: the first source with a value
+    notna = wide.notna().to_numpy()[:, order]
+    candidates = np.where(notna, np.arange(len(order)), len(order))
+    if len(order) and len(wide):
+        first = np.minimum.reduceat(candidates, starts, axis=1)
+    else:
+        first = np.full((len(wide), len(columns)), len(order))
+    source_of = np.array([wide.columns[position][0] for position in order] + [-1])
+
+    joined = {}
+    provenance = {}
+    for j, col in enumerate(columns):
+        cols = positions[col]
+        if len(cols) == 1:
+            joined[col] = wide.iloc[:, cols[0]]
+        else:
+            # value of the winning source of every row (no winner: the last source, which is missing too)
+            winner = np.minimum(first[:, j] - starts[j], len(cols) - 1)
+            values = wide.iloc[:, cols].to_numpy()
+            joined[col] = pd.Series(values[np.arange(len(wide)), winner], index=wide.index).infer_objects()
+        provenance[col] = pd.Categorical.from_codes(source_of[first[:, j]], categories=labels)
+    joined = pd.DataFrame(joined, index=wide.index)
+    provenance = pd.DataFrame(provenance, index=wide.index)
+    return joined, provenance
+
+
+def duplicate_keys(sources: dict, key: str = "Key") -> dict:
+    """Label -> keys that are in several rows of that source, for the sources that have such keys."""
+    conflicts = {}
+    for label, df in sources.items():
+        keys = df[key]
+        duplicated = keys[keys.duplicated()].unique().tolist()
+        if duplicated:
+            conflicts[label] = duplicated
+    return conflicts
+
+
+def provenance_summary(provenance: pd.DataFrame, overlapping_only: bool = True) -> pd.DataFrame:
+    """Number of cells won by every source (columns) per column (rows); only columns with several sources."""
+    summary = provenance.apply(lambda col: col.value_counts()).T.fillna(0).astype(int)
+    if overlapping_only:
+        summary = summary[(summary > 0).sum(axis=1) > 1]
+    return summary
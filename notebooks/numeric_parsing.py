@@ -0,0 +1,115 @@
+"""
+Shared, unit-aware parsing of scraped numbers, used by all cleaning scripts.
+
+The scraped tables contain numbers as text with units and formatting, e.g.
+    "72.1%", "$18,774", "37433USD", "20.4 years", "~2.3 rooms", "9,421", "-" (missing)
+parse_numeric() converts a whole block of columns in one pass:
+- all cells of all columns are factorized, so every distinct text is parsed only once
+- one compiled pattern splits a text into approximation sign (~), currency prefix ($, US$, USD),
+  sign, number (with thousands separators) and unit suffix (%, USD, years, rooms, ...)
+- a cell that is only a dash ("-", "–", "—") is missing, like empty cells and "N/A"
+- the detected unit of every column is recorded in result.attrs["units"], e.g. {"Social support Value": "%"}
+
+Like pd.to_numeric, a column becomes int64 if every cell is a whole number without decimal point, otherwise
+float64 (integers=False: always float64). Cells that are not a number become NaN.
+
+    from numeric_parsing import parse_numeric
+    df[columns] = parse_numeric(df, columns)
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+CELL = re.compile(
+    r"^\s*(?P<approx>~)?\s*"
+    r"(?P<prefix>US\$|USD|\$)?\s*"
+    r"(?P<sign>[-−–])?\s*"
+    r"(?P<number>\d[\d,]*(?:\.\d*)?|\.\d+)\s*"
+    r"(?P<unit>%|[^\W\d_][^\d]*?)?\s*$"
+)
+DASH = re.compile(r"^\s*[-−–—]\s*$")
+
+
+def parse_texts(texts: pd.Series):
+    """
+    Parses distinct texts.
+
+    Returns:
+        tuple: (values as float array, NaN if not a number; unit per text (object array, None if no unit);
+                True per text if it is a whole number written without decimal point)
+    """
+    parts = texts.str.extract(CELL)
+    number = parts["number"].str.replace(",", "", regex=False)
+    valid = number.notna().to_numpy()
+
+    values = np.full(len(texts), np.nan)
+    values[valid] = number[valid].to_numpy(dtype=object).astype(float)
+    negative = parts["sign"].notna().to_numpy()
+    values[negative] = -values[negative]
+
+    units = parts["prefix"].fillna(parts["unit"]).str.strip().astype(object).where(valid, None).to_numpy()
+    units = np.where(pd.isna(units), None, units)
+    whole = valid & ~number.str.contains(".", regex=False).fillna(True).to_numpy()
+    return values, units, whole
+
+
+def parse_numeric(df: pd.DataFrame, columns=None, integers: bool = True) -> pd.DataFrame:
+    """
+    Parses the given columns (default: all) of a DataFrame into numbers in one pass.
+
+    Parameters:
+        df (pd.DataFrame): data with the scraped texts (cells that are numbers already are kept)
+        columns (list): columns to parse
+        integers (bool): columns with only whole numbers become int64 (like pd.to_numeric)
+
+    Returns:
+        pd.DataFrame: the parsed columns (same index), with the unit of every column in .attrs["units"]
+    """
+    columns = list(df.columns if columns is None else columns)
+    n_rows = len(df)
+    codes, uniques = pd.factorize(df[columns].to_numpy(dtype=object).ravel())
+
+    # cells that are numbers already, and texts
+    is_number = np.array([isinstance(u, (int, float, np.number)) and not isinstance(u, bool) for u in uniques],
+                         dtype=bool)
+    values = np.full(len(uniques), np.nan)
+    units = np.full(len(uniques), None, dtype=object)
+    whole = np.zeros(len(uniques), dtype=bool)
+
+    if is_number.any():
+        numbers = uniques[is_number].astype(float)
+        values[is_number] = numbers
+        whole[is_number] = np.array([isinstance(u, (int, np.integer)) for u in uniques[is_number]], dtype=bool)
+    texts = ~is_number
+    if texts.any():
+        text_series = pd.Series(uniques[texts], dtype="string")
+        text_values, text_units, text_whole = parse_texts(text_series)
+        dash = text_series.str.match(DASH).fillna(False).to_numpy()
+        text_values[dash] = np.nan
+        values[texts], units[texts], whole[texts] = text_values, text_units, text_whole & ~dash
+
+    # back to the cells (code -1: missing cell)
+    codes = codes.reshape(n_rows, len(columns))
+    cell_values = np.append(values, np.nan)[codes]
+    cell_whole = np.append(whole, False)[codes]
+    cell_units = np.append(units, None)[codes]
+
+    result = pd.DataFrame(cell_values, index=df.index, columns=columns)
+    detected = {}
+    for j, col in enumerate(columns):
+        if integers and n_rows and cell_whole[:, j].all():
+            result[col] = result[col].astype("int64")
+        column_units = pd.Series(cell_units[:, j]).dropna()
+        detected[col] = column_units.mode().iloc[0] if not column_units.empty else None
+    result.attrs["units"] = detected
+    return result
+
+
+def parse_numeric_series(series: pd.Series, integers: bool = True) -> pd.Series:
+    """parse_numeric for a single column; the unit is in result.attrs["unit"]."""
+    name = series.name if series.name is not None else 0
+    parsed = parse_numeric(series.to_frame(name), [name], integers=integers)
+    result = parsed[name].rename(series.name)
+    result.attrs = {"unit": parsed.attrs["units"][name]}
+    return result
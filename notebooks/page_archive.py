@@ -0,0 +1,337 @@
+"""
+Offline record/replay store for the network traffic of the scrapers.
+
+Every scraper here has to reach live websites to run at all. This module allows to record
+a live run once and replay it later without network (e.g. to time and profile the scrapers):
+
+- record: the browser is started behind a local proxy (ArchiveProxy). The proxy forwards every request to the
+  live website and stores the response (HTML, scripts, XHR/JSON, iframes, downloaded files) in a compact,
+  content-addressed archive:
+      ../data/archive/index.json          request -> SHA-256 of the body, status, headers
+                                          (written in batches, on proxy shutdown and at exit)
+      ../data/archive/blobs/<sha256>.gz   gzip-compressed body (identical bodies are stored once)
+- replay: the same proxy answers every request from the archive, nothing goes to the network. The JavaScript
+  of the pages runs as in the live run (autocomplete of the WHR dashboard, updateTable of the Gallup pages,
+  the Better Life dropdown), so the unchanged Selenium code of the scrapers runs offline, including the
+  interactions: the requests they trigger were recorded as well.
+
+The mode is selected with environment variables, so the scrapers do not need any new arguments:
+    SCRAPER_ARCHIVE_MODE=record   (or replay)
+    SCRAPER_ARCHIVE_DIR=<folder>  (optional, default ../data/archive)
+
+create_driver() of scraper_runtime.py starts the browsers behind the proxy (archive_options()); downloads through
+http_cache.py are recorded/replayed in the same archive. HTTPS requests are decrypted by the proxy with a
+self-signed certificate (created with openssl on first use, in the archive folder), so the browsers are started
+with certificate errors ignored, in record and replay mode only.
+
+Requests are matched by method, normalized URL (HTML escapes like "&amp;" and percent-escapes normalized, the
+fragment removed) and, for POST requests, the hash of the body. In replay, a request whose query was not recorded
+(e.g. a cache-busting timestamp) gets the last recorded response of the same path; other requests get a 404.
+"""
+import atexit
+import gzip
+import hashlib
+import html
+import json
+import os
+import socket
+import ssl
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlsplit, urlunsplit
+
+import requests
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "archive")
+MODE_ENV = "SCRAPER_ARCHIVE_MODE"
+DIR_ENV = "SCRAPER_ARCHIVE_DIR"
+
+# headers of a response that are not stored/passed on: they describe the connection or the encoding of the
+# forwarded body, which the proxy sends decoded with its own length
+EXCLUDED_HEADERS = {"connection", "keep-alive", "proxy-authenticate", "proxy-connection", "te", "trailer",
+                    "transfer-encoding", "upgrade", "content-encoding", "content-length"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# recorded responses after which the index is written (a page load records dozens; the bodies are written at once)
+FLUSH_EVERY = 100
+
+
+def normalize_url(url: str) -> str:
+    """
+    URL in one canonical spelling: HTML escapes ("&amp;") resolved, percent-escapes normalized, scheme and host in
+    lower case, default port and fragment removed.
+    """
+    parts = urlsplit(html.unescape(url.strip()))
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = quote(unquote(parts.path), safe="/:@!$&'()*+,;=-._~") or "/"
+    query = quote(unquote(parts.query), safe="=&/:@!$'()*+,;?-._~")
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def request_key(url: str, method: str = "GET", body: bytes = b"") -> str:
+    """Key of a request in the archive: method, normalized URL and (if there is one) the hash of the body."""
+    key = f"{method.upper()} {normalize_url(url)}"
+    return f"{key} {hashlib.sha256(body).hexdigest()[:16]}" if body else key
+
+
+def _path_key(key: str) -> str:
+    """Key without query and body hash (fallback for requests whose query was not recorded)."""
+    method, url = key.split(" ")[:2]
+    return f"{method} {url.split('?', 1)[0]}"
+
+
+class PageArchive:
+    """Content-addressed archive of recorded responses."""
+
+    def __init__(self, directory: str = ARCHIVE_DIR):
+        self.directory = directory
+        self.blob_dir = os.path.join(directory, "blobs")
+        self.index_path = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = 0  # responses recorded since the index was last written
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        self.by_path = {}
+        for key, entry in self.index.items():
+            self._add_path(key, entry)
+
+    def _add_path(self, key: str, entry: dict) -> None:
+        latest = self.by_path.get(_path_key(key))
+        if latest is None or entry["recorded_at"] >= self.index[latest]["recorded_at"]:
+            self.by_path[_path_key(key)] = key
+
+    def put(self, url: str, content: bytes, content_type: str = "text/html; charset=utf-8", method: str = "GET",
+            body: bytes = b"", status: int = 200, headers: list = None) -> str:
+        """
+        Stores the response recorded for a request and returns the SHA-256 digest of its body. The body is written
+        at once; the index is written every FLUSH_EVERY responses and by flush() (on proxy shutdown and at exit).
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        blob_path = os.path.join(self.blob_dir, digest + ".gz")
+        key = request_key(url, method, body)
+        headers = headers or [["Content-Type", content_type]]
+        if not os.path.exists(blob_path):
+            # one temporary file per thread: the same body may be recorded by two requests at the same time
+            tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, blob_path)
+        with self._lock:
+            self.index[key] = {"url": url, "sha256": digest, "status": status, "content_type": content_type,
+                               "headers": headers, "recorded_at": time.time()}
+            self._add_path(key, self.index[key])
+            self._pending += 1
+            due = self._pending >= FLUSH_EVERY
+        if due:
+            self.flush()
+        return digest
+
+    def flush(self) -> None:
+        """Writes the index if responses were recorded since the last write."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                index = dict(self.index)
+                self._pending = 0
+            tmp_index = self.index_path + ".tmp"
+            with open(tmp_index, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=1, ensure_ascii=False)
+            os.replace(tmp_index, self.index_path)
+
+    def find(self, url: str, method: str = "GET", body: bytes = b"", fallback: bool = True):
+        """
+        Returns (entry, content) recorded for a request, or None if it was not recorded.
+        With fallback, a request that was not recorded with this query/body gets the last response of its path.
+        """
+        key = request_key(url, method, body)
+        entry = self.index.get(key)
+        if entry is None and fallback:
+            latest = self.by_path.get(_path_key(key))
+            entry = self.index.get(latest) if latest else None
+        if entry is None:
+            return None
+        with gzip.open(os.path.join(self.blob_dir, entry["sha256"] + ".gz"), "rb") as f:
+            return entry, f.read()
+
+    def get(self, url: str):
+        """Returns (content, content_type) recorded for a GET request of the URL, or None if it was not recorded."""
+        found = self.find(url, fallback=False)
+        return None if found is None else (found[1], found[0]["content_type"])
+
+
+def _certificate(directory: str) -> tuple:
+    """Paths of the self-signed certificate and key of the proxy (created with openssl on first use)."""
+    cert_path = os.path.join(directory, "proxy_cert.pem")
+    key_path = os.path.join(directory, "proxy_key.pem")
+    if not (os.path.exists(cert_path) and os.path.exists(key_path)):
+        os.makedirs(directory, exist_ok=True)
+        try:
+            subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "3650",
+                            "-subj", "/CN=scraper page archive", "-keyout", key_path, "-out", cert_path],
+                           check=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise RuntimeError(f"Could not create the certificate of the archive proxy with openssl: {e}") from e
+    return cert_path, key_path
+
+
+class ArchiveProxy:
+    """
+    Local HTTP(S) proxy of the browsers. In record mode every request is forwarded to the website and the response
+    is stored in the archive; in replay mode the responses come from the archive only.
+    """
+
+    def __init__(self, archive: PageArchive, mode: str, port: int = 0):
+        self.archive = archive
+        self.mode = mode
+        self.session = requests.Session() if mode == "record" else None
+        self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.ssl_context.load_cert_chain(*_certificate(archive.directory))
+        self.missing = set()
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            origin = None  # https://host of a CONNECT tunnel
+
+            def do_CONNECT(self):
+                # HTTPS: answer the tunnel request and decrypt the requests sent through it
+                host = self.path[:-4] if self.path.endswith(":443") else self.path
+                self.send_response(200, "Connection Established")
+                self.end_headers()
+                try:
+                    self.connection = proxy.ssl_context.wrap_socket(self.connection, server_side=True)
+                except (ssl.SSLError, OSError):
+                    self.close_connection = True
+                    return
+                self.rfile = self.connection.makefile("rb", self.rbufsize)
+                self.wfile = self.connection.makefile("wb")
+                self.origin = f"https://{host}"
+                self.close_connection = False
+
+            def handle_request(self):
+                url = self.origin + self.path if self.origin else self.path
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                try:
+                    status, headers, content = proxy.respond(self.command, url, dict(self.headers), body)
+                except (requests.RequestException, socket.error) as e:
+                    status, headers, content = 502, [["Content-Type", "text/plain"]], str(e).encode("utf-8")
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = handle_request
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.address = f"127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def respond(self, method: str, url: str, request_headers: dict, body: bytes) -> tuple:
+        """Status, headers and body of the response to a request (from the website or from the archive)."""
+        if self.mode == "replay":
+            found = self.archive.find(url, method, body)
+            if found is None:
+                if url not in self.missing:
+                    self.missing.add(url)
+                    print(f"Not recorded in the page archive: {method} {url}")
+                return 404, [["Content-Type", "text/plain"]], b"Not recorded"
+            entry, content = found
+            return entry["status"], entry["headers"], content
+
+        headers = {name: value for name, value in request_headers.items()
+                   if name.lower() not in EXCLUDED_HEADERS | {"host", "accept-encoding"}}
+        response = self.session.request(method, url, headers=headers, data=body or None, allow_redirects=False,
+                                        timeout=60)
+        response_headers = [[name, value] for name, value in response.headers.items()
+                            if name.lower() not in EXCLUDED_HEADERS]
+        content = response.content  # decoded (gzip/deflate) by requests
+        self.archive.put(url, content, response.headers.get("Content-Type", "application/octet-stream"), method,
+                         body, response.status_code, response_headers)
+        return response.status_code, response_headers, content
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.archive.flush()
+
+
+_archive = None
+_proxy = None
+_state_lock = threading.Lock()
+
+
+def get_mode():
+    """Returns "record", "replay" or None (live run without archive)."""
+    mode = os.environ.get(MODE_ENV, "").strip().lower()
+    return mode if mode in ("record", "replay") else None
+
+
+def get_archive() -> PageArchive:
+    """Returns the archive of the current process (created on first use)."""
+    global _archive
+    with _state_lock:
+        if _archive is None:
+            _archive = PageArchive(os.environ.get(DIR_ENV, ARCHIVE_DIR))
+            atexit.register(_archive.flush)
+    return _archive
+
+
+def get_proxy() -> ArchiveProxy:
+    """Returns the proxy of the current process (started on first use, shared by all browsers)."""
+    global _proxy
+    archive = get_archive()
+    with _state_lock:
+        if _proxy is None:
+            _proxy = ArchiveProxy(archive, get_mode())
+    return _proxy
+
+
+def archive_options(options, browser: str):
+    """
+    Routes a browser through the archive proxy if an archive mode is set (options: ChromeOptions or FirefoxOptions
+    before the browser is started); returns the options unchanged otherwise.
+    """
+    if get_mode() is None:
+        return options
+    host, port = get_proxy().address.split(":")
+    if browser == "chrome":
+        options.add_argument(f"--proxy-server=http://{host}:{port}")
+        options.add_argument("--ignore-certificate-errors")
+    else:
+        options.set_preference("network.proxy.type", 1)
+        for scheme in ("http", "ssl"):
+            options.set_preference(f"network.proxy.{scheme}", host)
+            options.set_preference(f"network.proxy.{scheme}_port", int(port))
+        options.set_preference("network.proxy.no_proxies_on", "")
+        options.set_preference("network.proxy.allow_hijacking_localhost", True)
+        options.accept_insecure_certs = True
+    return options
+
+
+if __name__ == "__main__":
+    # Print an overview of the archive
+    archive = get_archive()
+    blobs = [b for b in os.listdir(archive.blob_dir) if b.endswith(".gz")]
+    size = sum(os.path.getsize(os.path.join(archive.blob_dir, b)) for b in blobs)
+    print(f"Archive {os.path.abspath(archive.directory)}: {len(archive.index)} responses, "
+          f"{len(blobs)} blobs, {size / 1024:.1f} KiB")
+    for key, entry in sorted(archive.index.items()):
+        print(f"- {key} ({entry['status']}, {entry['content_type']}, {entry['sha256'][:12]})")
@@ -3,9 +3,20 @@ Function to scrape emotional response data from the Gallup Global Emotions inter
 https://news.gallup.com/interactives/248240/global-emotions.aspx
 
 For each emotion, the script:
-- Clicks the corresponding toggle
-- Waits for the data table to update
+- Calls the page's updateTable function for the corresponding toggle
+- Waits inside the page for the data table to update
 - Extracts data per country (Yes / No / Don't Know)
+All three steps run in one JavaScript call per emotion that returns the table rows as JSON,
+so no page source has to be downloaded and parsed in Python.
+The browser, rate limiting and retries come from the shared scraper runtime (scraper_runtime.py).
+
+The time of the page load and of every emotion (waits, script calls) and the WebDriver commands are recorded
+by scraper_telemetry.py and summarised at the end; tqdm only shows the progress.
+
+Delta scraping (fingerprint_store.py): right after the page load, one in-page call fingerprints the data the page
+downloaded (page_data_fingerprint). Emotions whose fingerprint did not change since the last run get their stored
+rows back without updating the table; only the others are extracted. An emotion that fails keeps its stored rows.
+If no emotion changed, the existing csv file is kept (the returned data frame is the same in both cases).
 
 The robots.txt on this website was checked to ensure that information scrapped was allowed.
 
@@ -13,96 +24,139 @@ authors:    Jade Bullock
 date:       21.03.2025
 """
 
-def scrape_gallup_emotions(save_path: str = "../data/raw/gallup_emotions_raw.csv", headless: bool = True):
-    from selenium import webdriver
+# JavaScript run in the page for one emotion: updates the table, waits (without blocking the page) until its
+# HTML has changed and returns the rows as [country, yes, no, don't know] lists (null on timeout)
+EXTRACT_EMOTION_SCRIPT = """
+const dataQ = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const oldTable = document.getElementById("emotions-table");
+const oldTableHtml = oldTable ? oldTable.outerHTML : null;
+updateTable(dataQ);
+const started = Date.now();
+(function poll() {
+    const table = document.getElementById("emotions-table");
+    if (table && table.outerHTML !== oldTableHtml) {
+        done(Array.from(table.querySelectorAll("tbody tr"),
+                        row => Array.from(row.querySelectorAll("td"), cell => cell.textContent.trim())));
+    } else if (Date.now() - started > timeoutMs) {
+        done(null);
+    } else {
+        setTimeout(poll, 50);
+    }
+})();
+"""
+
+def scrape_gallup_emotions(save_path: str = "../data/raw/gallup_emotions_raw.csv", headless: bool = True,
+                           lean: bool = None, full_refresh: bool = None):
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.chrome.service import Service as ChromeService
-    from webdriver_manager.chrome import ChromeDriverManager
-    from bs4 import BeautifulSoup
     import pandas as pd
-    import time
     from tqdm import tqdm
     import os
+    from scraper_runtime import create_driver, get_page
+    from fingerprint_store import FingerprintStore, fingerprint, page_data_fingerprint
+    from scraper_telemetry import Telemetry, phase
+
+    # Timings and WebDriver commands of the page load and of every emotion
+    telemetry = Telemetry("gallup_emotions")
+
+    # Fingerprints and rows of the last run (full_refresh=None: SCRAPER_FULL_REFRESH environment variable)
+    store = FingerprintStore("gallup_emotions", full_refresh=full_refresh)
 
 
-    # Setup Chrome WebDriver
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")  # Do not see the browser
-    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
+    # Setup Chrome WebDriver (headless: do not see the browser; lean: skip images, fonts and trackers)
+    driver = create_driver("chrome", headless=headless, lean=lean)
+
+    # Allow the in-page wait for the table update to finish
+    driver.set_script_timeout(15)
 
     # Initialize WebDriverWait once
-    wait = WebDriverWait(driver, 10)
+    wait = WebDriverWait(driver, 30)
 
     # Open the Gallup Global Emotions interactive page
     url = "https://news.gallup.com/interactives/248240/global-emotions.aspx"
-    driver.get(url)
-
-    # Wait for the page to fully load
-    time.sleep(10)
+    with telemetry.entity("page"):
+        get_page(driver, url)
+
+        # Wait until the emotion toggles and the page's updateTable function are available
+        with phase("wait"):
+            wait.until(lambda d: d.find_elements(By.CLASS_NAME, "c-interactive__toggle")
+                       and d.execute_script("return typeof updateTable === 'function';"))
+
+        # Find all emotion buttons and their attributes
+        emotion_buttons = driver.find_elements(By.CLASS_NAME, "c-interactive__toggle")
+        emotion_info = [
+            {
+                "label": b.text.strip(),
+                "data_q": b.get_attribute("data-q")
+            }
+            for b in emotion_buttons
+        ]
+
+        # Cheap probe of the data behind the table, before any emotion is selected
+        page_fp = page_data_fingerprint(driver)
 
     # Create list to store the data
     data = []
 
-    # Find all emotion buttons and their attributes
-    emotion_buttons = driver.find_elements(By.CLASS_NAME, "c-interactive__toggle")
-    emotion_info = [
-        {
-            "label": b.text.strip(),
-            "data_q": b.get_attribute("data-q")
-        }
-        for b in emotion_buttons
-    ]
-
     # Loop through emotion_info (using tqdm for a progress bar)
     for info in tqdm(emotion_info, desc="Scraping emotions", unit="emotion"):
         emotion = info["label"]
         data_q = info["data_q"]
         print(f"Scraping data for: {emotion}")
 
-        try:
-            # Get current table HTML (to detect when it updates)
-            table_elem = driver.find_element(By.ID, "emotions-table")
-            old_table_html = table_elem.get_attribute("outerHTML")
-
-            # Call the page's updateTable function directly with the emotion code
-            driver.execute_script("updateTable(arguments[0]);", data_q)
-
-            # Wait until the table's HTML changes
-            WebDriverWait(driver, 10).until(
-                lambda d: d.find_element(By.ID, "emotions-table").get_attribute("outerHTML") != old_table_html
-            )
-
-            # Parse the new table with BeautifulSoup
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            table = soup.find("table", id="emotions-table")
-            if not table:
-                print(f"Table not found for {emotion}")
-                continue
-
-            # Extract table rows
-            rows = table.find("tbody").find_all("tr")
-            for row in rows:
-                cells = row.find_all("td")
+        with telemetry.entity(emotion):
+            rows = None
+            try:
+                # Compare with the last run; the stored rows are used if the page data did not change
+                fp = fingerprint(page_fp, data_q) if page_fp is not None else None
+                if fp is not None:
+                    rows = store.lookup(emotion, fp)
+
+                if rows is None:
+                    # Update the table and read its rows in one call (the page waits for the update itself)
+                    rows = driver.execute_async_script(EXTRACT_EMOTION_SCRIPT, data_q, 10000)
+                    if rows is None:
+                        print(f"Table not updated for {emotion}")
+                    elif fp is not None or store.lookup(emotion, fingerprint(rows)) is None:
+                        # Page not probed: the extracted rows themselves are compared with the last run
+                        store.update(emotion, fp or fingerprint(rows), rows)
+
+            except Exception as e:
+                print(f"Error processing {emotion}: {e}")
+                rows = None
+
+            # A failed emotion keeps its rows of the last run
+            if rows is None:
+                rows = store.keep(emotion)
+                if rows is None:
+                    continue
+                print(f"Keeping the stored rows of {emotion}")
+
+            # Keep the rows with all four cells
+            for cells in rows:
                 if len(cells) >= 4:
-                    country = cells[0].text.strip()
-                    yes = cells[1].text.strip()
-                    no = cells[2].text.strip()
-                    dont_know = cells[3].text.strip()
+                    country, yes, no, dont_know = cells[:4]
                     data.append([emotion, country, yes, no, dont_know])
 
-        except Exception as e:
-            print(f"Error processing {emotion}: {e}")
-
     # Close browser
     driver.quit()
+    store.save(complete=True)
+    telemetry.report()
+
+    print(f"Emotions: {store.summary()}")
 
-    #  Convert to DataFrame and save
+    #  Convert to DataFrame (stored and newly extracted rows)
     df = pd.DataFrame(data, columns=["Emotion", "Country", "YES", "NO", "DON'T KNOW/REFUSED"])
 
     # Remove duplicates
     gallup_emotions_df = df.drop_duplicates(subset=["Emotion", "Country"])
 
+    if not store.has_changes() and os.path.exists(save_path):
+        print(f"No emotion changed, keeping {save_path}")
+        return gallup_emotions_df
+
     # Ensure the parent-level data folder exists
     os.makedirs("../data", exist_ok=True)
 
@@ -2,7 +2,9 @@
 Extracts Gallup Law & Order and Safety perception data from public Datawrapper CSV sources.
 
 It downloads two datasets (Safety and Law & Order indices),
-for use in the clean_gallup_safety file
+for use in the clean_gallup_safety file.
+The downloads go through the shared HTTP cache (http_cache.py): each CSV is requested once per run
+over a pooled session, and only downloaded again when Datawrapper reports a change (ETag/Last-Modified).
 
 Source:
 https://www.gallup.com/analytics/356996/gallup-law-and-order-research-center.aspx
@@ -12,24 +14,16 @@ The robots.txt on this website was checked to ensure that information extracted
 authors:    Jade Bullock
 date:       23.03.2025
 """
-import pandas as pd
-import requests
-from io import StringIO
+from http_cache import read_csv_cached
 
-def get_gallup_dataframes():
-    # URLs for the datasets
-    url_law_order = "https://datawrapper.dwcdn.net/7i1nV/5/dataset.csv"
-    url_safety = "https://datawrapper.dwcdn.net/jqGCk/6/dataset.csv"
-
-    #headers to mimic a browser
-    headers = {"User-Agent": "Mozilla/5.0"}
+# URLs for the datasets
+URL_LAW_ORDER = "https://datawrapper.dwcdn.net/7i1nV/5/dataset.csv"
+URL_SAFETY = "https://datawrapper.dwcdn.net/jqGCk/6/dataset.csv"
 
-    # Download the CSVs manually using requests
-    resp_safety = requests.get(url_safety, headers=headers)
-    resp_law_order = requests.get(url_law_order, headers=headers)
-
-    df_safety = pd.read_csv(StringIO(requests.get(url_safety, headers=headers).text))
-    df_law_order = pd.read_csv(StringIO(requests.get(url_law_order, headers=headers).text))
+def get_gallup_dataframes():
+    # Download the CSVs (or revalidate the cached copies) and parse them from the cached bytes
+    df_safety = read_csv_cached(URL_SAFETY)
+    df_law_order = read_csv_cached(URL_LAW_ORDER)
 
     return df_safety, df_law_order
 
@@ -5,45 +5,123 @@ https://worldhappiness.report/ed/2024/happiness-of-the-younger-the-older-and-tho
 This website does not have a robots.txt file. The data presented in their report is publicly available and
 can be downloaded. No sensitive or personalized data was scraped.
 
+The table is read with one WebDriver call (its outerHTML) and parsed in Python, instead of one call per cell.
+Several report editions/tables can be scraped with the same browser: add them to TABLES.
+The time of every table (page load, waits, parsing) is recorded by scraper_telemetry.py.
+
 author: Ramona Kölliker
 Date: 26.03.2025
 """
 ##
-from selenium import webdriver
-from selenium.webdriver.common.by import By
+import re
+
 import pandas as pd
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from scraper_runtime import create_driver, get_page
+from scraper_telemetry import Telemetry, phase
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# report editions/tables to scrape: page, caption of the table and path of the raw csv
+TABLES = [
+    {
+        "edition": 2024,
+        "url": "https://worldhappiness.report/ed/2024/happiness-of-the-younger-the-older-and-those-in-between/",
+        "caption": "Table 2.2: Ranking of life evaluations by age group, 2021- 2023",
+        "save_path": "./data/raw/happiness_by_age_raw.csv",
+    },
+]
+
+INTEGER_CELL = re.compile(r"^\d+$")
+
+# timings and WebDriver commands per report edition
+TELEMETRY = Telemetry("happiness_by_age")
+
+
+## parse
+def parse_table_html(table_html):
+    """
+    Parses the HTML of a table into a DataFrame. Columns that only contain whole numbers (the ranks)
+    become integer columns ("Int64", empty cells -> <NA>), all other columns stay text.
+    """
+    soup = BeautifulSoup(table_html, HTML_PARSER)
+
+    # headers (=column names) from the table header (its last row if column groups are above it), data from the
+    # rows with <td> cells (get_text with a separator: text split by <br> or inline tags keeps its spaces)
+    thead = soup.find("thead")
+    header_row = thead.find_all("tr")[-1] if thead else soup.find("tr")
+    headers = [th.get_text(" ", strip=True) for th in header_row.find_all("th")]
+    rows = [[td.get_text(" ", strip=True) for td in tr.find_all("td")] for tr in soup.find_all("tr")]
+    rows = [cells for cells in rows if cells]
+
+    df = pd.DataFrame(rows, columns=headers).replace("", pd.NA)
+
+    # type the rank columns: every non-empty cell is a whole number
+    for col in df.columns:
+        values = df[col].dropna()
+        if len(values) and values.str.match(INTEGER_CELL).all():
+            df[col] = pd.to_numeric(df[col]).astype("Int64")
+    return df
+
 
 ## scrape
-# setup webdriver
-driver = webdriver.Firefox()
-
-# load main page
-url = "https://worldhappiness.report/ed/2024/happiness-of-the-younger-the-older-and-those-in-between/"
-driver.get(url)
-
-# locate the Table 2.2
-# basic Xpath structure: //tagName[@AttributeName="Value"]
-table = driver.find_element(By.XPATH, '//table[@class= "data-table data-table-compact"][caption[contains(text(),"Table 2.2: Ranking of life evaluations by age group, 2021- 2023")]]')
-
-# extract table headers (=column names)
-headers = [th.text for th in table.find_elements(By.TAG_NAME, "th")]
-#print(headers)
-
-# create a list to store the collected data
-list_happiness_by_age= []
-
-# extract all the row data
-for row in table.find_elements(By.TAG_NAME, "tr")[1:]: #skip first row = headers (with tag "th")
-    cells = [td.text for td in row.find_elements(By.TAG_NAME, "td")]
-    list_happiness_by_age.append(cells)
-#print("Headers: ", headers)
-#for row in rows:
-    #print(row)
-driver.quit()
-
-## store scraped data
-# convert list into Dataframe, including the headers as columns
-df_happiness_by_age = pd.DataFrame(list_happiness_by_age, columns = headers)
-print(df_happiness_by_age)
-
-df_happiness_by_age.to_csv("./data/raw/happiness_by_age_raw.csv", index = False)
\ No newline at end of file
+def find_table_html(driver, caption, timeout=20):
+    """Waits for the table with the given caption and returns its HTML (one WebDriver call)."""
+    # basic Xpath structure: //tagName[@AttributeName="Value"]
+    locator = (By.XPATH, f'//table[@class= "data-table data-table-compact"][caption[contains(text(),"{caption}")]]')
+    with phase("wait"):
+        table = WebDriverWait(driver, timeout).until(EC.presence_of_element_located(locator))
+    return table.get_attribute("outerHTML")
+
+
+def scrape_happiness_by_age(tables=TABLES, save=True, headless=False, lean=None):
+    """
+    Scrapes the happiness-by-age tables of one or several report editions with one browser.
+
+    Parameters:
+        tables (list): dictionaries with "edition", "url", "caption" and "save_path" (see TABLES)
+        save (bool): write every table to its raw csv file
+        headless (bool): run Firefox without a visible window
+        lean (bool): lean page mode, see scraper_runtime.py (None: SCRAPER_LEAN_PAGES environment variable)
+
+    Returns:
+        dict: edition -> pandas DataFrame of the table
+    """
+    TELEMETRY.start_run()
+
+    # setup webdriver
+    driver = create_driver("firefox", headless=headless, lean=lean)
+
+    results = {}
+    try:
+        for table in tables:
+            # load the page of the report edition and read the table
+            with TELEMETRY.entity(table["edition"]):
+                get_page(driver, table["url"])
+                table_html = find_table_html(driver, table["caption"])
+                with phase("parse"):
+                    df = parse_table_html(table_html)
+            print(f"Edition {table['edition']}: {len(df)} countries")
+            results[table["edition"]] = df
+
+            ## store scraped data
+            if save:
+                df.to_csv(table["save_path"], index = False)
+    finally:
+        driver.quit()
+        TELEMETRY.report()
+
+    return results
+
+
+if __name__ == "__main__":
+    for edition, df_happiness_by_age in scrape_happiness_by_age().items():
+        print(df_happiness_by_age)
@@ -15,26 +15,22 @@ date:       23.03.2025
 !!Important Note!! Information on the website was update 2/4/25 - Details changed!
 
 """
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from scraper_runtime import create_driver, get_page
 from bs4 import BeautifulSoup
 import pandas as pd
 import time
 import os
 
 # Setup WebDriver
-options = webdriver.ChromeOptions()
-# options.add_argument("--headless")  # Uncomment to run in background
-driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
+driver = create_driver("chrome", headless=False)  # headless=True to run in background
 wait = WebDriverWait(driver, 15)
 
 # Load main page
 url = "https://ilostat.ilo.org/topics/employment/"
-driver.get(url)
+get_page(driver, url)
 
 # Wait for iframe to load
 try:
@@ -9,6 +9,11 @@ labor statistics from the ILOSTAT website as the setup of each page is similar.
  https://ilostat.ilo.org/topics/labour-productivity/
 
 The data is scraped from iframes, which are navigated using Selenium and parsed using BeautifulSoup.
+With scrape_multiple(urls, max_workers=n) the topic pages are scraped concurrently, each one
+by its own headless browser from a pool of at most n browsers.
+Browsers, rate limiting and retries come from the shared scraper runtime (scraper_runtime.py).
+The time of every topic page (navigation, waits, lookups, parsing) and its WebDriver commands are
+recorded by scraper_telemetry.py.
 The robots.txt on this website was checked to ensure that information scrapped was allowed.
 
 authors:    Jade Bullock
@@ -18,39 +23,62 @@ date:       25.03.2025
 
 """
 
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import pandas as pd
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
+
+import scraper_runtime
+from scraper_runtime import DriverPool, get_page
+from scraper_telemetry import Telemetry, phase
 
 
 # Define a class for scraping the different ILOSTAT pages
 class ILOScraper:
-    def __init__(self, headless=False):
-        # Initialize Chrome WebDriver
-        options = webdriver.ChromeOptions()
-        self.driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
-        self.wait = WebDriverWait(self.driver, 15)
+    def __init__(self, headless=False, lean=None):
+        self.headless = headless
+        self.lean = lean  # Lean page mode (None: SCRAPER_LEAN_PAGES environment variable), see scraper_runtime.py
+        self._driver = None  # Browser for sequential scraping, started on first use
+        self._lock = threading.Lock()  # Protects self.dataframes when topics are scraped concurrently
         self.dataframes = {}  # Store DataFrames by topic name
-
-    def scrape_page(self, url):
+        self.telemetry = Telemetry("ilostat")  # Timings and WebDriver commands per topic page
+
+    def create_driver(self, headless=None):
+        # Initialize Chrome WebDriver (headless if requested)
+        headless = self.headless if headless is None else headless
+        return scraper_runtime.create_driver("chrome", headless=headless, lean=self.lean)
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = self.create_driver()
+        return self._driver
+
+    def scrape_page(self, url, driver=None):
+        # Record the timings of this topic page
+        with self.telemetry.entity(url):
+            self._scrape_page(url, driver)
+
+    def _scrape_page(self, url, driver=None):
+        driver = driver or self.driver
+        wait = WebDriverWait(driver, 15)
         print(f"\n Scraping: {url}")
-        self.driver.get(url) # Load the URL
-        time.sleep(3) # Allow for page to load
+        get_page(driver, url) # Load the URL (rate-limited, retried on browser errors)
 
         # Extract from the URL the website name to name the output file
         topic = url.rstrip("/").split("/")[-1].replace("-", "_")
 
         # Try command for switching into the iframe
         try:
-            iframe = self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "iframe")))
-            self.driver.switch_to.frame(iframe)
+            with phase("wait"):
+                iframe = wait.until(EC.presence_of_element_located((By.TAG_NAME, "iframe")))
+            driver.switch_to.frame(iframe)
             print("Switched into iframe.")
         except Exception as e:
             print("Could not switch to iframe:", e)
@@ -58,63 +86,92 @@ class ILOScraper:
 
         # Try command for clicking the "Show more" button to expand the full table
         try:
-            expand_button = self.wait.until(EC.element_to_be_clickable(
-                (By.XPATH, "//div[contains(@class, 'expand-button')]/a[contains(text(), 'Show')]")
-            ))
+            with phase("wait"):
+                expand_button = wait.until(EC.element_to_be_clickable(
+                    (By.XPATH, "//div[contains(@class, 'expand-button')]/a[contains(text(), 'Show')]")
+                ))
             expand_button.click()
             print("Clicked expand button.")
-            time.sleep(2)
-        except:
+            with phase("wait"):
+                time.sleep(2)
+        except WebDriverException: # Timeout, click intercepted or stale button: scrape the visible table
             print("️No expand button found or needed.")
 
         # Parse the iframe content using BeautifulSoup
-        soup = BeautifulSoup(self.driver.page_source, "html.parser")
-        table = soup.select_one("table.medium")
-
-        # Extract headers from <thead> and use default headers if there are no headers
-        thead = table.find("thead")
-        if thead:
-            header_cells = thead.find_all("th")
-            headers = [cell.get_text(strip=True) for cell in header_cells]
-        else:
-            print("️ No <thead> found — using default headers.")
-            headers = ["Country", {topic}]
-
-        # Extract rows from <tbody>
-        data = []
-        for row in table.select("tbody tr" ):
-            row_data = []
-
-            #Extract country name from <th> cell
-            country_cell = row.find("th")
-            country = country_cell.get_text(strip=True) if country_cell else ""
-            row_data.append(country)
-
-            #Extract values from <div class="sr-only"> inside <td>
-            value_cells = row.select("td")
-            for cell in value_cells:
-                sr_value = cell.find("div", class_="sr-only")
-                value = sr_value.get_text(strip=True) if sr_value else ""
-                row_data.append(value)
-
-            data.append(row_data) # Append row to data list
-
-        self.driver.switch_to.default_content() #Switch out of iframe
+        html = driver.page_source
+        with phase("parse"):
+            soup = BeautifulSoup(html, "html.parser")
+            table = soup.select_one("table.medium")
+
+            # Extract headers from <thead> and use default headers if there are no headers
+            thead = table.find("thead")
+            if thead:
+                header_cells = thead.find_all("th")
+                headers = [cell.get_text(strip=True) for cell in header_cells]
+            else:
+                print("️ No <thead> found — using default headers.")
+                headers = ["Country", {topic}]
+
+            # Extract rows from <tbody>
+            data = []
+            for row in table.select("tbody tr" ):
+                row_data = []
+
+                #Extract country name from <th> cell
+                country_cell = row.find("th")
+                country = country_cell.get_text(strip=True) if country_cell else ""
+                row_data.append(country)
+
+                #Extract values from <div class="sr-only"> inside <td>
+                value_cells = row.select("td")
+                for cell in value_cells:
+                    sr_value = cell.find("div", class_="sr-only")
+                    value = sr_value.get_text(strip=True) if sr_value else ""
+                    row_data.append(value)
+
+                data.append(row_data) # Append row to data list
+
+        driver.switch_to.default_content() #Switch out of iframe
 
         if data:
             df = pd.DataFrame(data, columns=headers)
-            self.dataframes[topic] = df #save each dataframe individually
+            with self._lock:
+                self.dataframes[topic] = df #save each dataframe individually
             df.to_csv(f"../data/{topic}_raw.csv", index=False)
             print(f" Data saved to ../data/{topic}_raw.csv")
         else:
             print(f" No data found for {topic}")
 
-    def scrape_multiple(self, url_list):
-        for url in url_list:
-            self.scrape_page(url)
+    def scrape_page_from_pool(self, pool, url):
+        # Scrape one topic with a headless browser of its own, borrowed from the pool
+        with pool.driver() as driver:
+            self.scrape_page(url, driver=driver)
+        return url
+
+    def scrape_multiple(self, url_list, max_workers=1):
+        self.telemetry.start_run()
+        if max_workers <= 1:
+            for url in url_list:
+                self.scrape_page(url)
+            self.telemetry.report()
+            return
+
+        # Concurrent mode: at most max_workers topics (browsers) at the same time.
+        # Failed page loads are already retried by get_page, a failed topic is reported and skipped.
+        with DriverPool(size=max_workers, browser="chrome", headless=True, lean=self.lean) as pool, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.scrape_page_from_pool, pool, url): url for url in url_list}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Could not scrape {futures[future]}:", e)
+        self.telemetry.report()
 
     def close(self):
-        self.driver.quit()
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
         print("\n Closed browser.")
 
 # === Example Usage ===
@@ -129,6 +186,6 @@ if __name__ == "__main__":
 
     ]
 
-    scraper = ILOScraper()
-    scraper.scrape_multiple(urls)
+    scraper = ILOScraper(headless=True)
+    scraper.scrape_multiple(urls, max_workers=len(urls))
     scraper.close()
\ No newline at end of file
@@ -4,90 +4,170 @@ scraping the World Happiness Report 2024 from https://data.worldhappiness.report
 This website does not have a robots.txt file. The data presented on their dashboard is publicly available and
 can be downloaded. No sensitive or personalized data was scraped.
 
+The scraper waits for explicit conditions (dropdown options present, summary and table rows replaced by the data
+of the selected country) instead of fixed sleeps. A country whose data does not show up is skipped (and scraped
+again by the next run), it is never saved with the values of the previous country. Every scraped country is
+appended to a checkpoint file right away, so an interrupted run can be restarted and skips the countries that are
+already done. The checkpoint is removed after the csv is saved.
+The browser, rate limiting and retries come from the shared scraper runtime (scraper_runtime.py).
+
+The time of every country (navigation, waits, element lookups, parsing) and the WebDriver commands are recorded
+by scraper_telemetry.py; a summary table is printed at the end instead of printing every table row.
+
+Delta scraping: right after the dashboard is loaded, one in-page call fingerprints the data the dashboard downloaded
+(page_data_fingerprint in fingerprint_store.py). If it is the same as in the last run, the stored records are used
+without selecting the countries at all. Otherwise (or if the page could not be probed) every country is selected and
+the text of its summary and table is fingerprinted; the table is only read row by row if it changed. A country that
+fails keeps its stored record in the csv (it is not checkpointed, so a resumed run tries it again). If no country
+changed, the existing csv is kept.
+
 author: Ramona Kölliker
 date: 17.03.2025
 """
 ##
-import time
+import json
+import os
 import re
-from selenium import webdriver
+
+import pandas as pd
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 
-## scrape
-# setup webdriver
-driver = webdriver.Firefox()
-
-# load main page
-url = "https://data.worldhappiness.report/map"
-driver.get(url)
-time.sleep(3) # wait to fully load webpage/dashboards
+from fingerprint_store import FingerprintStore, fingerprint, page_data_fingerprint
+from scraper_runtime import create_driver, get_page, retry
+from scraper_telemetry import Telemetry, phase
 
-# find "Country" button and click it
-dropdown_countries = driver.find_element(By.ID, ":r2:")
-dropdown_countries.click()
-time.sleep(5)
+URL = "https://data.worldhappiness.report/map"
+RAW_PATH = "./data/raw/world_happiness_report_raw.csv"
+CHECKPOINT_PATH = "./data/raw/world_happiness_report_checkpoint.jsonl"
 
-# wait for dropdown options to load
-wait = WebDriverWait(driver, 20)
-options_locator = (By.CSS_SELECTOR, ".MuiAutocomplete-popper .MuiAutocomplete-option")
-wait.until(EC.presence_of_all_elements_located(options_locator))
+# explanatory factors = rows of the table on the dashboard
+FACTORS = ["Social support", "GDP per capita", "Healthy life expectancy", "Freedom", "Generosity",
+           "Perceptions of corruption"]
 
-# get all dropdown options = countries
-options = driver.find_elements(*options_locator)
+# locators of the dashboard elements
+DROPDOWN_INPUT = (By.ID, ":r2:")
+DROPDOWN_OPTIONS = (By.CSS_SELECTOR, ".MuiAutocomplete-popper .MuiAutocomplete-option")
+SUMMARY = (By.CSS_SELECTOR, ".ml-4.shrink")
+TABLE_ROWS = (By.CSS_SELECTOR, ".MuiDataGrid-row")
 
-# get the text of the countries into a list
-dropdown_countries = [country.text for country in options]
-print("Dropdown Countries: ", dropdown_countries)
+# timings and WebDriver commands per country
+TELEMETRY = Telemetry("world_happiness_report")
 
-#options[0].click() -> select first country in the dropdown menu
-number_of_countries = len(options)
-print("Number of countries: ", number_of_countries)
+# cheap probe of the data of the selected country: text of the summary and of the table rows
+PROBE_SCRIPT = """
+const summary = document.querySelector(".ml-4.shrink");
+return [summary ? summary.innerText : null,
+        Array.from(document.querySelectorAll(".MuiDataGrid-row"), row => row.innerText)];
+"""
 
-# create a list of dictionaries to store the collected data
-list_world_happiness_report = []
 
-# looping through the country list
-for country in dropdown_countries:
-    time.sleep(3)
+## checkpoint
+def load_checkpoint(checkpoint_path):
+    """Returns the already scraped countries from the checkpoint file as dictionary {country: row_data}."""
+    done = {}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row_data = json.loads(line)
+                except json.JSONDecodeError:
+                    # last line can be incomplete if the run was interrupted while writing
+                    continue
+                done[row_data["Country"]] = row_data
+    return done
+
+
+def append_checkpoint(checkpoint_path, row_data):
+    """Appends the data of one country to the checkpoint file and makes sure it is written to disk."""
+    with open(checkpoint_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(row_data, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
 
-    # locate the dropdown input field
-    dropdown_input = driver.find_element(By.ID, ":r2:")
 
-    # click the input field to activate the dropdown
+## scrape
+def get_dropdown_countries(driver, wait):
+    """Opens the "Country" dropdown and returns the names of all countries in it."""
+    wait.until(EC.element_to_be_clickable(DROPDOWN_INPUT)).click()
+
+    # wait for dropdown options to load
+    with phase("wait"):
+        wait.until(EC.presence_of_all_elements_located(DROPDOWN_OPTIONS))
+
+    # get the text of the countries into a list
+    dropdown_countries = [country.text for country in driver.find_elements(*DROPDOWN_OPTIONS)]
+
+    # close the dropdown again
+    driver.find_element(*DROPDOWN_INPUT).send_keys(Keys.ESCAPE)
+    return dropdown_countries
+
+
+def dashboard_state(driver):
+    """Text of the summary and of the table rows shown on the dashboard (one JavaScript call, see PROBE_SCRIPT)."""
+    summary, rows = driver.execute_script(PROBE_SCRIPT)
+    return summary, tuple(rows)
+
+
+def dashboard_updated(previous_state):
+    """Wait condition: the summary and the table rows are rendered and both differ from previous_state."""
+    def condition(driver):
+        summary, rows = state = dashboard_state(driver)
+        if not summary or not rows:
+            return False
+        return state if summary != previous_state[0] and rows != previous_state[1] else False
+    return condition
+
+
+def select_country(driver, wait, country):
+    """
+    Types the country into the dropdown, selects it and waits until its data is shown on the dashboard.
+    Returns the state of the dashboard (see dashboard_state); raises TimeoutException if the summary or the
+    table rows were not replaced, so the values of the previous country are never read for this one.
+    """
+    # locate the dropdown input field and click it to activate the dropdown
+    with phase("wait"):
+        dropdown_input = wait.until(EC.element_to_be_clickable(DROPDOWN_INPUT))
+
+    # data shown now (previous country), the selected country has to replace both the summary and the rows
+    previous_state = dashboard_state(driver)
     dropdown_input.click()
-    time.sleep(5)
 
     # "Keys module" simulates key presses in the browser (mimicking human-like keyboard interaction)
     # deleting any existing input to be able to "select"/typing in the next dropdown option
     dropdown_input.send_keys(Keys.CONTROL + "a")  # selecting all text like Ctrl+A (select all)
     dropdown_input.send_keys(Keys.BACKSPACE)  # delete selected text
-    time.sleep(5)
 
-    # type in the current country name from the loop (dropdown_countries list)
+    # type in the country name and wait until the dropdown is filtered down to the matching option
     dropdown_input.send_keys(country)
-    time.sleep(5)
-
-    # press "Enter" to select the next matching option
-    dropdown_input.send_keys(Keys.RETURN)
-
-    # wait for the remaining option to be visible
-    option = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".MuiAutocomplete-option")))
+    with phase("wait"):
+        option = wait.until(EC.element_to_be_clickable(
+            (By.XPATH, f'//li[contains(@class, "MuiAutocomplete-option")][normalize-space()="{country}"]')))
 
     # click on the option (country name)
     option.click()
-    time.sleep(5)
 
-    # extract the data
+    # wait until the summary and the table rows show the data of the selected country
     try:
-        # extract Overall Rank and Average Life Evaluation score per country
-        element = driver.find_element(By.CSS_SELECTOR, ".ml-4.shrink")
-        text = element.text
-        print("Extracted Text:", text)
+        with phase("wait"):
+            return wait.until(dashboard_updated(previous_state))
+    except TimeoutException:
+        raise TimeoutException(f"Dashboard did not update for {country}")
+
 
-        # use regex
+def extract_country_data(driver, country):
+    """Extracts the Overall Rank, Average Life Evaluation and the table with the explanatory factors."""
+    # extract Overall Rank and Average Life Evaluation score per country
+    text = driver.find_element(*SUMMARY).text
+
+    # use regex
+    with phase("parse"):
         rank_match = re.search(r"Rank:\s*(\d+)", text) #\s* zero or more spaces, \d+ one or more digits
         life_eval_match = re.search(r"Average Life Evaluation:\s*([\d.]+)", text) #\d. digit or decimal point
 
@@ -95,76 +175,157 @@ for country in dropdown_countries:
         rank = int(rank_match.group(1)) if rank_match else "N/A"
         life_eval = float(life_eval_match.group(1)) if life_eval_match else "N/A"
 
-        # scrape table with the explanatory factors
-        # initialize dictionaries to store the data for each factor/each row in table
-        factors_dict = {
-            "Social support": {},
-            "GDP per capita": {},
-            "Healthy life expectancy": {},
-            "Freedom": {},
-            "Generosity": {},
-            "Perceptions of corruption": {}
-        }
-
-        rows = driver.find_elements(By.CSS_SELECTOR, ".MuiDataGrid-row")
-
-        # get all column values for each row; removing possible whitespaces.
-        # for missing data -> store N/A
-        for row in rows:
+    # scrape table with the explanatory factors
+    # initialize dictionaries to store the data for each factor/each row in table
+    factors_dict = {factor: {} for factor in FACTORS}
+
+    # get all column values for each row; removing possible whitespaces.
+    # for missing data -> store N/A
+    for row in driver.find_elements(*TABLE_ROWS):
+        try:
+            factor_name = row.find_element(By.CSS_SELECTOR, '[data-field="Factor"]').text.strip()
+            rank_val = row.find_element(By.CSS_SELECTOR, '[data-field="Rank"]').text.strip() or "N/A"
+            value_val = row.find_element(By.CSS_SELECTOR, '[data-field="Value"]').text.strip() or "N/A"
+            explains_val = row.find_element(By.CSS_SELECTOR, '[data-field="Explains"]').text.strip() or "N/A"
+
+            # store extracted values into the corresponding dictionary
+            if factor_name in factors_dict:
+                factors_dict[factor_name]["Rank"] = rank_val
+                factors_dict[factor_name]["Value"] = value_val
+                factors_dict[factor_name]["Explains"] = explains_val
+        except Exception as e:
+            print(f"Skipping a row due to error: {e}")
+            continue
+
+    # merge all extracted data into one row (single dictionary), country leveled
+    row_data = {
+        "Country": country,
+        "Overall Rank": rank, #overall life evaluation score-ranking
+        "Average Life Evaluation": life_eval,
+    }
+
+    # create new keys and get values from sub-dictionaries
+    # new key names to uniquely define the columns in DF/CSV
+    for factor, values in factors_dict.items():
+        row_data[f"{factor} Rank"] = values.get("Rank", "N/A")
+        row_data[f"{factor} Value"] = values.get("Value", "N/A")
+        row_data[f"{factor} Explains"] = values.get("Explains", "N/A")
+
+    return row_data
+
+
+def scrape_world_happiness_report(save_path=RAW_PATH, checkpoint_path=CHECKPOINT_PATH, timeout=20, headless=False,
+                                  lean=None, full_refresh=None):
+    """
+    Scrapes the data of all countries from the World Happiness Report dashboard and saves it as csv.
+    Countries already in the checkpoint file (from an interrupted run) are not scraped again.
+
+    Parameters:
+        save_path (str): path of the raw csv file
+        checkpoint_path (str): path of the checkpoint file (one JSON line per scraped country)
+        timeout (int): maximal seconds to wait for an element/the data of a country
+        headless (bool): run Firefox without a visible window
+        lean (bool): do not load images, fonts, media, trackers and map tiles (lean page mode, see scraper_runtime.py);
+                     None: use the SCRAPER_LEAN_PAGES environment variable
+        full_refresh (bool): read every country again, even if its fingerprint did not change;
+                             None: use the SCRAPER_FULL_REFRESH environment variable
+
+    Returns:
+        pandas DataFrame: the scraped data
+    """
+    done = load_checkpoint(checkpoint_path)
+    if done:
+        print(f"Resuming from checkpoint: {len(done)} countries already scraped.")
+
+    TELEMETRY.start_run()
+
+    # fingerprints and records of the last run
+    store = FingerprintStore("world_happiness_report", full_refresh=full_refresh)
+
+    # setup webdriver
+    driver = create_driver("firefox", headless=headless, lean=lean)
+    wait = WebDriverWait(driver, timeout)
+
+    complete = False
+    try:
+        # load main page and wait for the dashboard
+        with TELEMETRY.entity("dropdown"):
+            get_page(driver, URL)
+            dropdown_countries = retry(get_dropdown_countries, driver, wait)
+            # cheap probe of the data behind the dashboard, before any country is selected
+            page_fp = page_data_fingerprint(driver)
+        print("Number of countries: ", len(dropdown_countries))
+        kept = {}
+
+        for country in dropdown_countries:
+            if country in done:
+                store.touch(country)  # scraped by the interrupted run
+                continue
+
+            # extract the data
             try:
-                factor_name = row.find_element(By.CSS_SELECTOR, '[data-field="Factor"]').text.strip()
-                rank_val = row.find_element(By.CSS_SELECTOR, '[data-field="Rank"]').text.strip() or "N/A"
-                value_val = row.find_element(By.CSS_SELECTOR, '[data-field="Value"]').text.strip() or "N/A"
-                explains_val = row.find_element(By.CSS_SELECTOR, '[data-field="Explains"]').text.strip() or "N/A"
-
-                print(f"Factor row: {factor_name}, Rank: {rank_val}, Value: {value_val}, Explains: {explains_val}")
-
-                # store extracted values into the corresponding dictionary
-                if factor_name in factors_dict:
-                    factors_dict[factor_name]["Rank"] = rank_val
-                    factors_dict[factor_name]["Value"] = value_val
-                    factors_dict[factor_name]["Explains"] = explains_val
+                with TELEMETRY.entity(country):
+                    # stored record if the dashboard data did not change since the last run (nothing to select)
+                    fp = fingerprint(page_fp, country) if page_fp is not None else None
+                    row_data = store.lookup(country, fp) if fp is not None else None
+                    if row_data is None:
+                        # a country whose data is not shown after the retries is skipped (not checkpointed)
+                        state = retry(select_country, driver, wait, country)
+
+                        # full extraction only if the data of the country changed since the last run
+                        if fp is None:
+                            fp = fingerprint(state[0], list(state[1]))
+                            row_data = store.lookup(country, fp)
+                        if row_data is None:
+                            row_data = extract_country_data(driver, country)
+                            store.update(country, fp, row_data)
             except Exception as e:
-                print(f"Skipping a row due to error: {e}")
+                # the country keeps its record of the last run in the csv
+                row_data = store.keep(country)
+                print(f"Could not extract data for {country}: {e}"
+                      + (", keeping the stored record" if row_data is not None else ""))
+                if row_data is not None:
+                    kept[country] = row_data
                 continue
 
-        # merge all extracted data into one row (single dictionary), country leveled
-        row_data = {
-            "Country": country,
-            "Overall Rank": rank, #overall life evaluation score-ranking
-            "Average Life Evaluation": life_eval,
-        }
+            append_checkpoint(checkpoint_path, row_data)
+            done[country] = row_data
 
-        # create new keys and get values from sub-dictionaries
-        # new key names to uniquely define the columns in DF/CSV
-        for factor, values in factors_dict.items():
-            row_data[f"{factor} Rank"] = values.get("Rank", "N/A")
-            row_data[f"{factor} Value"] = values.get("Value", "N/A")
-            row_data[f"{factor} Explains"] = values.get("Explains", "N/A")
+            # keep track of scraping progress
+            print(f"Scraped {len(done)}/{len(dropdown_countries)}: {country}")
+        complete = True
+    finally:
+        driver.quit()
+        # countries of the last run that are not in the dropdown anymore are only removed after a complete run
+        store.save(complete=complete)
+        TELEMETRY.report()
 
-        list_world_happiness_report.append(row_data)
+    print(f"Countries: {store.summary()}")
 
-    except Exception as e:
-        print(f"Could not extract data for {country}: {e}")
-        continue
+    ## store scraped data
+    # convert the rows (scraped, stored and kept ones) into a Dataframe, in the order of the dropdown
+    rows = {**kept, **done}
+    df_world_happiness_report = pd.DataFrame([rows[country] for country in dropdown_countries if country in rows])
 
-    # keep track of scraping progress
-    print("Scraping complete. Total countries: ", len(list_world_happiness_report))
+    # fill any missing cells with "N/A"
+    df_world_happiness_report.fillna("N/A", inplace = True)
 
-driver.quit()
-#print(list_world_happiness_report)
+    if not store.has_changes() and os.path.exists(save_path):
+        print("No country changed, keeping", save_path)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        return df_world_happiness_report
 
-## store scraped data
-import pandas as pd
+    # print a preview
+    print(df_world_happiness_report.head())
 
-# convert list into Dataframe
-df_world_happiness_report = pd.DataFrame(list_world_happiness_report)
+    # save the Dataframe to a CSV file, then the checkpoint is not needed anymore
+    df_world_happiness_report.to_csv(save_path, index = False)
+    if len(done) == len(dropdown_countries) and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
 
-# fill any missing cells with "N/A"
-df_world_happiness_report.fillna("N/A", inplace = True)
+    return df_world_happiness_report
 
-# print a preview
-print(df_world_happiness_report.head())
 
-# save the Dataframe to a CSV file
-df_world_happiness_report.to_csv("./data/raw/world_happiness_report_raw.csv", index = False)
\ No newline at end of file
+if __name__ == "__main__":
+    scrape_world_happiness_report()
@@ -0,0 +1,278 @@
+"""
+Shared runtime for all Selenium scrapers (Better Life, Gallup emotions, World Happiness Report,
+happiness by age, ILOSTAT).
+
+This module provides:
+- create_driver: one place to start Chrome or Firefox (headless or visible). The browser driver is
+  resolved by Selenium Manager (built into Selenium), which caches it locally, so no download check
+  against the internet is done on every run as with ChromeDriverManager().install()
+- lean page mode (opt-in): the scrapers only read text tables, so the browser does not load images,
+  web fonts, media, trackers and map tiles, and get() returns as soon as the HTML is parsed (eager page
+  load strategy) instead of waiting for every resource. Pages load faster and every browser needs
+  less memory, so more workers fit on one machine. Enable it with create_driver(lean=True) or for all
+  scrapers at once with the environment variable SCRAPER_LEAN_PAGES=1
+- DriverPool: reusable browsers for parallel scraping; a browser is health-checked before it is
+  handed out and replaced by a fresh one after max_pages pages to stop its memory from growing
+- RateLimiter: token bucket per host, so parallel workers do not overload a website
+- retry: calls a function again with exponential backoff (and jitter) when it fails
+- get_page: rate-limited page load with retries
+
+Every browser is instrumented for the per-page telemetry (scraper_telemetry.py): its WebDriver commands
+are timed and counted, and the time spent waiting for the rate limiter counts as "wait".
+"""
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from page_archive import archive_options
+from scraper_telemetry import instrument_driver, phase
+
+DEFAULT_PAGE_LOAD_TIMEOUT = 60
+LEAN_ENV = "SCRAPER_LEAN_PAGES"
+
+# Requests blocked in lean page mode (Chrome): web fonts, media, analytics/trackers and map tiles.
+# Images are switched off with a browser preference. Only known third-party hosts are blocked, not all
+# of them, because the tables themselves can come from another host (e.g. the Datawrapper iframes).
+BLOCKED_URL_PATTERNS = [
+    # web fonts
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*use.typekit.net*",
+    # media
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8", "*youtube.com/embed*", "*player.vimeo.com*",
+    # analytics and trackers
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*connect.facebook.net*", "*hotjar.com*", "*newrelic.com*", "*nr-data.net*", "*scorecardresearch.com*",
+    "*quantserve.com*", "*adobedtm.com*", "*omtrdc.net*", "*demdex.net*", "*clarity.ms*", "*linkedin.com/px*",
+    "*cookielaw.org*", "*onetrust.com*",
+    # map tiles
+    "*tile.openstreetmap.org*", "*api.mapbox.com*", "*tiles.mapbox.com*", "*basemaps.cartocdn.com*",
+]
+
+# Firefox preferences of lean page mode (geckodriver has no request blocking like Chrome's DevTools,
+# so the built-in tracking protection is used for the trackers)
+FIREFOX_LEAN_PREFERENCES = {
+    "permissions.default.image": 2,  # no images
+    "gfx.downloadable_fonts.enabled": False,  # no web fonts
+    "media.autoplay.default": 5,  # no media playback
+    "media.autoplay.blocking_policy": 2,
+    "privacy.trackingprotection.enabled": True,  # block known trackers
+    "privacy.trackingprotection.socialtracking.enabled": True,
+}
+
+
+def lean_by_default() -> bool:
+    """Lean page mode is on if the environment variable SCRAPER_LEAN_PAGES is set to 1/true/yes."""
+    return os.environ.get(LEAN_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def create_driver(browser: str = "chrome", headless: bool = True, page_load_timeout: int = DEFAULT_PAGE_LOAD_TIMEOUT,
+                  lean: bool = None):
+    """
+    Starts a Chrome or Firefox browser (behind the record/replay proxy if an archive mode is set, see page_archive.py).
+    lean=True starts it in lean page mode, lean=None uses the SCRAPER_LEAN_PAGES environment variable.
+    """
+    if lean is None:
+        lean = lean_by_default()
+
+    if browser == "chrome":
+        options = webdriver.ChromeOptions()
+        if headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1920,1080")
+        if lean:
+            options.page_load_strategy = "eager"
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        driver = webdriver.Chrome(options=archive_options(options, browser))
+        if lean:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    elif browser == "firefox":
+        options = webdriver.FirefoxOptions()
+        if headless:
+            options.add_argument("-headless")
+        if lean:
+            options.page_load_strategy = "eager"
+            for name, value in FIREFOX_LEAN_PREFERENCES.items():
+                options.set_preference(name, value)
+        driver = webdriver.Firefox(options=archive_options(options, browser))
+    else:
+        raise ValueError(f"Unknown browser: {browser}")
+
+    driver.set_page_load_timeout(page_load_timeout)
+    return instrument_driver(driver)
+
+
+def is_healthy(driver) -> bool:
+    """Checks that the browser still responds."""
+    try:
+        return driver.execute_script("return 1;") == 1
+    except WebDriverException:
+        return False
+
+
+def quit_driver(driver) -> None:
+    """Closes a browser, ignoring errors of browsers that already crashed."""
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass
+
+
+class DriverPool:
+    """
+    Pool of at most `size` browsers shared by worker threads:
+
+        with DriverPool(size=4) as pool:
+            with pool.driver() as driver:
+                driver.get(url)
+
+    Each `with pool.driver()` block counts as one page; a browser is closed and replaced after
+    `max_pages` pages, or right away if it does not respond anymore.
+    """
+
+    def __init__(self, size: int = 1, browser: str = "chrome", headless: bool = True, max_pages: int = 50,
+                 **driver_kwargs):
+        self.size = size
+        self.browser = browser
+        self.headless = headless
+        self.max_pages = max_pages
+        self.driver_kwargs = driver_kwargs
+        self._idle = queue.LifoQueue()  # Most recently used browser first (warm caches)
+        self._pages = {}  # id(driver) -> pages loaded by this browser
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Returns a healthy browser: an idle one, a new one (if the pool is not full) or waits for one."""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        driver = create_driver(self.browser, self.headless, **self.driver_kwargs)
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                    self._pages[id(driver)] = 0
+                    return driver
+                driver = self._idle.get()
+                if driver is None:
+                    # A browser was discarded: its place in the pool is free again
+                    continue
+
+            if driver is None:
+                continue
+            if is_healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def release(self, driver, broken: bool = False) -> None:
+        """Gives a browser back to the pool; it is replaced if it is broken or has loaded max_pages pages."""
+        self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+        if broken or self._pages[id(driver)] >= self.max_pages:
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+
+    def _discard(self, driver) -> None:
+        self._pages.pop(id(driver), None)
+        quit_driver(driver)
+        with self._lock:
+            self._created -= 1
+        # Wake up a thread waiting for a browser, it can start a new one now
+        self._idle.put(None)
+
+    @contextmanager
+    def driver(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, broken=not is_healthy(driver))
+            raise
+        self.release(driver)
+
+    def close(self) -> None:
+        """Closes all idle browsers."""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None:
+                self._pages.pop(id(driver), None)
+                quit_driver(driver)
+                with self._lock:
+                    self._created -= 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RateLimiter:
+    """Token bucket per host: on average `rate` requests per second, short bursts of up to `burst` requests."""
+
+    def __init__(self, rate: float = 1.0, burst: int = 2):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # host -> (tokens, time of last update)
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> float:
+        """Blocks until a request to the host of `url` is allowed; returns the seconds waited."""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            # Take the token now (the balance may become negative), so waiting threads queue up fairly
+            delay = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+            self._buckets[host] = (tokens - 1, now)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+# Limiter shared by all scrapers of a process
+RATE_LIMITER = RateLimiter()
+
+
+def retry(func, *args, attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+          exceptions: tuple = (Exception,), **kwargs):
+    """Calls func(*args, **kwargs); on failure waits base_delay * 2^(attempt-1) (with jitter) and tries again."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return func(*args, **kwargs)
+        except exceptions as e:
+            if attempt == attempts:
+                raise
+            delay = min(max_delay, base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            print(f"Attempt {attempt}/{attempts} failed ({e.__class__.__name__}: {e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def get_page(driver, url: str, limiter: RateLimiter = RATE_LIMITER, attempts: int = 3) -> None:
+    """Loads a page, respecting the rate limit of its host and retrying on browser errors."""
+    def load():
+        if limiter is not None:
+            with phase("wait"):
+                limiter.wait(url)
+        driver.get(url)
+
+    retry(load, attempts=attempts, exceptions=(WebDriverException,))
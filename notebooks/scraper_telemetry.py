@@ -0,0 +1,214 @@
+"""
+Per-page telemetry shared by all Selenium scrapers.
+
+For every entity a scraper handles (a country page, an emotion, a topic page, ...) the time is split into:
+- navigation: page loads (WebDriver get/back/refresh)
+- wait:       explicit waits (WebDriverWait, fixed sleeps) and the rate limiter
+- lookup:     element lookups and reads (find_element(s), .text, page_source, ...)
+- script:     JavaScript calls (execute_script / execute_async_script)
+- interact:   clicks and key presses
+- parse:      parsing in Python (BeautifulSoup, regex, ...)
+- other:      remaining WebDriver commands
+and the WebDriver commands that were sent to the browser are counted.
+
+Usage in a scraper:
+
+    TELEMETRY = Telemetry("world_happiness_report")
+    TELEMETRY.start_run()
+    with TELEMETRY.entity(country):
+        get_page(driver, url)               # timed automatically (command "get")
+        with phase("wait"):
+            wait.until(...)                 # commands sent while waiting count as wait
+        with phase("parse"):
+            parse(driver.page_source)
+    TELEMETRY.report()
+
+The WebDriver commands are timed and counted by wrapping the execute() method of the driver
+(instrument_driver, called by scraper_runtime.create_driver). Commands that are sent outside of an entity
+are not recorded.
+
+One JSON line per entity is appended to ../data/telemetry/<scraper>.jsonl; report() prints the summary
+table of the run and writes it to ../data/telemetry/<scraper>_summary.csv. Comparing runs (e.g. to find
+a regression):  python scraper_telemetry.py ../data/telemetry/<scraper>.jsonl
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+TELEMETRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "telemetry")
+PHASES = ["navigation", "wait", "lookup", "script", "interact", "parse", "other"]
+
+# WebDriver command name -> phase
+COMMAND_PHASES = {
+    "get": "navigation", "goBack": "navigation", "goForward": "navigation", "refresh": "navigation",
+    "findElement": "lookup", "findElements": "lookup", "findChildElement": "lookup",
+    "findChildElements": "lookup", "getElementText": "lookup", "getElementAttribute": "lookup",
+    "getElementProperty": "lookup", "getElementTagName": "lookup", "getPageSource": "lookup",
+    "isElementEnabled": "lookup", "isElementSelected": "lookup", "getElementRect": "lookup",
+    "w3cExecuteScript": "script", "w3cExecuteScriptAsync": "script",
+    "clickElement": "interact", "sendKeysToElement": "interact", "clearElement": "interact",
+    "actions": "interact",
+}
+
+_current = threading.local()  # record of the entity the current thread is working on
+
+
+class EntityRecord:
+    """Timings and WebDriver command counts of one entity."""
+
+    def __init__(self, entity):
+        self.entity = str(entity)
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.commands = 0
+        self.command_counts = {}
+        self.active_phase = None
+
+    def add_command(self, command, seconds):
+        self.commands += 1
+        self.command_counts[command] = self.command_counts.get(command, 0) + 1
+        # inside an explicit phase (e.g. a wait) the time is counted by the phase itself
+        if self.active_phase is None:
+            self.phases[COMMAND_PHASES.get(command, "other")] += seconds
+
+
+@contextmanager
+def phase(name):
+    """Counts the time of the block as `name` for the current entity (does nothing outside of an entity)."""
+    record = getattr(_current, "record", None)
+    if record is None or record.active_phase is not None:
+        yield
+        return
+    record.active_phase = name
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record.phases[name] = record.phases.get(name, 0.0) + time.perf_counter() - start
+        record.active_phase = None
+
+
+def instrument_driver(driver):
+    """Wraps the execute() method of a WebDriver so that every command is timed and counted."""
+    execute = driver.execute
+    if getattr(execute, "instrumented", False):
+        return driver
+
+    def timed_execute(driver_command, params=None):
+        record = getattr(_current, "record", None)
+        if record is None:
+            return execute(driver_command, params)
+        start = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            record.add_command(driver_command, time.perf_counter() - start)
+
+    timed_execute.instrumented = True
+    driver.execute = timed_execute
+    return driver
+
+
+class Telemetry:
+    """Collects the entity records of one scraper and writes them as JSON lines."""
+
+    def __init__(self, scraper, directory=TELEMETRY_DIR):
+        self.scraper = scraper
+        self.path = os.path.join(directory, scraper + ".jsonl")
+        self.summary_path = os.path.join(directory, scraper + "_summary.csv")
+        self.records = []
+        self._lock = threading.Lock()
+        self.start_run()
+
+    def start_run(self):
+        """Starts a new run: the records of the previous run are no longer part of the summary."""
+        self.run_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.records = []
+
+    @contextmanager
+    def entity(self, entity):
+        """Records the timings of everything the current thread does in the block for this entity."""
+        record = EntityRecord(entity)
+        previous = getattr(_current, "record", None)
+        _current.record = record
+        started_at = time.time()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield record
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+            raise
+        finally:
+            _current.record = previous
+            self._write({
+                "scraper": self.scraper,
+                "run_id": self.run_id,
+                "entity": record.entity,
+                "started_at": started_at,
+                "seconds": round(time.perf_counter() - start, 4),
+                **{f"{name}_s": round(seconds, 4) for name, seconds in record.phases.items()},
+                "commands": record.commands,
+                "command_counts": record.command_counts,
+                "error": error,
+            })
+
+    def _write(self, row):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            self.records.append(row)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def summary(self) -> pd.DataFrame:
+        """Summary table of the current run: total, mean and max time per phase and the command counts."""
+        return summarize(pd.DataFrame(self.records))
+
+    def report(self) -> pd.DataFrame:
+        """Prints the summary table of the current run and writes it to <scraper>_summary.csv."""
+        table = self.summary()
+        if table.empty:
+            return table
+        print(f"\nTelemetry {self.scraper} (run {self.run_id}, {len(self.records)} entities):")
+        print(table.to_string(float_format=lambda x: f"{x:.3f}"))
+        table.to_csv(self.summary_path)
+        return table
+
+
+def summarize(df: pd.DataFrame) -> pd.DataFrame:
+    """Total, mean per entity, max and share of the time per phase (plus WebDriver commands) of entity records."""
+    if df.empty:
+        return pd.DataFrame()
+    columns = [f"{name}_s" for name in PHASES if f"{name}_s" in df.columns] + ["seconds", "commands"]
+    block = df[columns]
+    table = pd.DataFrame({"total": block.sum(), "mean": block.mean(), "max": block.max()})
+    table["share"] = table["total"] / table.loc["seconds", "total"]
+    table.loc["commands", "share"] = float("nan")
+    table.index = [name.removesuffix("_s") for name in table.index]
+    return table
+
+
+def load_runs(path) -> pd.DataFrame:
+    """Reads a telemetry JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+
+
+def compare_runs(path) -> pd.DataFrame:
+    """Mean seconds per entity and phase (and WebDriver commands per entity) for every run of a JSONL file."""
+    df = load_runs(path)
+    columns = [f"{name}_s" for name in PHASES if f"{name}_s" in df.columns] + ["seconds", "commands"]
+    table = df.groupby("run_id", sort=True)[columns].mean()
+    table.insert(0, "entities", df.groupby("run_id").size())
+    return table
+
+
+if __name__ == "__main__":
+    for telemetry_path in sys.argv[1:]:
+        print(telemetry_path)
+        print(compare_runs(telemetry_path).to_string(float_format=lambda x: f"{x:.3f}"))
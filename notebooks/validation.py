@@ -0,0 +1,170 @@
+"""
+Vectorized validation of cleaned datasets with declarative rules, shared by the cleaning scripts.
+
+The rules of a dataset are a dict column -> rule, a rule has the keys (all optional, see DEFAULT_RULE):
+- "range":       (min, max) expected values, None: no range check
+- "iqr":         factor k of the IQR fences [q1 - k*IQR, q3 + k*IQR] for statistical outliers, None: no check
+- "max_missing": allowed share of missing values (0.0 - 1.0), None: no check
+
+    rules = {"Unemployment rate (%)": {"range": (0, 100)}, "GDP per hour worked ($)": {"range": (0, 200)}}
+    report = validate(df, rules)
+
+All statistics of all columns are computed in one pass over the block of columns (one quantile([.25, .75]),
+one comparison per check), instead of separate scans per column. validate() returns a report DataFrame with one
+row per column: dtype, missing values, min/max, quartiles and fences, the number of values out of range and of
+outliers, the affected rows (arrays of index labels) and whether the column passed. report_to_json() writes it as JSON.
+
+Unless quiet, a short summary is printed, with the id (e.g. Country) and value of every flagged row.
+quiet=None uses the VALIDATION_QUIET environment variable, so batch jobs can switch the output off:
+    VALIDATION_QUIET=1 python clean_ilostat_all.py
+"""
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+QUIET_ENV = "VALIDATION_QUIET"
+
+DEFAULT_RULE = {"range": None, "iqr": 1.5, "max_missing": None}
+
+
+def quiet_by_default() -> bool:
+    """True if the VALIDATION_QUIET environment variable is set (to anything but 0/false/no)."""
+    return os.environ.get(QUIET_ENV, "").strip().lower() not in ("", "0", "false", "no")
+
+
+def validate(df: pd.DataFrame, rules: dict, id_column: str = "Country", quiet: bool = None) -> pd.DataFrame:
+    """
+    Checks the columns of a DataFrame against their rules in one vectorized pass.
+
+    Parameters:
+        df (pd.DataFrame): the cleaned data
+        rules (dict): column -> rule (see DEFAULT_RULE); columns that are not in df are reported as not found
+        id_column (str): column used to name the flagged rows in the printed summary
+        quiet (bool): do not print the summary (None: VALIDATION_QUIET environment variable)
+
+    Returns:
+        pd.DataFrame: the report, one row per column (index: column name)
+    """
+    quiet = quiet_by_default() if quiet is None else quiet
+    rules = {col: {**DEFAULT_RULE, **(rule or {})} for col, rule in rules.items()}
+    found = [col for col in rules if col in df.columns]
+    numeric = [col for col in found if pd.api.types.is_numeric_dtype(df[col])]
+
+    # one block of floats (NaN for missing) for all numeric columns, column-major: the statistics run down columns
+    values = np.empty((len(df), len(numeric)), dtype="float64", order="F")
+    for j, col in enumerate(numeric):
+        values[:, j] = df[col].astype("float64").to_numpy()  # nullable integers: <NA> -> NaN
+    missing = np.isnan(values)
+
+    expected_min = np.array([(rules[col]["range"] or (-np.inf, np.inf))[0] for col in numeric], dtype=float)
+    expected_max = np.array([(rules[col]["range"] or (-np.inf, np.inf))[1] for col in numeric], dtype=float)
+    iqr_factor = np.array([np.nan if rules[col]["iqr"] is None else rules[col]["iqr"] for col in numeric],
+                          dtype=float)
+
+    # quartiles of all columns at once (linear interpolation, like pd.Series.quantile); NaN for empty columns
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0) if len(values) else np.full((2, len(numeric)), np.nan)
+    lower_fence = q1 - iqr_factor * (q3 - q1)
+    upper_fence = q3 + iqr_factor * (q3 - q1)
+
+    with np.errstate(invalid="ignore"):
+        out_of_range = (values < expected_min) | (values > expected_max)
+        outliers = (values < lower_fence) | (values > upper_fence)
+
+    report = pd.DataFrame({
+        "dtype": [str(df[col].dtype) for col in numeric],
+        "rows": len(df),
+        "missing": missing.sum(axis=0),
+        "missing_share": missing.mean(axis=0) if len(df) else 0.0,
+        "min": np.fmin.reduce(values, axis=0) if len(values) else np.nan,
+        "max": np.fmax.reduce(values, axis=0) if len(values) else np.nan,
+        "q1": q1,
+        "q3": q3,
+        "lower_fence": lower_fence,
+        "upper_fence": upper_fence,
+        "expected_min": expected_min,
+        "expected_max": expected_max,
+        "out_of_range": out_of_range.sum(axis=0),
+        "outliers": outliers.sum(axis=0),
+        "missing_rows": _rows(df.index, missing),
+        "out_of_range_rows": _rows(df.index, out_of_range),
+        "outlier_rows": _rows(df.index, outliers),
+    }, index=pd.Index(numeric, name="column"))
+
+    max_missing = np.array([np.inf if rules[col]["max_missing"] is None else rules[col]["max_missing"]
+                            for col in numeric], dtype=float)
+    report["passed"] = (report["out_of_range"] == 0) & (report["missing_share"] <= max_missing)
+
+    # columns that cannot be checked
+    not_found = [col for col in rules if col not in df.columns]
+    not_numeric = [col for col in found if col not in numeric]
+    report.attrs["not_found"] = not_found
+    report.attrs["not_numeric"] = {col: str(df[col].dtype) for col in not_numeric}
+
+    if not quiet:
+        print_report(report, df, id_column)
+    return report
+
+
+def _rows(index: pd.Index, mask: np.ndarray) -> list:
+    """Index labels (array) of the flagged rows, per column of the mask."""
+    return [index[np.flatnonzero(mask[:, j])].to_numpy() for j in range(mask.shape[1])]
+
+
+def failed(report: pd.DataFrame) -> pd.DataFrame:
+    """Rows of the report of the columns that did not pass."""
+    return report[~report["passed"]]
+
+
+def print_report(report: pd.DataFrame, df: pd.DataFrame, id_column: str = "Country") -> None:
+    """Prints the summary of a validation report, with the id and value of every flagged row."""
+    def names(col, rows):
+        ids = df.loc[rows, id_column] if id_column in df.columns else pd.Series(rows, index=rows)
+        return "; ".join(f"{name} ({value:g})" if pd.notna(value) else str(name)
+                         for name, value in zip(ids, df.loc[rows, col]))
+
+    print("\n--- Validation ---")
+    for col in report.attrs.get("not_found", []):
+        print(f"Column '{col}' not found.")
+    for col, dtype in report.attrs.get("not_numeric", {}).items():
+        print(f"Column '{col}' is not numeric (data type: {dtype}).")
+    if not report.empty:
+        print(report[["dtype", "missing", "min", "max", "out_of_range", "outliers", "passed"]]
+              .to_string(float_format=lambda x: f"{x:g}"))
+
+    for col, row in report.iterrows():
+        if row["missing"]:
+            print(f"\n'{col}' missing values: {names(col, row['missing_rows'])}")
+        if row["out_of_range"]:
+            print(f"'{col}' values outside range ({row['expected_min']:g}, {row['expected_max']:g}): "
+                  f"{names(col, row['out_of_range_rows'])}")
+        if row["outliers"]:
+            print(f"'{col}' statistical outliers (IQR method, fences {row['lower_fence']:g} - "
+                  f"{row['upper_fence']:g}): {names(col, row['outlier_rows'])}")
+    print("--- End of Validation ---")
+
+
+def report_to_json(report: pd.DataFrame, path: str = None, dataset: str = None) -> str:
+    """The report as JSON (infinite bounds become null); written to `path` if given."""
+    table = report.reset_index()
+    numbers = table.select_dtypes("float").columns
+    table[numbers] = table[numbers].replace([np.inf, -np.inf], np.nan)
+    for col in ["missing_rows", "out_of_range_rows", "outlier_rows"]:
+        table[col] = [rows.tolist() for rows in table[col]]
+    columns = json.loads(table.to_json(orient="records"))
+    document = json.dumps({
+        "dataset": dataset,
+        "passed": bool(report["passed"].all()) and not report.attrs.get("not_found"),
+        "columns": columns,
+        "not_found": report.attrs.get("not_found", []),
+        "not_numeric": report.attrs.get("not_numeric", {}),
+    }, indent=2, ensure_ascii=False)
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(document)
+    return document
@@ -0,0 +1,130 @@
+"""
+Cached reading of Excel workbooks (e.g. the happiness index, data/clean/happinessindex.xlsx) through a columnar
+sidecar file.
+
+Parsing a workbook (openpyxl) is by far the slowest read of the pipeline. read_workbook() parses it once and
+writes the table to a sidecar file in ../data/cache/sidecars/ (Parquet if pyarrow is installed, else a pandas
+pickle), which all later reads use:
+- within a process, the table is kept in memory; every call returns a copy, so callers can change their frame
+  without changing the cached one
+- across processes, the sidecar file is read instead of the workbook
+The sidecar belongs to one version of the workbook: its metadata (json) holds the size, modification time and
+SHA-256 hash of the workbook. If the size or the hash differ, the workbook is parsed again (a changed modification
+time alone, e.g. after a checkout, only costs hashing the file).
+
+    df_happiness = load_happiness_index()               # all years
+    df_happiness_2024 = load_happiness_index(2024)
+"""
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+from dataset_schemas import ROOT
+
+try:
+    import pyarrow  # noqa: F401
+    SIDECAR_FORMAT = "parquet"
+except ImportError:
+    SIDECAR_FORMAT = "pickle"
+
+HAPPINESS_INDEX_PATH = os.path.normpath(os.path.join(ROOT, "data", "clean", "happinessindex.xlsx"))
+SIDECAR_DIR = os.path.normpath(os.path.join(ROOT, "data", "cache", "sidecars"))
+
+# absolute path and sheet -> (size, modification time, table) of the workbooks read in this process
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _file_hash(path: str) -> str:
+    """SHA-256 hash of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sidecar_paths(path: str, sheet_name=0, sidecar_dir: str = SIDECAR_DIR) -> tuple:
+    """Paths of the sidecar file and of its metadata for a workbook sheet."""
+    name = f"{os.path.splitext(os.path.basename(path))[0]}.{sheet_name}"
+    extension = ".parquet" if SIDECAR_FORMAT == "parquet" else ".pkl"
+    return os.path.join(sidecar_dir, name + extension), os.path.join(sidecar_dir, name + ".json")
+
+
+def _read_sidecar(path: str, sheet_name, sidecar_dir: str, stat: os.stat_result):
+    """The table of a valid sidecar file of the workbook, None if there is none or it belongs to another version."""
+    data_path, meta_path = sidecar_paths(path, sheet_name, sidecar_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != SIDECAR_FORMAT or meta.get("size") != stat.st_size:
+        return None
+    if meta.get("mtime_ns") != stat.st_mtime_ns:
+        if meta.get("sha256") != _file_hash(path):
+            return None
+        meta["mtime_ns"] = stat.st_mtime_ns  # same content, only touched: keep the sidecar
+        _write_meta(meta_path, meta)
+    return pd.read_parquet(data_path) if SIDECAR_FORMAT == "parquet" else pd.read_pickle(data_path)
+
+
+def _write_meta(meta_path: str, meta: dict) -> None:
+    """Writes the metadata of a sidecar file via a temporary file."""
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def _write_sidecar(df: pd.DataFrame, path: str, sheet_name, sidecar_dir: str, stat: os.stat_result) -> None:
+    """Writes the sidecar file and its metadata (via temporary files, an interrupted run leaves no broken sidecar)."""
+    data_path, meta_path = sidecar_paths(path, sheet_name, sidecar_dir)
+    os.makedirs(sidecar_dir, exist_ok=True)
+    if SIDECAR_FORMAT == "parquet":
+        df.to_parquet(data_path + ".tmp", index=False)
+    else:
+        df.to_pickle(data_path + ".tmp", compression=None)
+    os.replace(data_path + ".tmp", data_path)
+    _write_meta(meta_path, {"source": os.path.basename(path), "sheet": sheet_name, "format": SIDECAR_FORMAT,
+                            "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _file_hash(path)})
+
+
+def read_workbook(path: str, sheet_name=0, sidecar_dir: str = SIDECAR_DIR) -> pd.DataFrame:
+    """
+    Reads a workbook sheet like pd.read_excel(path, sheet_name), through the process cache and the sidecar file.
+
+    Parameters:
+        path (str): the Excel workbook
+        sheet_name: the sheet (name or position)
+        sidecar_dir (str): folder of the sidecar files (None: no sidecar file, only the process cache)
+
+    Returns:
+        pd.DataFrame: a copy of the cached table
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _cache_lock:
+        cached = _cache.get((path, sheet_name))
+        if cached is None or cached[:2] != (stat.st_size, stat.st_mtime_ns):
+            df = _read_sidecar(path, sheet_name, sidecar_dir, stat) if sidecar_dir else None
+            if df is None:
+                df = pd.read_excel(path, sheet_name=sheet_name)
+                if sidecar_dir:
+                    _write_sidecar(df, path, sheet_name, sidecar_dir, stat)
+            cached = (stat.st_size, stat.st_mtime_ns, df)
+            _cache[(path, sheet_name)] = cached
+    return cached[2].copy()
+
+
+def load_happiness_index(year: int = None, path: str = HAPPINESS_INDEX_PATH) -> pd.DataFrame:
+    """The happiness index table (Year, Rank, Country name, Ladder score, ...), all years or one year."""
+    df = read_workbook(path)
+    return df if year is None else df[df["Year"] == year]
+
+
+def clear_cache() -> None:
+    """Empties the process cache (the sidecar files are kept)."""
+    with _cache_lock:
+        _cache.clear()
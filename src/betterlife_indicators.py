@@ -0,0 +1,222 @@
+#######################################################
+# Better Life Index Indicator Specification
+# #####################################################
+#  This module describes which values are collected from a country page of the Better Life Index webpage
+# ("https://www.oecdbetterlifeindex.org/#/11111111111") and under which column name they are stored.
+#
+#  It also contains the snapshot extraction engine: the HTML of a country page is read from the browser once
+# (one page_source call) and all values are resolved from this snapshot in Python, instead of asking the
+# browser for every single element.
+#
+#  Used by: scrape.betterlifeindex.py
+###########################################################################################################
+
+from bs4 import BeautifulSoup
+
+# Use the fast lxml parser if it is installed, otherwise the built-in html.parser:
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+# Column names of the values in the "Did you know?" table (in the order of the table rows):
+DID_YOU_KNOW_COLUMNS = ["Population", "Visitors", "Renewable_Energy"]
+
+# Column names of the values in the "Topics" section (in the order of the topics on the page):
+TOPIC_COLUMNS = ["Housing", "Income", "Jobs", "Community", "Education", "Environment", "Civic_Engagement",
+                 "Health", "Life_Satisfaction", "Safety", "Work_Life_Balance"]
+
+# Sections of the country page the values are extracted from (fingerprinted by the delta scraping):
+PROBE_SELECTORS = "h1, .span3 table, #topics, div[data-indicator-id]"
+
+# Indicator sections of the country page:
+#   id:         data-indicator-id of the section
+#   key:        column name of the indicator value
+#   gender_key: column name of the Gender Inequality value (None if it is not scraped)
+#   social_key: column name of the Social Inequality value (None if it is not scraped)
+INDICATOR_SPECS = [
+    # Housing:
+    {"id": "HO_NUMR",  "key": "Rooms_per_person",           "gender_key": None, "social_key": None},
+    {"id": "HO_BASE",  "key": "Basic_Facilities",           "gender_key": None, "social_key": None},
+    {"id": "HO_HISH",  "key": "Housing_Expenditure",        "gender_key": None, "social_key": None},
+    # Income:
+    {"id": "IW_HADI",  "key": "Net_Disposable_Income",      "gender_key": None,
+     "social_key": "Social_Inequality_Income"},
+    {"id": "IW_HNFW",  "key": "Net_wealth",                 "gender_key": None, "social_key": None},
+    # Jobs:
+    {"id": "JE_EMPL",  "key": "Employment_Rate",            "gender_key": "Gender_Inequality_Employment",
+     "social_key": "Social_Inequality_Employment"},
+    {"id": "JE_LTUR",  "key": "Long_Term_Unemployment",     "gender_key": "Gender_Inequality_Unemployment",
+     "social_key": "Social_Inequality_Unemployment"},
+    {"id": "JE_PEARN", "key": "Personal_Earnings",          "gender_key": "Gender_Inequality_Earnings",
+     "social_key": "Social_Inequality_Earnings"},
+    {"id": "JE_JT",    "key": "Job_Security",               "gender_key": None, "social_key": None},
+    # Community:
+    {"id": "SC_SNTWS", "key": "Quality_of_Support_Network", "gender_key": "Gender_Inequality_Community",
+     "social_key": "Social_Inequality_Community"},
+    # Education:
+    {"id": "ES_EDUA",  "key": "Educational_Attainment",     "gender_key": "Gender_Inequality_Education",
+     "social_key": None},
+    {"id": "ES_STCS",  "key": "Student_Skills",             "gender_key": "Gender_Inequality_Skills",
+     "social_key": "Social_Inequality_Skills"},
+    {"id": "ES_EDUEX", "key": "Years_in_Education",         "gender_key": "Gender_Inequality_Years_Education",
+     "social_key": None},
+    # Environment:
+    {"id": "EQ_AIRP",  "key": "Air_Pollution",              "gender_key": None, "social_key": None},
+    {"id": "EQ_WATER", "key": "Water_Quality",              "gender_key": None, "social_key": None},
+    # Civic Engagement:
+    {"id": "CG_VOTO",  "key": "Voter_Turnout",              "gender_key": "Gender_Inequality_Voter",
+     "social_key": "Social_Inequality_Voter"},
+    {"id": "CG_TRASG", "key": "Stakeholder_Engagement",     "gender_key": None, "social_key": None},
+    # Health:
+    {"id": "HS_LEB",   "key": "Life_Expectancy",            "gender_key": "Gender_Inequality_Life_Expectancy",
+     "social_key": None},
+    {"id": "HS_SFRH",  "key": "Self_Reported_Health",       "gender_key": "Gender_Inequality_Health",
+     "social_key": "Social_Inequality_Health"},
+    # Life Satisfaction:
+    {"id": "SW_LIFS",  "key": "Life_Satisfaction_2",        "gender_key": "Gender_Inequality_Satisfaction",
+     "social_key": "Social_Inequality_Satisfaction"},
+    # Safety:
+    {"id": "PS_SFRV",  "key": "Safe_at_Night",              "gender_key": "Gender_Inequality_Safety",
+     "social_key": None},
+    {"id": "PS_REPH",  "key": "Homicide_Rate",              "gender_key": "Gender_Inequality_Homicide",
+     "social_key": None},
+    # Work-Life Balance:
+    {"id": "WL_EWLH",  "key": "Long_Hours",                 "gender_key": "Gender_Inequality_Long_Hours",
+     "social_key": None},
+    {"id": "WL_TNOW",  "key": "Free_Time",                  "gender_key": "Gender_Inequality_Free_Time",
+     "social_key": None},
+]
+
+
+def element_text(element):
+    """
+    Return the text of an element the way the browser displays it: whitespace runs collapsed into one space.
+
+    Parameters:
+        element (bs4.Tag): element of the snapshot
+
+    Returns:
+        str: the text of the element
+    """
+    return " ".join(element.get_text().split())
+
+
+def values_to_columns(values, columns):
+    """
+    Assign the values to the column names in order, "N/A" if there are fewer values than columns.
+
+    Parameters:
+        values (list): scraped values
+        columns (list): column names
+
+    Returns:
+        dict: column name -> value
+    """
+    return {column: values[i] if len(values) > i else "N/A" for i, column in enumerate(columns)}
+
+
+def extract_indicator(section, spec, dict_country):
+    """
+    Extract the values of one indicator section from the snapshot into dict_country.
+
+    Parameters:
+        section (bs4.Tag): the div with the data-indicator-id of the indicator (None if the page has no such section)
+        spec (dict): indicator specification, one entry of INDICATOR_SPECS
+        dict_country (dict): dictionary collecting all data of the current country, filled in place
+    """
+    gender_key = spec["gender_key"]
+    social_key = spec["social_key"]
+
+    if section is None:
+        print(f"No section found for {spec['id']}")
+        dict_country[spec["key"]] = "N/A"
+        if gender_key:
+            dict_country[gender_key] = "N/A"
+        if social_key:
+            dict_country[social_key] = "N/A"
+        return
+
+    list_of_values = [element_text(value) for value in section.select(".value")]
+    dict_country[spec["key"]] = list_of_values[0] if list_of_values else "N/A"
+
+    # The "trend section" also has a "value", in which case the gender and social inequality values are shifted:
+    trend_shift = 1 if section.select_one(".trend.section") is not None else 0
+
+    if gender_key:
+        if section.select_one(".gender.inequality.section") is not None:
+            idx = 1 + trend_shift
+            dict_country[gender_key] = list_of_values[idx] if len(list_of_values) > idx else "N/A"
+        else:
+            dict_country[gender_key] = "N/A"
+            print(f"No gender inequality section for {spec['id']}")
+
+    if social_key:
+        if section.select_one(".social.inequality.section") is not None:
+            idx = 2 + trend_shift if gender_key else 1 + trend_shift
+            dict_country[social_key] = list_of_values[idx] if len(list_of_values) > idx else "N/A"
+        else:
+            dict_country[social_key] = "N/A"
+            print(f"No social inequality section for {spec['id']}")
+
+
+def extract_country_from_html(html):
+    """
+    Extract all data of a country page from its HTML snapshot.
+
+    Parameters:
+        html (str): HTML of the country page (driver.page_source)
+
+    Returns:
+        dict: the collected data of the country (keys are the column names of the csv file)
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    dict_country = {}
+
+    # Country name:
+    country_name = soup.find("h1")
+    dict_country["Country"] = element_text(country_name) if country_name else "N/A"
+
+    # Section "Did you know?": first cell of every row of the table
+    table_values = []
+    block_did_you_know = soup.select_one(".span3")
+    table = block_did_you_know.find("table") if block_did_you_know else None
+    if table is not None:
+        for row in table.select("tbody tr"):
+            value = row.find("td")
+            if value is not None:
+                table_values.append(element_text(value))
+    dict_country.update(values_to_columns(table_values, DID_YOU_KNOW_COLUMNS))
+
+    # Section "Topics":
+    element_topics = soup.find(id="topics")
+    list_values = [element_text(topic) for topic in element_topics.select(".value")] if element_topics else []
+    dict_country.update(values_to_columns(list_values, TOPIC_COLUMNS))
+
+    # Indicator sections, all looked up in one pass over the snapshot:
+    sections = {}
+    for section in soup.select("div[data-indicator-id]"):
+        sections.setdefault(section["data-indicator-id"], section)
+
+    for spec in INDICATOR_SPECS:
+        extract_indicator(sections.get(spec["id"]), spec, dict_country)
+
+    return dict_country
+
+
+def probe_texts_from_html(html):
+    """
+    Return the text of the data sections (PROBE_SELECTORS) of a country page, the cheap probe of the delta scraping.
+
+    Parameters:
+        html (str): HTML of the country page (e.g. downloaded over HTTP)
+
+    Returns:
+        list: the texts of the sections, empty if the page has no indicator sections (e.g. rendered by JavaScript)
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    if soup.select_one("div[data-indicator-id]") is None:
+        return []
+    return [element_text(element) for element in soup.select(PROBE_SELECTORS)]
@@ -12,15 +12,39 @@
 # clean all the columns and write the cleaned dataframe into the "/data/clean/betterlife.clean.csv" file.
 ###############################################################################################################
 
+import os
+import sys
+
 import pandas as pd
-import numpy as np
-import re
+
+# The dataset schemas and the numeric parsing shared by all cleaning scripts are in the notebooks folder:
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "notebooks"))
+from dataset_schemas import number_text_columns, raw_path, read_raw
+from numeric_parsing import parse_numeric
+
+
+def clean_mixed_columns(df, columns):
+    """
+    Cleans several DataFrame columns at once by removing not numeric characters such as '%','~' symbols and units
+    ('USD', 'years', 'rooms', ...), and after that converting the values to float.
+    All cells of the columns are parsed in one pass by the shared numeric parsing (notebooks/numeric_parsing.py);
+    cells without a valid number (e.g. NaN, "N/A") become NaN. The unit of every column is in result.attrs["units"].
+
+    Parameters:
+    df (Pandas.DataFrame): The data frame.
+    columns (list): The names of the columns to clean.
+
+    Returns:
+    Pandas.DataFrame: The cleaned columns (float), same index as df.
+    """
+    return parse_numeric(df, columns, integers=False)
+
 
 # Function to remove all not numeric characters from a string:
 def clean_mixed_column2(column):
     """
     Cleans a DataFrame column by removing not numeric characters such as '%','~' symbols and letters,
-    and after that converting the value to float.
+    and after that converting the value to float (NaN if no number is left).
     
     Parameters:
     column (Pandas.Series): The column of a data frame to clean.
@@ -28,7 +52,7 @@ def clean_mixed_column2(column):
     Returns:
     Pandas.Series: The cleaned column as a Pandas.Series
     """
-    return column.astype(str).apply(lambda x: float(re.sub(r'[^0-9.]', '', x)))
+    return clean_mixed_columns(column.to_frame(), [column.name])[column.name]
 
 
 def main():
@@ -46,22 +70,18 @@ def main():
        /data/clean/betterlife.clean.csv: the cleaned Better Life Index data       
     """
     # Set path to raw data file:
-    path_to_betterlife_raw="/data/raw/betterlife_index.raw.csv"
+    path_to_betterlife_raw = raw_path("betterlife")
 
-    # Read raw data:
-    df_raw = pd.read_csv(path_to_betterlife_raw)
-   
-    # Select all "object" columns of the dataframe:
-    object_columns = df_raw.select_dtypes(include=['object'])
+    # Read raw data with its schema (notebooks/dataset_schemas.py): the indices and ratios are read as float,
+    # the columns with units ('%', 'USD', 'years', ...) as text:
+    df_raw = read_raw("betterlife", path_to_betterlife_raw)
 
-    # We want to clean all "object" columns of the dataframe except for "Country":
-    # Select "object" (string) columns except for "Country" column:
-    filtered_columns = [col for col in object_columns if col != 'Country']
+    # We want to clean all text columns with units of the dataframe (all "object" columns except for "Country"):
+    filtered_columns = number_text_columns("betterlife")
 
     # Creating a deep copy of the original dataframe and clean it:
     df_clean = df_raw.copy()
-    for col in filtered_columns:
-        df_clean[col] = clean_mixed_column2(df_raw[col])
+    df_clean[filtered_columns] = clean_mixed_columns(df_raw, filtered_columns)
 
     # Save cleaned data frame into the /data/clean folder as betterlife.clean.csv :
     df_clean.to_csv("../data/clean/betterlife.clean.csv", index=False)    
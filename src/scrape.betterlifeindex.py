@@ -8,30 +8,81 @@
 #
 #  Output: 
 #      csv file with the raw data frame: "/data/raw/betterlife_index.raw.csv"
+#
+#  The country pages can be scraped one after another with a single browser (n_workers=1) or in parallel
+#  by a pool of headless browsers (n_workers > 1). Each worker fills its own dictionary per country and the
+#  results are merged back into the order of the country dropdown list, so the csv layout is the same.
+#
+#  The browsers, the rate limit per host and the retries come from the shared scraper runtime
+#  (notebooks/scraper_runtime.py); a browser of the pool is replaced after MAX_PAGES_PER_BROWSER pages.
+# There are no fixed sleeps: the scraper waits until the dropdown list or the data of a country is shown
+# (a country page is shown when its title changed and its sections are rendered, see country_page_shown).
+#
+#  By default the values of a country page are extracted from one HTML snapshot of the page (see
+#  betterlife_indicators.py); the columns that are collected are listed in the INDICATOR_SPECS table there.
+#
+#  Telemetry: the time of every country page is split into navigation, waits, element lookups and parsing, and
+# the WebDriver commands are counted (notebooks/scraper_telemetry.py, written to data/telemetry/).
+#
+#  Delta scraping: the text of the data sections of every country page is fingerprinted before the browser
+# opens the page: the page is requested over HTTP (conditional GET through notebooks/http_cache.py, so an
+# unchanged page is not even downloaded again). Countries whose fingerprint did not change since the last run
+# get their stored record back (notebooks/fingerprint_store.py) without loading the page in the browser; only
+# changed countries are loaded and extracted. If the downloaded page has no data sections, the country is loaded
+# and extracted and its extracted values are compared with the last run. A country that fails keeps its stored
+# record. If no country changed, the existing csv file is kept.
 # 
 # This file is the script version of the scraping Jupyter Notebook scrape.betterlifeindex.ipynb .
 #
 ###########################################################################################################
 
-import time
+import os
+import sys
+import queue
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 
-from selenium import webdriver
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+# The modules shared by all scrapers are in the notebooks folder:
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "notebooks"))
+import scraper_runtime
+from scraper_runtime import DriverPool, get_page, retry
+from fingerprint_store import FingerprintStore, fingerprint
+from http_cache import cached_get
+from scraper_telemetry import Telemetry, phase
+
+from betterlife_indicators import (DID_YOU_KNOW_COLUMNS, TOPIC_COLUMNS, INDICATOR_SPECS,
+                                   extract_country_from_html, probe_texts_from_html, values_to_columns)
 
+BETTERLIFE_URL = "https://www.oecdbetterlifeindex.org/#/11111111111"
 
-def scrape_value_by_data_indicator_id(driver, id, key, gender= False, social=False, gender_key="Gender_Inequality", 
-                                      social_key="Social_Inequality"):
+# Maximal seconds to wait for the dropdown list or the data of a country page:
+PAGE_TIMEOUT = 15
+# Sections of a country page that have to be rendered before it is extracted:
+COUNTRY_SECTIONS = [".span3 table td", "#topics .value", "div[data-indicator-id] .value"]
+
+# Replace a browser of the pool after this many country pages (keeps its memory use low):
+MAX_PAGES_PER_BROWSER = 15
+
+RAW_PATH = "../data/raw/betterlife_index.raw.csv"
+
+# Timings and WebDriver commands per country page:
+TELEMETRY = Telemetry("betterlife_index")
+
+def scrape_value_by_data_indicator_id(driver, dict_country, id, key, gender= False, social=False, 
+                                      gender_key="Gender_Inequality", social_key="Social_Inequality"):
     ''' 
     Scrape data from the Indicator sections 
     
     Parameters:
         driver (WebDriver): web-driver instance to use
+        dict_country (dict): dictionary collecting all data of the current country, filled in place
         id (str): data-indicator-id
         key (str): Column name in the dataframe/csv file
         gender (bool): if True, scrape Gender Inequality measure
@@ -39,9 +90,6 @@ def scrape_value_by_data_indicator_id(driver, id, key, gender= False, social=Fal
         gender_key (str): Dict key for Gender Inequality value.
         social_key (str): Dict key for Social Inequality value
     ''' 
-    
-    # Define dict_country as a global variable so that we can collect all data for a particular country into the same dictionary:
-    global dict_country
 
     try:
         # Find the section with the id and collect all "values" from this element:
@@ -93,190 +141,351 @@ def scrape_value_by_data_indicator_id(driver, id, key, gender= False, social=Fal
             dict_country[social_key] = "N/A"
 
 
-def main():
+def create_driver(headless=False, lean=None):
     """
-    Scrape the numerical data from the Country section of the Better Life Index webpage 
-    ("https://www.oecdbetterlifeindex.org/#/11111111111").
+    Create an instance of the Chrome webdriver.
 
-    Parameters: None
+    Parameters:
+        headless (bool): if True, run Chrome without a visible window
+        lean (bool): if True, do not load images, fonts, media and trackers (lean page mode, see scraper_runtime.py);
+                     None: use the SCRAPER_LEAN_PAGES environment variable
 
-    Output:
-        csv file: "/data/raw/betterlife_index.raw.csv" with the scraped data
+    Returns:
+        WebDriver: the Chrome webdriver
     """
-    PATH = "C:/Program Files (x86)/chromedriver.exe"
-    # We will use Chrome browser. The location of the webdriver to Chrome is in PATH. We don't need it anymore.
+    return scraper_runtime.create_driver("chrome", headless=headless, lean=lean)
 
-    # Create a list of dictionaries to store the collected data:
-    list_better_life_index=[]
- 
-    # Create an instance of the Chrome webdriver:
-    driver=webdriver.Chrome()
 
-    # Go to Better Life Index webpage:
-    driver.get("https://www.oecdbetterlifeindex.org/#/11111111111")
-
-    # Wait to load the page:
-    time.sleep(5) 
+def get_country_links(driver):
+    """
+    Open the Better Life Index webpage and collect the links of all countries in the "Countries" dropdown list.
 
-    # Find "Countries" button and click it:
-    dropdown_countries = driver.find_element(by=By.CLASS_NAME, value="nav-dropdown")
-    dropdown_countries.click()
-    time.sleep(5)
+    Parameters:
+        driver (WebDriver): web-driver instance to use
 
+    Returns:
+        list: links of the country pages (empty list if the dropdown list was not found)
+    """
+    # Go to Better Life Index webpage:
+    get_page(driver, BETTERLIFE_URL)
 
-    # Wait until Dropdown list of countries is located:
     try:
-        list_countries = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "nav-dropdown__list"))
-        )
-    except:
+        # Wait until the "Countries" button can be clicked and click it:
+        with phase("wait"):
+            dropdown_countries = WebDriverWait(driver, PAGE_TIMEOUT).until(
+                EC.element_to_be_clickable((By.CLASS_NAME, "nav-dropdown")))
+        dropdown_countries.click()
+
+        # Wait until Dropdown list of countries is shown:
+        with phase("wait"):
+            list_countries = WebDriverWait(driver, PAGE_TIMEOUT).until(
+                EC.visibility_of_element_located((By.CLASS_NAME, "nav-dropdown__list"))
+            )
+    except TimeoutException:
         print("No dropdown list with countries found.")
-        driver.quit()
+        return []
 
 
     # Collect the links of each country in the dropdown list:
     list_c=list_countries.find_elements(by=By.TAG_NAME, value="a")
 
-    list_links=[elem.get_attribute("href") for elem in list_c]
-
-
-    # Loop through each link, each Country:
-    for link in list_links:
-        # Open each link
-        driver.get(link) 
-   
-        # Wait for the page to load:
-        time.sleep(5)  
-
-        # Create dictionary to store the collected data for this particular country
-        # It will be used as a global variable in the scraping function:
-        dict_country={}
- 
-        country_name=driver.find_element(by=By.TAG_NAME, value="h1")
-        print("Scraping: ", country_name.text)
-
-        # Scrape  section "Did you know?" 
-        block_did_you_know = driver.find_element(by=By.CLASS_NAME, value="span3")
-        table = block_did_you_know.find_element(by=By.TAG_NAME, value="table")
-        table_body = table.find_element(by= By.TAG_NAME, value="tbody")
-        table_rows = table_body.find_elements(by=By.TAG_NAME, value="tr")
-        table_values=[]
-        for row in table_rows:
-            value=row.find_element(by=By.TAG_NAME, value="td")
-            table_values.append(value.text)
-        
-   
-        # Add table data to the dictionary:
-        dict_country.update({"Country": country_name.text,
-                             "Population": table_values[0] if len(table_values) > 0 else "N/A",
-                             "Visitors": table_values[1] if len(table_values) > 1 else "N/A",
-                             "Renewable_Energy": table_values[2]} if len(table_values) > 2 else "N/A")
-
-        # Scrape Section "Topics":
-        element_topics = driver.find_element(by=By.ID, value="topics")
-        topics_values = element_topics.find_elements(by=By.CLASS_NAME, value="value")
-
-        list_values = [topic.text for topic in topics_values]
-
-        # Add values to the dictionary:
-        dict_country.update({"Housing":list_values[0] if len(list_values) > 0 else "N/A",
-                             "Income":list_values[1] if len(list_values) > 1 else "N/A",
-                             "Jobs":list_values[2] if len(list_values) > 2 else "N/A",
-                             "Community":list_values[3] if len(list_values) > 3 else "N/A",
-                             "Education":list_values[4] if len(list_values) > 4 else "N/A",
-                             "Environment":list_values[5] if len(list_values) > 5 else "N/A",
-                             "Civic_Engagement":list_values[6] if len(list_values) > 6 else "N/A",
-                             "Health":list_values[7] if len(list_values) > 7 else "N/A",
-                             "Life_Satisfaction":list_values[8] if len(list_values) > 8 else "N/A",
-                             "Safety":list_values[9] if len(list_values) > 9 else "N/A",
-                             "Work_Life_Balance":list_values[10] if len(list_values) > 10 else "N/A",
-                            })
-
-
-        # Scrape section "Housing --  Indicators":
-        scrape_value_by_data_indicator_id(driver, 'HO_NUMR',  "Rooms_per_person")
-        scrape_value_by_data_indicator_id(driver, 'HO_BASE',  "Basic_Facilities")
-        scrape_value_by_data_indicator_id(driver, 'HO_HISH',  "Housing_Expenditure")
-
-
-        # Scrape Section "Income -- Indicators":
-        scrape_value_by_data_indicator_id(driver, 'IW_HADI',  "Net_Disposable_Income", social=True, social_key="Social_Inequality_Income")
-        scrape_value_by_data_indicator_id(driver, 'IW_HNFW',  "Net_wealth") 
-
-
-        # Scrape Section "Jobs -- Indicators":
-        scrape_value_by_data_indicator_id(driver, 'JE_EMPL',  "Employment_Rate", gender=True, social=True,
-                                          gender_key="Gender_Inequality_Employment", social_key="Social_Inequality_Employment")
-        scrape_value_by_data_indicator_id(driver, 'JE_LTUR', "Long_Term_Unemployment", gender=True, social=True,
-                                         gender_key="Gender_Inequality_Unemployment", social_key="Social_Inequality_Unemployment") 
-        scrape_value_by_data_indicator_id(driver, 'JE_PEARN', "Personal_Earnings", gender=True, social=True,
-                                         gender_key="Gender_Inequality_Earnings", social_key="Social_Inequality_Earnings")
-        scrape_value_by_data_indicator_id(driver, 'JE_JT', "Job_Security")
-  
-    
-        # Scrape Section "Community -- Indicators":
-        scrape_value_by_data_indicator_id(driver, 'SC_SNTWS',  "Quality_of_Support_Network", gender=True, social=True,
-                                          gender_key="Gender_Inequality_Community", social_key="Social_Inequality_Community")
+    return [elem.get_attribute("href") for elem in list_c]
 
-    
-        # Scrape Section "Education -- Indicators":
-        scrape_value_by_data_indicator_id(driver, 'ES_EDUA',  "Educational_Attainment", gender=True, 
-                                          gender_key="Gender_Inequality_Education")
-        scrape_value_by_data_indicator_id(driver, 'ES_STCS',  "Student_Skills", gender=True, social=True,
-                                          gender_key="Gender_Inequality_Skills", social_key="Social_Inequality_Skills")
-        scrape_value_by_data_indicator_id(driver, 'ES_EDUEX',  "Years_in_Education", gender=True, 
-                                          gender_key="Gender_Inequality_Years_Education")
 
-    
-        ## Scrape Section "Environment -- Indicators":
-        scrape_value_by_data_indicator_id(driver, 'EQ_AIRP',  "Air_Pollution")
-        scrape_value_by_data_indicator_id(driver, 'EQ_WATER',  "Water_Quality")
+def scrape_country(driver, link, extraction="snapshot", store=None):
+    """
+    Scrape all data of one country page.
 
+    Parameters:
+        driver (WebDriver): web-driver instance to use
+        link (str): link of the country page
+        extraction (str): "snapshot" reads the HTML of the page once and extracts all values from it in Python,
+                          "webdriver" looks up every element in the browser one by one
+        store (FingerprintStore): if given, the country is only extracted if its page content changed since the
+                                  last run, otherwise its stored record is returned
+
+    Returns:
+        dict: the collected data of the country (keys are the column names of the csv file)
+    """
+    # Time of every step of this country page (see notebooks/scraper_telemetry.py):
+    with TELEMETRY.entity(link):
+        if store is None:
+            # Open the link (rate-limited, retried on browser errors) and wait until the country is shown:
+            load_country_page(driver, link)
+            return extract_country(driver, extraction)
+
+        # Cheap probe first, without the browser; the page is only loaded if the content changed:
+        fp = probe_country_page(link)
+        if fp is not None:
+            dict_country = store.lookup(link, fp)
+            if dict_country is not None:
+                print("Unchanged: ", dict_country["Country"])
+                return dict_country
+
+        # Changed, new or not probed: load and extract the page
+        load_country_page(driver, link)
+        dict_country = extract_country(driver, extraction)
+        if fp is None:
+            # Page not probed over HTTP: the extracted values themselves are compared with the last run
+            fp = fingerprint("rendered", dict_country)
+            if store.lookup(link, fp) is not None:
+                print("Unchanged: ", dict_country["Country"])
+                return dict_country
+        store.update(link, fp, dict_country)
+        return dict_country
+
+
+def country_page_shown(previous_title):
+    """
+    Wait condition: the country page is rendered (title, "Did you know?" table, topics and indicator values)
+    and its title is not the one of the page shown before (previous_title, None: any title).
+    The country pages are routes of one web app, so the sections of the previous country stay in the page until
+    the new ones are rendered; only the changed title tells them apart.
+    """
+    def condition(driver):
+        titles = driver.find_elements(By.TAG_NAME, "h1")
+        title = titles[0].text.strip() if titles else ""
+        if not title or title == previous_title:
+            return False
+        return all(driver.find_elements(By.CSS_SELECTOR, selector) for selector in COUNTRY_SECTIONS)
+    return condition
 
-        ## Scrape Section "Civic_Engagement -- Indicators":
-        scrape_value_by_data_indicator_id(driver, 'CG_VOTO',  "Voter_Turnout", gender=True, social=True,
-                                          gender_key="Gender_Inequality_Voter", social_key="Social_Inequality_Voter")
-        scrape_value_by_data_indicator_id(driver, 'CG_TRASG',  "Stakeholder_Engagement")
-    
 
-        # Scrape Section "Health -- Indicators":
-        scrape_value_by_data_indicator_id(driver, 'HS_LEB',  "Life_Expectancy", gender=True, 
-                                          gender_key="Gender_Inequality_Life_Expectancy")
-    
-        scrape_value_by_data_indicator_id(driver, 'HS_SFRH',  "Self_Reported_Health", gender=True, social=True, 
-                                          gender_key="Gender_Inequality_Health", social_key= "Social_Inequality_Health")
+def load_country_page(driver, link):
+    """
+    Open a country page and wait until its data is shown (instead of a fixed sleep).
+
+    Parameters:
+        driver (WebDriver): web-driver instance to use
+        link (str): link of the country page
 
+    Raises:
+        TimeoutException: if the data of the country is not shown within PAGE_TIMEOUT seconds
+    """
+    # Title of the country shown now; a retry of the same link does not wait for a new title
+    previous_title = None
+    if driver.current_url != link:
+        titles = driver.find_elements(By.TAG_NAME, "h1")
+        previous_title = titles[0].text.strip() if titles else None
 
-        # Scrape Section "Life_Satisfaction -- Indicators":
-        scrape_value_by_data_indicator_id(driver, 'SW_LIFS',  "Life_Satisfaction_2", gender=True, social= True,  
-                                          gender_key="Gender_Inequality_Satisfaction", social_key="Social_Inequality_Satisfaction")
-    
+    get_page(driver, link)
+    with phase("wait"):
+        WebDriverWait(driver, PAGE_TIMEOUT).until(country_page_shown(previous_title))
 
-        # Scrape Section "Safety -- Indicators":
-        scrape_value_by_data_indicator_id(driver, 'PS_SFRV',  "Safe_at_Night", gender=True, 
-                                          gender_key="Gender_Inequality_Safety")
-        scrape_value_by_data_indicator_id(driver, 'PS_REPH',  "Homicide_Rate", gender=True, 
-                                          gender_key="Gender_Inequality_Homicide")
 
+def probe_country_page(link):
+    """
+    Fingerprint of the data sections of a country page, requested over HTTP without the browser (conditional GET
+    through the shared HTTP cache: an unchanged page is answered with "304 Not Modified").
 
-        # Scrape Section "Work-Life Balance -- Indicators":
-        scrape_value_by_data_indicator_id(driver, 'WL_EWLH',  "Long_Hours", gender=True, 
-                                          gender_key="Gender_Inequality_Long_Hours")
-        scrape_value_by_data_indicator_id(driver, 'WL_TNOW',  "Free_Time", gender=True, 
-                                          gender_key="Gender_Inequality_Free_Time")
-    
+    Parameters:
+        link (str): link of the country page
+
+    Returns:
+        str: the fingerprint, None if the page could not be downloaded or has no data sections
+    """
+    try:
+        html = cached_get(link).decode("utf-8", errors="replace")
+    except Exception as e:
+        print(f"Could not probe {link}: {e}")
+        return None
+    texts = probe_texts_from_html(html)
+    return fingerprint("http", texts) if texts else None
+
+
+def extract_country(driver, extraction="snapshot"):
+    """
+    Extract all data of the country page that is open in the browser.
+
+    Parameters:
+        driver (WebDriver): web-driver instance to use
+        extraction (str): "snapshot" or "webdriver", see scrape_country
+
+    Returns:
+        dict: the collected data of the country (keys are the column names of the csv file)
+    """
+    if extraction == "snapshot":
+        # One round trip to the browser, everything else is resolved from the snapshot:
+        html = driver.page_source
+        with phase("parse"):
+            dict_country = extract_country_from_html(html)
+        print("Scraping: ", dict_country["Country"])
+        return dict_country
+
+    # Create dictionary to store the collected data for this particular country:
+    dict_country={}
+
+    country_name=driver.find_element(by=By.TAG_NAME, value="h1")
+    print("Scraping: ", country_name.text)
+
+    # Scrape  section "Did you know?" 
+    block_did_you_know = driver.find_element(by=By.CLASS_NAME, value="span3")
+    table = block_did_you_know.find_element(by=By.TAG_NAME, value="table")
+    table_body = table.find_element(by= By.TAG_NAME, value="tbody")
+    table_rows = table_body.find_elements(by=By.TAG_NAME, value="tr")
+    table_values=[]
+    for row in table_rows:
+        value=row.find_element(by=By.TAG_NAME, value="td")
+        table_values.append(value.text)
     
-        # Add the dictionary to the list:
-        list_better_life_index.append(dict_country)
 
-    driver.quit()
+    # Add table data to the dictionary:
+    dict_country["Country"] = country_name.text
+    dict_country.update(values_to_columns(table_values, DID_YOU_KNOW_COLUMNS))
+
+    # Scrape Section "Topics":
+    element_topics = driver.find_element(by=By.ID, value="topics")
+    topics_values = element_topics.find_elements(by=By.CLASS_NAME, value="value")
+
+    list_values = [topic.text for topic in topics_values]
+
+    # Add values to the dictionary:
+    dict_country.update(values_to_columns(list_values, TOPIC_COLUMNS))
+
+    # Scrape the Indicator sections of all topics (Housing, Income, Jobs, ... Work-Life Balance):
+    for spec in INDICATOR_SPECS:
+        scrape_value_by_data_indicator_id(driver, dict_country, spec["id"], spec["key"],
+                                          gender=spec["gender_key"] is not None,
+                                          social=spec["social_key"] is not None,
+                                          gender_key=spec["gender_key"], social_key=spec["social_key"])
+
+    return dict_country
+
+
+def scrape_country_from_pool(pool, link, store=None):
+    """
+    Scrape one country page with a browser borrowed from the pool.
+
+    Parameters:
+        pool (DriverPool): pool of headless browsers
+        link (str): link of the country page
+        store (FingerprintStore): fingerprints of the last run (None: always extract)
+
+    Returns:
+        dict: the collected data of the country
+    """
+    with pool.driver() as driver:
+        return scrape_country(driver, link, store=store)
+
+
+def scrape_worker(link_queue, results, pool, store=None):
+    """
+    Worker of the parallel scraping mode: scrapes country pages from the queue until it is empty.
+    A failed country is tried again (with a fresh browser if the old one crashed).
+
+    Parameters:
+        link_queue (queue.Queue): queue of (position, link) tuples still to be scraped
+        results (dict): position of the country in the dropdown list -> dictionary with the country data
+        pool (DriverPool): pool of headless browsers
+        store (FingerprintStore): fingerprints of the last run (None: always extract)
+    """
+    while True:
+        try:
+            position, link = link_queue.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            results[position] = retry(scrape_country_from_pool, pool, link, store, attempts=3)
+        except Exception as e:
+            # A transient failure does not remove the country: its record of the last run is kept
+            dict_country = store.keep(link) if store is not None else None
+            print(f"Could not scrape {link}: {e}" + (", keeping the stored record" if dict_country else ""))
+            if dict_country is not None:
+                results[position] = dict_country
+
+
+def scrape_countries_parallel(list_links, n_workers, lean=None, store=None):
+    """
+    Scrape the country pages with a pool of headless Chrome instances.
+
+    Parameters:
+        list_links (list): links of the country pages
+        n_workers (int): number of browsers working at the same time
+        lean (bool): start the browsers in lean page mode (None: use the SCRAPER_LEAN_PAGES environment variable)
+        store (FingerprintStore): fingerprints of the last run (None: always extract)
+
+    Returns:
+        list: dictionaries with the country data, in the order of list_links 
+              (countries that could not be scraped are left out, unless the store has their record of the last run)
+    """
+    # Fill the queue with the links and their position so that the results can be put back in order:
+    link_queue = queue.Queue()
+    for position, link in enumerate(list_links):
+        link_queue.put((position, link))
+
+    # Each worker writes into its own keys of the results dictionary:
+    results = {}
+    n_workers = max(1, min(n_workers, len(list_links)))
+    with DriverPool(size=n_workers, browser="chrome", headless=True, max_pages=MAX_PAGES_PER_BROWSER,
+                    lean=lean) as pool:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            workers = [executor.submit(scrape_worker, link_queue, results, pool, store) for _ in range(n_workers)]
+            for worker in workers:
+                worker.result()
+
+    # Merge the results in country order:
+    return [results[position] for position in sorted(results)]
+
+
+def main(n_workers=1, headless=False, lean=None, full_refresh=None):
+    """
+    Scrape the numerical data from the Country section of the Better Life Index webpage 
+    ("https://www.oecdbetterlifeindex.org/#/11111111111").
+
+    Parameters:
+        n_workers (int): number of browsers scraping the country pages at the same time. 
+                         With n_workers > 1 the country pages are scraped by a pool of headless browsers.
+        headless (bool): if True, run the browser collecting the country links without a visible window
+        lean (bool): if True, the browsers do not load images, fonts, media and trackers (lean page mode);
+                     None: use the SCRAPER_LEAN_PAGES environment variable
+        full_refresh (bool): if True, extract every country again, even if its fingerprint did not change;
+                             None: use the SCRAPER_FULL_REFRESH environment variable
+
+    Output:
+        csv file: "/data/raw/betterlife_index.raw.csv" with the scraped data
+    """
+    # Create an instance of the Chrome webdriver:
+    driver=create_driver(headless=headless or n_workers > 1, lean=lean)
+
+    TELEMETRY.start_run()
+
+    # Fingerprints and records of the last run (delta scraping):
+    store = FingerprintStore("betterlife_index", full_refresh=full_refresh)
+
+    # Collect the links of each country in the dropdown list:
+    with TELEMETRY.entity("country links"):
+        list_links = get_country_links(driver)
+    if not list_links:
+        driver.quit()
+        return
+
+    if n_workers > 1:
+        # The browser is not needed anymore, the workers start their own ones:
+        driver.quit()
+        list_better_life_index = scrape_countries_parallel(list_links, n_workers, lean=lean, store=store)
+    else:
+        # Create a list of dictionaries to store the collected data:
+        list_better_life_index=[]
+
+        # Loop through each link, each Country and add the dictionary to the list:
+        for link in list_links:
+            list_better_life_index.append(scrape_country(driver, link, store=store))
+
+        driver.quit()
+
+    store.save(complete=True)
+    TELEMETRY.report()
+    print(f"Countries: {store.summary()}")
+    if not store.has_changes() and os.path.exists(RAW_PATH):
+        print("No country changed, keeping", RAW_PATH)
+        return
 
-    # Convert list of dicts into DataFrame:
+    # Convert list of dicts (stored and newly extracted countries) into DataFrame:
     df_better_life = pd.DataFrame(list_better_life_index)
 
     # Write data frame into csv file:
-    df_better_life.to_csv("../data/raw/betterlife_index.raw.csv", index=False)
+    df_better_life.to_csv(RAW_PATH, index=False)
 
 
 if __name__=='__main__':
-    main()
\ No newline at end of file
+    main(n_workers=4)
@@ -0,0 +1,287 @@
+#######################################################
+# Better Life Index Scraping Script -- HTTP backend
+# #####################################################
+#  The country pages of the Better Life Index webpage ("https://www.oecdbetterlifeindex.org/#/11111111111")
+# are the pages the Selenium scraper (scrape.betterlifeindex.py) opens from the "Countries" dropdown list.
+#
+#  This script reads the same pages over HTTP, without starting a browser, and extracts the values with the
+# snapshot engine of the Selenium scraper (betterlife_indicators.extract_country_from_html). So the columns
+# (including the Gender and Social Inequality columns) and the text of the values ("~2.3 rooms", "37433USD",
+# "N/A") are the same as in the csv of the Selenium scraper.
+#
+#  The webpage renders the indicator sections with JavaScript: the HTML it sends has no data in it, and a page
+# without indicator sections stops the script with an error instead of writing "N/A" values. So the pages are
+# captured rendered, once, with a browser (capture_fixtures(), saved under their URL paths in
+# data/fixtures/betterlife/), and served from a local stand-in server; the extraction then runs without a browser:
+#      capture_fixtures()                                  # once, with network access and Chrome
+#      server, base_url = serve_fixtures()
+#      main(base_url=base_url)
+#      server.shutdown()
+#  tests/test_betterlife_http.py runs the backend against the committed fixture in the same way.
+#
+#  Check: compare_with_selenium() compares the data frame with the csv of the Selenium scraper cell by cell
+# (main() runs it after every run).
+#
+#  Output:
+#      csv file with the raw data frame: "/data/raw/betterlife_index_http.raw.csv"
+#      (the Selenium scraper writes "/data/raw/betterlife_index.raw.csv")
+###########################################################################################################
+
+import importlib.util
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urljoin, urlparse
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from betterlife_indicators import HTML_PARSER, extract_country_from_html
+
+
+BASE_URL = "https://www.oecdbetterlifeindex.org"
+
+# Links of the country pages in the "Countries" dropdown list of the start page:
+COUNTRY_LINKS = ".nav-dropdown__list a[href]"
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+FIXTURE_DIR = os.path.normpath(os.path.join(ROOT, "data", "fixtures", "betterlife"))
+
+RAW_PATH = "../data/raw/betterlife_index_http.raw.csv"
+# csv file of the Selenium scraper the result is compared with:
+SELENIUM_RAW_PATH = "../data/raw/betterlife.raw.csv"
+
+
+def create_session(pool_size=10, retries=3):
+    """
+    Create a requests session that keeps its connections open and reuses them for all downloads.
+
+    Parameters:
+        pool_size (int): number of connections kept open to the host
+        retries (int): number of retries of a failed request (with increasing waiting time)
+
+    Returns:
+        requests.Session: the session
+    """
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": "Mozilla/5.0"})
+    return session
+
+
+def fetch_html(session, url, timeout=30):
+    """
+    Download the HTML of a page.
+
+    Parameters:
+        session (requests.Session): session to use
+        url (str): URL of the page
+        timeout (float): seconds to wait for the server
+
+    Returns:
+        str: the HTML of the page
+    """
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    response.encoding = response.encoding or "utf-8"
+    return response.text
+
+
+def get_country_links(html, base_url=BASE_URL):
+    """
+    Collect the links of the country pages from the "Countries" dropdown list of the start page.
+    The links are resolved against base_url (the webpage or a local stand-in server).
+
+    Parameters:
+        html (str): HTML of the start page
+        base_url (str): address of the webpage
+
+    Returns:
+        list: links of the country pages, in the order of the dropdown list
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    paths = [urlparse(link["href"]).path for link in soup.select(COUNTRY_LINKS)]
+    return [urljoin(base_url + "/", path) for path in dict.fromkeys(paths) if path]
+
+
+def parse_country_page(html, url):
+    """
+    Extract the data of a downloaded country page, like the snapshot extraction of the Selenium scraper.
+
+    Parameters:
+        html (str): HTML of the country page
+        url (str): URL of the page (for the error message)
+
+    Returns:
+        dict: the data of the country (keys are the column names of the csv file)
+    """
+    if "data-indicator-id" not in html:
+        raise ValueError(f"No indicator sections in the page {url}: the webpage renders them with JavaScript, "
+                         f"serve pages captured with capture_fixtures() or use scrape.betterlifeindex.py")
+    return extract_country_from_html(html)
+
+
+def scrape_betterlife_http(base_url=BASE_URL, n_workers=8, session=None):
+    """
+    Download the pages of all countries and extract their data.
+
+    Parameters:
+        base_url (str): address of the webpage (or of a local stand-in server)
+        n_workers (int): number of pages downloaded at the same time
+        session (requests.Session): session to use (a new one is created if None)
+
+    Returns:
+        pandas DataFrame: one row per country, in the order of the dropdown list
+    """
+    session = session or create_session(pool_size=n_workers)
+    base_url = base_url.rstrip("/")
+
+    # Links of the countries:
+    links = get_country_links(fetch_html(session, base_url + "/"), base_url)
+    if not links:
+        raise ValueError(f"No country links ({COUNTRY_LINKS}) found on {base_url}/")
+
+    # Download the country pages in parallel over the shared connection pool (map keeps the order):
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        pages = list(executor.map(partial(fetch_html, session), links))
+
+    return pd.DataFrame([parse_country_page(html, link) for html, link in zip(pages, links)])
+
+
+def fixture_path(directory, url):
+    """Path of the saved page of a URL in the fixture directory (a page "/x/" is saved as "x/index.html")."""
+    path = urlparse(url).path.strip("/")
+    return os.path.join(directory, path, "index.html") if path else os.path.join(directory, "index.html")
+
+
+def load_selenium_scraper():
+    """The Selenium scraper module (its file name scrape.betterlifeindex.py cannot be imported by name)."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrape.betterlifeindex.py")
+    spec = importlib.util.spec_from_file_location("scrape_betterlifeindex", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def capture_fixtures(directory=FIXTURE_DIR, headless=True):
+    """
+    Open the start page and all country pages with the browser of the Selenium scraper and save their rendered
+    HTML under their URL paths, so that serve_fixtures() can serve them like the webpage.
+
+    Parameters:
+        directory (str): fixture directory
+        headless (bool): run Chrome without a visible window
+
+    Returns:
+        list: paths of the saved pages
+    """
+    selenium_scraper = load_selenium_scraper()
+    driver = selenium_scraper.create_driver(headless=headless)
+    pages = []
+    try:
+        # Start page with the opened "Countries" dropdown list:
+        links = selenium_scraper.get_country_links(driver)
+        pages.append((BASE_URL + "/", driver.page_source))
+        for link in links:
+            selenium_scraper.load_country_page(driver, link)
+            pages.append((link, driver.page_source))
+    finally:
+        driver.quit()
+
+    paths = []
+    for url, html in pages:
+        path = fixture_path(directory, url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        paths.append(path)
+    print(f"Saved {len(paths)} pages to {directory}")
+    return paths
+
+
+def serve_fixtures(directory=FIXTURE_DIR, port=0):
+    """
+    Start a local stand-in server for the webpage that serves the saved pages of capture_fixtures().
+
+    Parameters:
+        directory (str): fixture directory
+        port (int): port of the server (0: any free port)
+
+    Returns:
+        tuple: (server, base_url); stop the server with server.shutdown()
+    """
+    if not os.path.exists(fixture_path(directory, "/")):
+        raise FileNotFoundError(f"No saved start page in {directory}, run capture_fixtures() first")
+    handler = partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def compare_with_selenium(df_better_life, selenium_path=SELENIUM_RAW_PATH):
+    """
+    Compare the downloaded data with the csv of the Selenium scraper, cell by cell (as text).
+
+    Parameters:
+        df_better_life (pandas DataFrame): data of scrape_betterlife_http
+        selenium_path (str): csv file of the Selenium scraper
+
+    Returns:
+        pandas DataFrame: the differences (Country, Column, HTTP, Selenium); a missing country or column is
+                          reported with "missing" as value. Empty if both are the same.
+    """
+    http = df_better_life.astype(str).set_index("Country")
+    selenium = pd.read_csv(selenium_path, dtype=str, keep_default_na=False).set_index("Country")
+
+    differences = []
+    for country in http.index.union(selenium.index, sort=False):
+        for column in http.columns.union(selenium.columns, sort=False):
+            http_value = http.at[country, column] if country in http.index and column in http.columns else "missing"
+            selenium_value = (selenium.at[country, column] if country in selenium.index and column in selenium.columns
+                              else "missing")
+            if http_value != selenium_value:
+                differences.append({"Country": country, "Column": column, "HTTP": http_value,
+                                    "Selenium": selenium_value})
+    return pd.DataFrame(differences, columns=["Country", "Column", "HTTP", "Selenium"])
+
+
+def main(base_url=BASE_URL, n_workers=8, output_path=RAW_PATH, selenium_path=SELENIUM_RAW_PATH):
+    """
+    Read the (captured) Better Life Index country pages without a browser, write their data into a csv file and
+    compare it with the csv of the Selenium scraper.
+
+    Parameters:
+        base_url (str): address of the webpage (or of a local stand-in server)
+        n_workers (int): number of pages downloaded at the same time
+        output_path (str): path of the csv file
+        selenium_path (str): csv file of the Selenium scraper (None: no comparison)
+
+    Output:
+        csv file: "/data/raw/betterlife_index_http.raw.csv" with the downloaded data
+    """
+    df_better_life = scrape_betterlife_http(base_url=base_url, n_workers=n_workers)
+    print(f"Downloaded data of {len(df_better_life)} countries.")
+
+    # Write data frame into csv file:
+    df_better_life.to_csv(output_path, index=False)
+
+    # Same values as the Selenium scraper?
+    if selenium_path and os.path.exists(selenium_path):
+        differences = compare_with_selenium(df_better_life, selenium_path)
+        if differences.empty:
+            print("Same values as", selenium_path)
+        else:
+            print(f"{len(differences)} values differ from {selenium_path}:")
+            print(differences.to_string(index=False))
+
+
+if __name__=='__main__':
+    main()
@@ -19,7 +19,7 @@ Functions:
 - load_all_data: Load and cache all necessary files
 - prepare_betterlife: Clean the OECD Better Life Index dataset
 - prepare_happiness: Clean the World Happiness Index dataset
-- merge_betterlife: Merge the two datasets on country names
+- merge_betterlife: Merge the two datasets on the ISO3 country codes
 - prepare_all_data: Clean Better Life and Happiness datasets and merge them 
 - create_var_dict: Create a dictionary to map display names to column names
 
@@ -27,9 +27,17 @@ Author: Dora Kohalmi
 Created: 2025-04-08
 """
 
+import os
+import sys
+
 import pandas as pd
 import streamlit as st
 
+# The country registry and the workbook loader shared with the merging scripts are in the notebooks folder:
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "notebooks"))
+from country_registry import country_keys, country_names, iso3_codes
+from workbook_sidecar import read_workbook
+
 
 # Function to load and cache data from a csv file:
 @st.cache_data
@@ -51,6 +59,7 @@ def load_csv_data(path):
 def load_xlsx_data(path):
     """
     Load and cache an Excel (.xlsx) file into a pandas DataFrame.
+    The workbook is only parsed once, later app starts read its sidecar file (notebooks/workbook_sidecar.py).
 
     Parameters:
        path (str): Path to the Excel file.
@@ -58,7 +67,7 @@ def load_xlsx_data(path):
     Returns:
        pd.DataFrame: DataFrame containing the loaded data.
     """
-    return pd.read_excel(path)
+    return read_workbook(path)
 
 
 # Function to load and cache all data for the Application:
@@ -164,7 +173,9 @@ def prepare_happiness(df):
 
 def merge_betterlife(df1, df2):
     """ 
-    Merges Better Life dataframe with Happiness Index dataframe on country name.
+    Merges Better Life dataframe with Happiness Index dataframe on the country keys (ISO3 codes)
+    of the country registry (notebooks/country_registry.py).
+    The "Country" column gets the canonical country names, the "ISO3" column the ISO3 codes.
     
     Parameters:
         df1 (pandas DataFrame): Better Life Index dataframe with "Country" column
@@ -175,31 +186,23 @@ def merge_betterlife(df1, df2):
     """
     try:
 
-        # Define Country name replacement dictionary:
-        country_replacements = {
-                                "Slovak Republic": "Slovakia",
-                                "Republic of Korea": "Korea"
-                                }
-
         # Make copies of the original dataframes:
         df1_new = df1.copy()
         df2_new = df2.copy()
 
-        # Replace "Slovak Republic" with "Slovakia":
-        #df1_new["Country"].replace(country_replacements, inplace=True)
-        df1_new["Country"] = df1_new["Country"].replace(country_replacements)
-
-        # Replace "Republic of Korea" with "Korea":
-        #df2_new["Country name"].replace(country_replacements, inplace=True)
-        df2_new["Country name"] = df2_new["Country name"].replace(country_replacements)
+        # Merge keys of the country names ("Slovak Republic" and "Slovakia" are both "SVK"):
+        df1_new["Key"] = country_keys(df1_new["Country"])
+        df2_new["Key"] = country_keys(df2_new["Country name"])
 
+        # Canonical country names and ISO3 codes (used by the world map):
+        df1_new["Country"] = country_names(df1_new["Country"])
+        df1_new.insert(1, "ISO3", iso3_codes(df1_new["Country"]))
 
         # Left-merge Better Life Index dataframe and Happiness Index dataframe:
-        df_merged = df1_new.merge(df2_new, left_on='Country', right_on='Country name',
-               suffixes=('_left', '_right'))
+        df_merged = df1_new.merge(df2_new, on="Key", suffixes=('_left', '_right'))
     
-        # Remove "Country name" column:
-        df_merged.drop( columns=["Country name"], inplace=True)
+        # Remove "Country name" and merge key columns:
+        df_merged.drop( columns=["Country name", "Key"], inplace=True)
 
         return df_merged
     
@@ -218,8 +218,8 @@ def render_world_map(df, var_dict):
    
             fig = px.choropleth(
                     df,
-                    locations="Country",
-                    locationmode="country names",
+                    locations="ISO3",
+                    locationmode="ISO-3",
                     color=selected_column,
                     hover_name="Country",
                     hover_data={"Population": True},
@@ -0,0 +1,22 @@
+"""
+Shared setup of the tests: the modules of notebooks/ and src/ are scripts next to each other (they import each
+other by file name), so both folders are put on the import path, like running a script from its folder.
+"""
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+for folder in ("notebooks", "src"):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def load_script(relative_path, name):
+    """Imports a script whose file name is not a module name (e.g. src/scrape.betterlifeindex_http.py)."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
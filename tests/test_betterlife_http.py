@@ -0,0 +1,44 @@
+"""HTTP backend of the Better Life Index scraper against a local stand-in server."""
+import os
+
+import pytest
+
+from conftest import FIXTURES, ROOT, load_script
+
+betterlife_http = load_script(os.path.join("src", "scrape.betterlifeindex_http.py"), "scrape_betterlifeindex_http")
+
+# Start page and Australia page in the structure of the rendered pages (hand-built, not captured from the
+# webpage), with the values of Australia in data/raw/betterlife.raw.csv
+FIXTURE_DIR = os.path.join(FIXTURES, "betterlife")
+SELENIUM_CSV = os.path.join(ROOT, "data", "raw", "betterlife.raw.csv")
+
+
+@pytest.fixture
+def base_url():
+    server, url = betterlife_http.serve_fixtures(FIXTURE_DIR)
+    yield url
+    server.shutdown()
+
+
+def test_country_links_are_resolved_against_the_stand_in_server():
+    with open(os.path.join(FIXTURE_DIR, "index.html"), encoding="utf-8") as f:
+        links = betterlife_http.get_country_links(f.read(), "http://127.0.0.1:8000")
+    assert links == ["http://127.0.0.1:8000/countries/australia/"]
+
+
+def test_same_values_as_the_selenium_csv(base_url):
+    df = betterlife_http.scrape_betterlife_http(base_url=base_url, n_workers=2)
+    assert df["Country"].tolist() == ["Australia"]
+
+    differences = betterlife_http.compare_with_selenium(df, SELENIUM_CSV)
+    assert differences[differences["Country"] == "Australia"].empty
+
+
+def test_page_without_indicator_sections_is_an_error():
+    with pytest.raises(ValueError, match="No indicator sections"):
+        betterlife_http.parse_country_page("<html><h1>Australia</h1></html>", "http://127.0.0.1/countries/australia/")
+
+
+def test_output_is_not_the_csv_of_the_selenium_scraper():
+    selenium_scraper = betterlife_http.load_selenium_scraper()
+    assert betterlife_http.RAW_PATH != selenium_scraper.RAW_PATH
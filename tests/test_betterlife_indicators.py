@@ -0,0 +1,35 @@
+"""Snapshot extraction of a Better Life Index country page."""
+import os
+
+import pandas as pd
+
+from betterlife_indicators import INDICATOR_SPECS, extract_country_from_html
+from conftest import FIXTURES, ROOT
+
+AUSTRALIA = os.path.join(FIXTURES, "betterlife", "countries", "australia", "index.html")
+
+
+def test_values_of_the_country_page_are_those_of_the_raw_csv():
+    with open(AUSTRALIA, encoding="utf-8") as f:
+        dict_country = extract_country_from_html(f.read())
+    expected = pd.read_csv(os.path.join(ROOT, "data", "raw", "betterlife.raw.csv"), dtype=str,
+                           keep_default_na=False).set_index("Country").loc["Australia"]
+    assert dict_country["Country"] == "Australia"
+    assert {column: dict_country[column] for column in expected.index} == expected.to_dict()
+
+
+def test_trend_section_shifts_the_inequality_values():
+    html = ('<h1> Chile </h1><div data-indicator-id="JE_EMPL"><div class="value">62%</div>'
+            '<div class="trend section"><span class="value">+1%</span></div>'
+            '<div class="gender inequality section"><span class="value">1.30</span></div>'
+            '<div class="social inequality section"><span class="value">1.50</span></div></div>')
+    dict_country = extract_country_from_html(html)
+    assert dict_country["Country"] == "Chile"
+    assert (dict_country["Employment_Rate"], dict_country["Gender_Inequality_Employment"],
+            dict_country["Social_Inequality_Employment"]) == ("62%", "1.30", "1.50")
+
+
+def test_missing_sections_are_not_available():
+    dict_country = extract_country_from_html("<h1>Chile</h1>")
+    assert dict_country["Population"] == "N/A" and dict_country["Housing"] == "N/A"
+    assert all(dict_country[spec["key"]] == "N/A" for spec in INDICATOR_SPECS)
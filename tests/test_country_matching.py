@@ -0,0 +1,36 @@
+"""Fuzzy matching of the country names left over by the registry."""
+import pytest
+
+from country_matching import CountryMatcher, matching_key
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return CountryMatcher()
+
+
+@pytest.mark.parametrize("name, iso3", [
+    ("Congo, Dem. Rep.", "COD"),
+    ("St. Lucia", "LCA"),
+    ("Trinidad & Tobago", "TTO"),
+    ("Micronesia, Fed. Sts.", "FSM"),
+    ("Cayman Is.", "CYM"),
+    ("Is. of Man", "IMN"),
+    ("Virgin Islands (U.S.)", "VIR"),
+])
+def test_abbreviated_names_are_matched(matcher, name, iso3):
+    match = matcher.match(name)
+    assert match["ISO3"] == iso3
+    assert match["Score"] >= 0.8 and match["Margin"] >= 0.1
+
+
+def test_abbreviations_only_in_their_places():
+    assert matching_key("Is. of Man") == "isle of man"
+    assert matching_key("Solomon Is.") == "solomon islands"
+    assert matching_key("Virgin Islands (U.S.)") == "virgin islands united states"
+    assert matching_key("Congo, Rep. of the") == "congo republic of"
+
+
+def test_regions_and_ambiguous_names_stay_unmatched(matcher):
+    result = matcher.match_all(["Southern Africa", "Republic of Congo"])
+    assert not result["Accepted"].any()
@@ -0,0 +1,29 @@
+"""Country registry: the two Koreas must never be joined as one country."""
+import pandas as pd
+import pytest
+
+from clean_ilostat_all import clean_country_names
+from country_registry import check_distinct_countries, country_names, iso3_codes
+
+
+@pytest.mark.parametrize("name", ["North Korea", "Korea, Democratic People's Republic of",
+                                  "Korea (the Democratic People's Republic of)",
+                                  "Democratic People's Republic of Korea"])
+def test_north_korea_spellings_resolve_to_prk(name):
+    assert iso3_codes([name]).tolist() == ["PRK"]
+
+
+def test_ilostat_names_keep_north_korea_apart_from_south_korea():
+    raw = pd.DataFrame({"Country (year)": ["Korea (the Democratic People's Republic of) (2019)",
+                                           "Korea, Republic of (2023)"], "Rate": ["79.8%", "62.4%"]})
+    cleaned = clean_country_names(raw)
+    assert cleaned["Country (year)"].tolist() == ["Democratic People's Republic of Korea", "Korea, Republic of"]
+    assert iso3_codes(cleaned["Country (year)"]).tolist() == ["PRK", "KOR"]
+    assert country_names(cleaned["Country (year)"]).tolist() == ["Democratic People's Republic of Korea",
+                                                                 "Republic of Korea"]
+    check_distinct_countries(cleaned["Country (year)"], "employment")
+
+
+def test_two_spellings_of_one_country_in_a_source_are_an_error():
+    with pytest.raises(ValueError, match="KOR: Korea / Republic of Korea"):
+        check_distinct_countries(["Korea", "Republic of Korea", "Chad"], "employment")
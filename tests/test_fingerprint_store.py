@@ -0,0 +1,56 @@
+"""Delta scraping: fingerprints and records of the last run."""
+from fingerprint_store import FingerprintStore, fingerprint
+
+
+def stored(tmp_path, **entities):
+    store = FingerprintStore("scraper", directory=str(tmp_path), full_refresh=False)
+    for entity, record in entities.items():
+        store.update(entity, fingerprint(record), record)
+    store.save(complete=True)
+    return FingerprintStore("scraper", directory=str(tmp_path), full_refresh=False)
+
+
+def test_fingerprint_ignores_whitespace_runs():
+    assert fingerprint("72.1 %", ["a"]) == fingerprint("72.1   %", ["a"])
+    assert fingerprint("72.1 %") != fingerprint("72.2 %")
+
+
+def test_unchanged_entity_gets_its_stored_record(tmp_path):
+    store = stored(tmp_path, Joy=[["Chad", "50%"]])
+    assert store.lookup("Joy", fingerprint([["Chad", "50%"]])) == [["Chad", "50%"]]
+    assert store.lookup("Joy", fingerprint([["Chad", "51%"]])) is None
+    store.update("Joy", fingerprint([["Chad", "51%"]]), [["Chad", "51%"]])
+    assert store.has_changes()
+    assert store.summary() == "1 changed, 1 unchanged"
+
+
+def test_full_refresh_extracts_everything_again(tmp_path):
+    stored(tmp_path, Joy=[["Chad", "50%"]])
+    store = FingerprintStore("scraper", directory=str(tmp_path), full_refresh=True)
+    assert store.lookup("Joy", fingerprint([["Chad", "50%"]])) is None
+
+
+def test_failed_entity_keeps_its_record_without_a_change(tmp_path):
+    store = stored(tmp_path, Joy=[["Chad", "50%"]], Anger=[["Chad", "20%"]])
+    assert store.lookup("Joy", fingerprint([["Chad", "50%"]])) is not None
+    assert store.keep("Anger") == [["Chad", "20%"]]
+    assert store.keep("Sadness") is None
+    store.save(complete=True)
+    assert not store.has_changes()
+    assert set(FingerprintStore("scraper", directory=str(tmp_path)).entries) == {"Joy", "Anger"}
+
+
+def test_complete_run_removes_the_entities_not_seen(tmp_path):
+    store = stored(tmp_path, Joy=[["Chad", "50%"]], Anger=[["Chad", "20%"]])
+    store.lookup("Joy", fingerprint([["Chad", "50%"]]))
+    assert store.has_changes()  # Anger is not on the website anymore
+    store.save(complete=True)
+    assert store.has_changes()
+    assert set(FingerprintStore("scraper", directory=str(tmp_path)).entries) == {"Joy"}
+
+
+def test_interrupted_run_keeps_the_entities_not_seen(tmp_path):
+    store = stored(tmp_path, Joy=[["Chad", "50%"]], Anger=[["Chad", "20%"]])
+    store.touch("Joy")
+    store.save(complete=False)
+    assert set(FingerprintStore("scraper", directory=str(tmp_path)).entries) == {"Joy", "Anger"}
@@ -0,0 +1,36 @@
+"""Streaming ingestion of ILOSTAT bulk files, on the sample bulk file."""
+import pandas as pd
+
+import ingest_ilostat_bulk as bulk
+
+
+def test_sample_has_the_breakdowns_of_the_real_series(tmp_path):
+    path = bulk.make_sample_bulk_file(str(tmp_path / "sample.csv.gz"), n_countries=5, years=range(2020, 2023))
+    sample = pd.read_csv(path)
+
+    productivity = sample[sample["indicator"] == "GDP_211P_NOC_NB"]
+    assert productivity["sex"].isna().all() and productivity["classif1"].isna().all()
+    employment = sample[sample["indicator"] == "EMP_DWAP_SEX_AGE_RT"]
+    assert set(employment["sex"]) == {"SEX_T", "SEX_M", "SEX_F"}
+
+
+def test_latest_values_pass_the_validation_of_their_topic(tmp_path):
+    path = bulk.make_sample_bulk_file(str(tmp_path / "sample.csv.gz"), n_countries=8, years=range(2015, 2025))
+    partitions = bulk.ingest_bulk_file(path, str(tmp_path / "bulk"), indicators=list(bulk.INDICATORS),
+                                       chunksize=500)
+    assert set(partitions) == set(bulk.INDICATORS)  # the other indicator is filtered out
+
+    for indicator, (part_path, _) in partitions.items():
+        table = bulk.latest_values(part_path, bulk.INDICATORS[indicator], chunksize=100)
+        assert len(table) == 8
+        # countries C00 and C07 have no data after 2020
+        assert table["Country (year)"].str.endswith("(2024)").sum() == 6
+
+        topic = bulk.TOPICS[bulk.INDICATOR_TOPICS[indicator]]
+        report = bulk.validate(topic["clean"](table), topic["rules"], quiet=True)
+        assert report["passed"].all()
+
+
+def test_labour_productivity_is_output_per_hour_worked():
+    assert bulk.INDICATOR_TOPICS["GDP_211P_NOC_NB"] == "labour_productivity"
+    assert "GDP_205U_NOC_NB" not in bulk.INDICATORS  # output per worker
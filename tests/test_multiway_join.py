@@ -0,0 +1,39 @@
+"""Outer join of several sources on one key with the provenance of every cell."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from multiway_join import duplicate_keys, join_sources, provenance_summary
+
+
+def sources():
+    return {
+        "unemployment": pd.DataFrame({"Key": ["AUS", "CHE"], "Country": ["Australia", "Switzerland"],
+                                      "Rate": [3.7, np.nan]}),
+        "wages": pd.DataFrame({"Key": ["CHE", "FRA"], "Country": ["Switzerland", "France"], "Wage": [4000, 1800],
+                               "Rate": [4.1, 7.3]}),
+    }
+
+
+def test_outer_join_with_columns_in_source_order():
+    joined, _ = join_sources(sources())
+    assert list(joined.index) == ["AUS", "CHE", "FRA"]
+    assert list(joined.columns) == ["Country", "Rate", "Wage"]
+    assert np.isnan(joined.at["AUS", "Wage"])
+
+
+def test_overlapping_columns_take_the_first_source_with_a_value():
+    joined, provenance = join_sources(sources())
+    assert joined["Rate"].tolist() == [3.7, 4.1, 7.3]
+    assert provenance["Rate"].tolist() == ["unemployment", "wages", "wages"]
+    assert provenance["Wage"].isna().tolist() == [True, False, False]
+    assert provenance_summary(provenance).loc["Rate"].to_dict() == {"unemployment": 1, "wages": 2}
+
+
+def test_duplicate_keys_in_one_source_are_an_error():
+    conflicting = sources()
+    conflicting["wages"] = pd.DataFrame({"Key": ["KOR", "KOR"], "Country": ["Korea", "Republic of Korea"],
+                                         "Wage": [1500, 1600]})
+    assert duplicate_keys(conflicting) == {"wages": ["KOR"]}
+    with pytest.raises(ValueError, match="wages: KOR"):
+        join_sources(conflicting)
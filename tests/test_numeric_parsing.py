@@ -0,0 +1,42 @@
+"""Unit-aware parsing of the scraped numbers."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from numeric_parsing import parse_numeric, parse_numeric_series
+
+
+@pytest.mark.parametrize("text, value, unit", [
+    ("72.1%", 72.1, "%"),
+    ("$18,774", 18774, "$"),
+    ("37433USD", 37433, "USD"),
+    ("20.4 years", 20.4, "years"),
+    ("~2.3 rooms", 2.3, "rooms"),
+    ("9,421", 9421, None),
+    ("-3.5", -3.5, None),
+])
+def test_number_and_unit_of_a_cell(text, value, unit):
+    parsed = parse_numeric_series(pd.Series([text]))
+    assert parsed.iloc[0] == pytest.approx(value)
+    assert parsed.attrs["unit"] == unit
+
+
+def test_dashes_and_texts_are_missing():
+    parsed = parse_numeric_series(pd.Series(["-", "–", "N/A", None, "12%"], name="Rate"))
+    assert parsed.name == "Rate"
+    assert parsed.isna().tolist() == [True, True, True, True, False]
+    assert parsed.attrs["unit"] == "%"
+
+
+def test_whole_numbers_become_integers_like_to_numeric():
+    assert parse_numeric_series(pd.Series(["9,421", "12"])).dtype == np.int64
+    assert parse_numeric_series(pd.Series(["9,421", "12.0"])).dtype == np.float64
+    assert parse_numeric_series(pd.Series(["9,421", "12"]), integers=False).dtype == np.float64
+
+
+def test_block_of_columns_with_numbers_already_parsed():
+    df = pd.DataFrame({"Country": ["Chad", "Peru"], "Share": ["50%", "61.5%"], "Hours": [40, 38.5]})
+    parsed = parse_numeric(df, ["Share", "Hours"])
+    assert parsed["Share"].tolist() == [50.0, 61.5]
+    assert parsed["Hours"].tolist() == [40.0, 38.5]
+    assert parsed.attrs["units"] == {"Share": "%", "Hours": None}
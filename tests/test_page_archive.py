@@ -0,0 +1,68 @@
+"""Record/replay of a scraper through the archive proxy (the HTTP backend of the Better Life Index scraper)."""
+import json
+import os
+
+import pandas as pd
+import requests
+
+import page_archive
+from conftest import FIXTURES, load_script
+from page_archive import ArchiveProxy, PageArchive
+
+betterlife_http = load_script(os.path.join("src", "scrape.betterlifeindex_http.py"), "scrape_betterlifeindex_http")
+
+
+def scrape_through(proxy, base_url):
+    session = betterlife_http.create_session(pool_size=2, retries=0)
+    session.proxies = {"http": f"http://{proxy.address}"}
+    return betterlife_http.scrape_betterlife_http(base_url=base_url, n_workers=2, session=session)
+
+
+def test_scraper_is_replayed_without_the_website(tmp_path):
+    server, base_url = betterlife_http.serve_fixtures(os.path.join(FIXTURES, "betterlife"))
+    try:
+        recorder = ArchiveProxy(PageArchive(str(tmp_path)), "record")
+        recorded = scrape_through(recorder, base_url)
+        recorder.shutdown()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # the website is gone: the pages come from the archive written by the recording proxy
+    with open(tmp_path / "index.json", encoding="utf-8") as f:
+        assert len(json.load(f)) == 2  # start page and Australia
+    player = ArchiveProxy(PageArchive(str(tmp_path)), "replay")
+    try:
+        replayed = scrape_through(player, base_url)
+    finally:
+        player.shutdown()
+
+    assert replayed["Country"].tolist() == ["Australia"]
+    pd.testing.assert_frame_equal(replayed, recorded)
+    assert not player.missing
+
+
+def test_index_is_written_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_archive, "FLUSH_EVERY", 3)
+    archive = PageArchive(str(tmp_path))
+    for i in range(2):
+        archive.put(f"http://example.org/{i}", f"page {i}".encode())
+    assert not os.path.exists(archive.index_path)
+
+    archive.put("http://example.org/2", b"page 2")
+    assert len(PageArchive(str(tmp_path)).index) == 3
+
+    archive.put("http://example.org/3", b"page 3")
+    archive.flush()
+    reopened = PageArchive(str(tmp_path))
+    assert reopened.get("http://example.org/3") == (b"page 3", "text/html; charset=utf-8")
+
+
+def test_request_not_recorded_is_a_404_in_replay(tmp_path):
+    player = ArchiveProxy(PageArchive(str(tmp_path)), "replay")
+    try:
+        response = requests.get("http://127.0.0.1:9/missing", proxies={"http": f"http://{player.address}"},
+                                timeout=10)
+    finally:
+        player.shutdown()
+    assert response.status_code == 404
@@ -0,0 +1,29 @@
+"""Parsing of the happiness-by-age table (no browser: the table HTML is given)."""
+from scrape_happiness_by_age import parse_table_html
+
+TABLE = """
+<table class="data-table data-table-compact">
+  <caption>Table 2.2: Ranking of life evaluations by age group, 2021- 2023</caption>
+  <thead>
+    <tr><th colspan="2"></th><th colspan="2">Middle</th></tr>
+    <tr><th>Country</th><th>All<br>Ages</th><th>Lower <em>Middle</em></th><th>Happiest</th></tr>
+  </thead>
+  <tbody>
+    <tr><td>New <span>Zealand</span></td><td>10</td><td>12</td><td>The Old</td></tr>
+    <tr><td>Chad</td><td>130</td><td></td><td>The Young</td></tr>
+  </tbody>
+</table>
+"""
+
+
+def test_headers_come_from_the_table_header_with_spaces():
+    df = parse_table_html(TABLE)
+    assert list(df.columns) == ["Country", "All Ages", "Lower Middle", "Happiest"]
+    assert list(df["Country"]) == ["New Zealand", "Chad"]
+
+
+def test_rank_columns_are_integers():
+    df = parse_table_html(TABLE)
+    assert str(df["All Ages"].dtype) == "Int64"
+    assert df["Lower Middle"].isna().tolist() == [False, True]
+    assert df["Happiest"].dtype == object